@@ -0,0 +1,895 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngbench.py
+Description:
+    Benchmarks of raw PM parser.
+    usage: python ngbench.py tar [--in DIR]
+           python ngbench.py kpi [--rows N] [--kpis N]
+           python ngbench.py stages [--rat 5g|4g] [--scales BTSxCELLSxROPS,...] [--workers N] [--format FMT]
+           python ngbench.py anomaly [--dns N]
+           python ngbench.py csv [--bts N] [--periods N]
+           python ngbench.py agg [--bts N] [--periods N] [--invalid RATIO]
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import time
+import shutil
+import tempfile
+import argparse
+import tarfile
+import random
+import logging
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import ngrawpmparser
+from ngpmstore import PmTable, PmKeys
+from ngkpiengine import KpiCompiled, KpiTable, KPI_RATIO
+from ngkpianomaly import rankAnomalies
+from ngpmgen import NgPmGenerator
+from ngconsole import NgConsoleWin
+from ngpmstats import peakRss
+from ngm8015proc import NgM8015Proc, NEDS_SCHEMAS, M80XX_AGGS, M8015, M8001, M8005, M8006, M8007, M8013, M8051, processEvents
+from ngnedsgen import NgNedsGenerator
+
+#default scales of stage benchmark: (BTSs, cells per BTS, ROPs)
+BENCH_SCALES = ((10, 3, 4), (50, 3, 8), (200, 3, 16))
+BENCH_STAGES = ('extract', 'parse', 'aggregate', 'kpi', 'anomaly', 'export')
+
+def dirSize(d):
+    size = 0
+    for root, dirs, files in os.walk(d):
+        for fn in files:
+            size = size + os.path.getsize(os.path.join(root, fn))
+    return size
+
+def benchTarIngest(inDir, rat='5g'):
+    #compare 'extract tar.gz to disk then parse xml' with 'parse xml members of tar.gz as streams'
+    tgzs = sorted([os.path.join(inDir, fn) for fn in os.listdir(inDir) if fn.lower().endswith('tar.gz')], key=str.lower)
+    if len(tgzs) == 0:
+        print('No tar.gz found in %s' % inDir)
+        return
+
+    results = []
+    tmpDir = tempfile.mkdtemp()
+    try:
+        #before: tar.extract + parse extracted xml
+        size0 = dirSize(tmpDir)
+        t0 = time.perf_counter()
+        for tgz in tgzs:
+            tar = tarfile.open(tgz, 'r:gz')
+            for fn in tar.getnames():
+                tar.extract(fn, tmpDir)
+            tar.close()
+        data = dict()
+        for root, dirs, files in os.walk(tmpDir):
+            for fn in sorted([os.path.join(root, fn) for fn in files if fn.lower().endswith('xml')], key=str.lower):
+                ngrawpmparser.parseRawPm(fn, rat, True, data)
+        results.append(['extract+parse', time.perf_counter() - t0, dirSize(tmpDir) - size0])
+
+        #after: stream tar.gz members into xml parser
+        shutil.rmtree(tmpDir)
+        os.mkdir(tmpDir)
+        size0 = dirSize(tmpDir)
+        t0 = time.perf_counter()
+        for tgz in tgzs:
+            ngrawpmparser.parseRawPmWorker(tgz, None, rat, True)
+        results.append(['stream', time.perf_counter() - t0, dirSize(tmpDir) - size0])
+    finally:
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+    print('%d archives, %d bytes compressed' % (len(tgzs), sum([os.path.getsize(tgz) for tgz in tgzs])))
+    print('%-16s%12s%16s' % ('mode', 'wall(s)', 'bytes written'))
+    for mode, wall, written in results:
+        print('%-16s%12.3f%16d' % (mode, wall, written))
+    return results
+
+def scalarKpi(parser, key, kpi):
+    #kpi calculation of one (key, kpi) as done before ngkpiengine
+    name, f, x, y, p, agg = kpi
+    try:
+        xval = x if isinstance(x, int) else sum([parser.getCounter(key, item[0]) * item[1] for item in x])
+        if y is None:
+            return xval
+        yval = y if isinstance(y, int) else sum([parser.getCounter(key, item[0]) * item[1] for item in y])
+        return '{:0.{precision}f}'.format(f * xval / yval, precision=p) if yval != 0 else 0
+    except Exception as e:
+        return 'NA'
+
+def benchKpiEngine(numRows=100000, numKpis=500, numCounters=1000, sampleRows=2000, seed=1):
+    #compare per (row, kpi) scalar calculation with vectorized calculation of ngkpiengine
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    table = PmTable()
+    keys = [('2019-03-21_07:%02d:00' % (15 * (i % 4)), '15', 'MRBTS-%d/NRBTS-1/NRCELL-%d' % (i // 12, i % 12 // 4)) for i in range(numRows)]
+    for key in keys:
+        table.addRow(key)
+    tags = ['M%dC%d' % (8000 + i // 50, i % 50) for i in range(numCounters)]
+    for tag in tags:
+        table.addTag(tag)
+    table.values = np.where(rng.random((numRows, numCounters)) < 0.2, 0, rng.integers(0, 1000, (numRows, numCounters)))
+    table.valid = rng.random((numRows, numCounters)) >= 0.001
+    counterIndex = {tag:[(table, col)] for col,tag in enumerate(tags)}
+
+    kpis = []
+    for k in range(numKpis):
+        x = [[random.choice(tags), random.choice([1, 1, 1, -1])] for i in range(random.randint(1, 4))]
+        if random.random() < 0.7:
+            y = [[random.choice(tags), 1] for i in range(random.randint(1, 4))]
+            kpis.append(['KPI_%d' % k, 100, x, y, 2, 'NRCELL'])
+        else:
+            kpis.append(['KPI_%d' % k, None, x, None, None, 'NRCELL'])
+
+    #before: scalar calculation on sampleRows rows, extrapolated to numRows
+    parser = SimpleNamespace(counterIndex=counterIndex)
+    parser.getCounter = lambda key, tag: ngrawpmparser.NgRawPmParser.getCounter(parser, key, tag)
+    t0 = time.perf_counter()
+    ref = [[scalarKpi(parser, key, kpi) for kpi in kpis] for key in keys[:sampleRows]]
+    scalarWall = (time.perf_counter() - t0) * numRows / sampleRows
+
+    #after: counter matrix gathered once and kpis evaluated as sparse weighted sums
+    t0 = time.perf_counter()
+    compiled = KpiCompiled('NRCELL', kpis)
+    pmKeys = PmKeys({'M8000':table})
+    result = compiled.evaluate(pmKeys, pmKeys.tableIds[0])
+    vectorWall = time.perf_counter() - t0
+
+    mismatch = sum([1 for row in range(sampleRows) if result.rowValues(row) != ref[row]])
+    print('%d rows x %d kpis(%d counters), %d sampled rows mismatched' % (numRows, numKpis, numCounters, mismatch))
+    print('%-16s%12s' % ('mode', 'wall(s)'))
+    print('%-16s%12.3f  (extrapolated from %d rows)' % ('scalar', scalarWall, sampleRows))
+    print('%-16s%12.3f' % ('vectorized', vectorWall))
+    return scalarWall, vectorWall, mismatch
+
+def benchAnomaly(numDns=20000, numRops=96, window=8, seed=1):
+    #anomaly detection of one kpi over numDns x numRops, vectorized over all dns vs. per-dn loop over ROPs
+    rng = np.random.default_rng(seed)
+    table = PmTable()
+    stimes = ['2019-03-21_%02d:%02d:00' % (r * 15 // 60, r * 15 % 60) for r in range(numRops)]
+    for d in range(numDns):
+        dn = 'MRBTS-%d/NRBTS-1/NRCELL-%d' % (d // 3, d % 3 + 1)
+        for stime in stimes:
+            table.addRow((stime, '15', dn))
+    pmKeys = PmKeys({'M8000':table})
+    kpiTable = KpiTable('NRCELL', pmKeys, pmKeys.tableIds[0], ['KPI_0'], np.array([KPI_RATIO], dtype=np.int8), [2])
+    kpiTable.ratios[:, 0] = rng.normal(98, 0.5, numDns * numRops)
+    kpiTable.ratios[rng.random(numDns * numRops) < 0.001, 0] = 80
+
+    t0 = time.perf_counter()
+    anomalies = rankAnomalies({'NRCELL':kpiTable}, [('KPI_0', 'down')], window)
+    vectorWall = time.perf_counter() - t0
+
+    #before: per dn, per ROP median/MAD of previous ROPs, on sampled dns and extrapolated
+    sampleDns = min(numDns, 200)
+    values = kpiTable.ratios[:, 0].reshape(numDns, numRops)
+    t0 = time.perf_counter()
+    count = 0
+    for d in range(sampleDns):
+        for r in range(window // 2, numRops):
+            prev = values[d, max(0, r - window):r]
+            median = np.median(prev)
+            spread = max(1.4826 * np.median(np.abs(prev - median)), 0.01 * abs(median))
+            count = count + (1 if (median - values[d, r]) / spread > 3.0 else 0)
+    loopWall = (time.perf_counter() - t0) * numDns / sampleDns
+
+    print('%d dns x %d ROPs, %d degraded ROPs' % (numDns, numRops, len(anomalies)))
+    print('%-16s%12s' % ('mode', 'wall(s)'))
+    print('%-16s%12.3f  (extrapolated from %d dns)' % ('per-dn loop', loopWall, sampleDns))
+    print('%-16s%12.3f' % ('vectorized', vectorWall))
+    return loopWall, vectorWall
+
+#records of per-line loaders of NgM8015Baseline, one object of string attributes per row
+class Lncel(object):
+    def __init__(self):
+        self.lnbtsId = None
+        self.enbId = None
+        self.lcrId = None
+        self.eci = None
+        self.earfcn = None
+        self.pci = None
+        self.tac = None
+        self.th1 = None
+        self.a3Off = None
+        self.hysA3off = None
+        self.a3RepInt = None
+        self.a3Ttt = None
+        self.a5Th3 = None
+        self.a5Th3a = None
+        self.hysA5Th3 = None
+        self.a5RepInt = None
+        self.a5Ttt = None
+        self.a2Th2If = None
+        self.hysA2Th2If = None
+        self.a2Ttt = None
+        self.a1Th2a = None
+        self.hysA1Th2a = None
+        self.a1Ttt = None
+
+class Lnrel(object):
+    def __init__(self):
+        self.coDn = None
+        self.cio = None
+        self.hoAllowed = None
+        self.nrStat = None
+
+class NgM8015Baseline(NgM8015Proc):
+    #per-line loaders(readline, one object of string attributes per row) and per-record aggregation of M8015 analyzer before CsvTable,
+    #kept as baseline of benchCsvLoad(lncel, lnrel and m80xx) and benchCounterAgg
+    def __init__(self, ngwin, csvDir=None, args=None):
+        super().__init__(ngwin, csvDir, args)
+
+        self.m8015Data= dict() #[key='m8015.lnbts_id+m8015.lncel_id+m8015.eci_id', val=list of M8015]
+        self.m8015AggData= dict() #[key='m8015.lnbts_id+m8015.lncel_id+m8015.eci_id', val=aggregated M8015]
+        
+        self.m8001Data= dict() #[key='m8001.lnbts_id+m8001.lncel_id', val=list of M8001]
+        self.m8001AggData= dict() #[key='m8001.lnbts_id+m8001.lncel_id', val=aggregated M8001]
+
+        self.m8007Data= dict() #[key='m8007.lnbts_id+m8007.lncel_id', val=list of M8007]
+        self.m8007AggData= dict() #[key='m8007.lnbts_id+m8007.lncel_id', val=aggregated M8007]
+
+        self.m8005Data= dict() #[key='m8005.lnbts_id+m8005.lncel_id', val=list of M8005]
+        self.m8005AggData= dict() #[key='m8005.lnbts_id+m8005.lncel_id', val=aggregated M8005]
+        
+        self.m8006Data= dict() #[key='m8006.lnbts_id+m8006.lncel_id', val=list of M8006]
+        self.m8006AggData= dict() #[key='m8006.lnbts_id+m8006.lncel_id', val=aggregated M8006]
+        
+        self.m8013Data= dict() #[key='m8013.lnbts_id+m8013.lncel_id', val=list of M8013]
+        self.m8013AggData= dict() #[key='m8013.lnbts_id+m8013.lncel_id', val=aggregated M8013]
+        
+        self.m8051Data= dict() #[key='m8051.lnbts_id+m8051.lncel_id', val=list of M8051]
+        self.m8051AggData= dict() #[key='m8051.lnbts_id+m8051.lncel_id', val=aggregated M8051]
+        
+        self.lncelData = dict() #[key=lncel.lncel_id, val=Lncel]
+        self.lnrelData = dict() #[key='lnrel.lncel_id+lnrel.adj_enb_id+lnrel.adj_lcr_id', val=Lnrel]
+    
+    def loadLncel(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_lncel.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            #note: use strip to remove the tailing '/n'
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = Lncel()
+                t.lnbtsId = tokens[d['LNBTS_ID']]
+                t.enbId = tokens[d['ENB_ID']]
+                t.lcrId = tokens[d['LCR_ID']]
+                t.eci = tokens[d['ECI']]
+                t.earfcn = tokens[d['EARFCN']]
+                t.pci = tokens[d['PCI']]
+                t.tac = tokens[d['TAC']]
+                t.th1 = tokens[d['TH1']]
+                t.a3Off = tokens[d['A3_OFF']]
+                t.hysA3Off = tokens[d['HYS_A3_OFF']]
+                t.a3RepInt = tokens[d['A3_REP_INT']]
+                t.a3Ttt = tokens[d['A3_TTT']]
+                t.a5Th3 = tokens[d['A5_TH3']]
+                t.a5Th3a = tokens[d['A5_TH3A']]
+                t.hysA5Th3 = tokens[d['HYS_A5_TH3']]
+                t.a5RepInt = tokens[d['A5_REP_INT']]
+                t.a5Ttt = tokens[d['A5_TTT']]
+                t.a2Th2If = tokens[d['A2_TH2_IF']]
+                t.hysA2Th2If = tokens[d['HYS_A2_TH2_IF']]
+                t.a2Ttt = tokens[d['A2_TTT']]
+                t.a1Th2a = tokens[d['A1_TH2A']]
+                t.hysA1Th2a = tokens[d['HYS_A1_TH2A']]
+                t.a1Ttt = tokens[d['A1_TTT']]
+                
+                self.lncelData[tokens[d['LNCEL_ID']]] = t 
+    
+    def loadLnrel(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_lnrel.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = Lnrel()
+                t.coDn = '/'.join(tokens[d['CO_DN']].split('/')[1:])
+                t.adjEnbId = tokens[d['ADJ_ENB_ID']]
+                t.adjLcrId = tokens[d['ADJ_LCR_ID']]
+                t.cio = tokens[d['CIO']]
+                t.hoAllowed = tokens[d['HO_ALLOWED']]
+                t.nrStat = tokens[d['NR_STAT']]
+                
+                self.lnrelData[tokens[d['LNCEL_ID']] + '_' + tokens[d['ADJ_ENB_ID']] + '_' + tokens[d['ADJ_LCR_ID']]] = t
+    
+    def loadM8015(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_m8015.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = M8015()
+                t.periodStartTime = tokens[d['PERIOD_START_TIME']]
+                t.iaHoPrepFail = tokens[d['INTRA_HO_PREP_FAIL_NB']]
+                t.iaHoAtt = tokens[d['INTRA_HO_ATT_NB']]
+                t.iaHoSucc = tokens[d['INTRA_HO_SUCC_NB']]
+                t.iaHoFailTime = tokens[d['INTRA_HO_FAIL_NB']]
+                t.irHoPrepFailOth = tokens[d['INTER_HO_PREP_FAIL_OTH_NB']]
+                t.irHoPrepFailTime = tokens[d['INTER_HO_PREP_FAIL_TIME_NB']]
+                t.irHoPrepFailAc = tokens[d['INTER_HO_PREP_FAIL_AC_NB']]
+                t.irHoPrepFailQci = tokens[d['INTER_HO_PREP_FAIL_QCI_NB']]
+                t.irHoAtt = tokens[d['INTER_HO_ATT_NB']]
+                t.irHoSucc = tokens[d['INTER_HO_SUCC_NB']]
+                t.irHoFailTime = tokens[d['INTER_HO_FAIL_NB']]
+                t.mroLateHo = tokens[d['MRO_LATE_HO_NB']]
+                t.mroEarlyType1Ho = tokens[d['MRO_EARLY_TYPE1_HO_NB']]
+                t.mroEarlyType2Ho = tokens[d['MRO_EARLY_TYPE2_HO_NB']]
+                t.mroPingPongHo = tokens[d['MRO_PING_PONG_HO_NB']]
+                t.ifLbHoAtt = tokens[d['HO_LB_IF_ATT_NB']]
+                t.ifLbHoSucc = tokens[d['HO_LB_IF_SUCC_NB']]
+                
+                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']] + '_' + tokens[d['ECI_ID']]
+                
+                if not key in self.m8015Data:
+                    self.m8015Data[key] = [t]
+                else:
+                    self.m8015Data[key].append(t)
+        
+        self.aggM8015()
+    
+    def loadM8001(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_m8001.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = M8001()
+                t.smallMsg1Att = tokens[d['RACH_STP_ATT_SMALL_MSG']]
+                t.largeMsg1Att = tokens[d['RACH_STP_ATT_LARGE_MSG']]
+                t.dedMsg1Att = tokens[d['RACH_STP_ATT_DEDICATED']]
+                t.rachMsg2 = tokens[d['RACH_STP_COMPLETIONS']]
+                
+                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
+                
+                if not key in self.m8001Data:
+                    self.m8001Data[key] = [t]
+                else:
+                    self.m8001Data[key].append(t)
+        
+        self.aggM8001()
+
+    def loadM8007(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_m8007.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+
+                tokens = line.split(',')
+
+                t = M8007()
+                t.drbSetupAtt= tokens[d['DATA_RB_STP_ATT']]
+                t.drbSetupSucc= tokens[d['DATA_RB_STP_COMP']]
+                t.drbSetupFailTimer= tokens[d['DATA_RB_STP_FAIL']]
+
+                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
+
+                if not key in self.m8007Data:
+                    self.m8007Data[key] = [t]
+                else:
+                    self.m8007Data[key].append(t)
+
+        self.aggM8007()
+
+    def loadM8005(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_m8005.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = M8005()
+                t.avgRssiPucch = tokens[d['RSSI_PUCCH_AVG']]
+                t.avgRssiPusch = tokens[d['RSSI_PUSCH_AVG']]
+                t.avgSinrPucch = tokens[d['SINR_PUCCH_AVG']]
+                t.avgSinrPusch = tokens[d['SINR_PUSCH_AVG']]
+                
+                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
+                
+                if not key in self.m8005Data:
+                    self.m8005Data[key] = [t]
+                else:
+                    self.m8005Data[key].append(t)
+        
+        self.aggM8005()
+    
+    def loadM8006(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_m8006.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = M8006()
+                t.erabSetupAtt = tokens[d['EPS_BEARER_SETUP_ATTEMPTS']]
+                t.erabSetupSucc = tokens[d['EPS_BEARER_SETUP_COMPLETIONS']]
+                t.erabSetupFailRrnaIni = tokens[d['ERAB_INI_SETUP_FAIL_RNL_RRNA']]
+                t.erabSetupFailRrnaAdd = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_RRNA']]
+                t.erabSetupFailTruIni = tokens[d['ERAB_INI_SETUP_FAIL_TNL_TRU']]
+                t.erabSetupFailTruAdd = tokens[d['ERAB_ADD_SETUP_FAIL_TNL_TRU']]
+                t.erabSetupFailUelIni = tokens[d['ERAB_INI_SETUP_FAIL_RNL_UEL']]
+                t.erabSetupFailUelAdd = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_UEL']]
+                t.erabSetupFailRipIni = tokens[d['ERAB_INI_SETUP_FAIL_RNL_RIP']]
+                t.erabSetupFailRipAdd = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_RIP']]
+                t.erabSetupFailUp = tokens[d['ERAB_ADD_SETUP_FAIL_UP']]
+                t.erabSetupFailMob = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_MOB']]
+                t.erabRelQci1Tot = tokens[d['ERAB_REL_ENB_QCI1']]
+                t.erabRelQci1Ina = tokens[d['ERAB_REL_ENB_RNL_INA_QCI1']]
+                t.erabRelQci1UeLost = tokens[d['ERAB_REL_ENB_RNL_UEL_QCI1']]
+                t.erabRelQci1Tru = tokens[d['ERAB_REL_ENB_TNL_TRU_QCI1']]
+                t.erabRelQci1Red = tokens[d['ERAB_REL_ENB_RNL_RED_QCI1']]
+                t.erabRelQci1Eugr = tokens[d['ERAB_REL_ENB_RNL_EUGR_QCI1']]
+                t.erabRelQci1Rrna = tokens[d['ERAB_REL_ENB_RNL_RRNA_QCI1']]
+                t.erabRelQci1HoFail = tokens[d['ERAB_REL_HO_FAIL_TIM_QCI1']]
+                t.erabRelQci1EpcPs = tokens[d['ERAB_REL_EPC_PATH_SWITCH_QCI1']]
+                t.erabRelQci1TnlUnsp = tokens[d['ERAB_REL_ENB_TNL_UNSP_QCI1']]
+                
+                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
+                
+                if not key in self.m8006Data:
+                    self.m8006Data[key] = [t]
+                else:
+                    self.m8006Data[key].append(t)
+        
+        self.aggM8006()
+    
+    def loadM8013(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_m8013.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = M8013()
+                t.rrcMsg3Mos = tokens[d['SIGN_CONN_ESTAB_ATT_MO_S']]
+                t.rrcMsg3Mt = tokens[d['SIGN_CONN_ESTAB_ATT_MT']]
+                t.rrcMsg3Mod = tokens[d['SIGN_CONN_ESTAB_ATT_MO_D']]
+                t.rrcMsg3Emg = tokens[d['SIGN_CONN_ESTAB_ATT_EMG']]
+                t.rrcMsg3HiPrio = tokens[d['SIGN_CONN_ESTAB_ATT_HIPRIO']]
+                t.rrcMsg3DelTol = tokens[d['SIGN_CONN_ESTAB_ATT_DEL_TOL']]
+                t.rrcMsg5 = tokens[d['SIGN_CONN_ESTAB_COMP']]
+                
+                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
+                
+                if not key in self.m8013Data:
+                    self.m8013Data[key] = [t]
+                else:
+                    self.m8013Data[key].append(t)
+        
+        self.aggM8013()
+    
+    def loadM8051(self):
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'neds_m8051.csv'), 'r') as f:
+            self.ngwin.logEdit.append('Loading %s' % f.name)
+            processEvents()
+            
+            line = f.readline().strip()
+            tokens = line.split(',')
+            d = dict(zip(tokens, range(len(tokens))))
+            
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                
+                tokens = line.split(',')
+                
+                t = M8051()
+                t.avgUeRrcConn = tokens[d['RRC_CONNECTED_UE_AVG']]
+                t.maxUeRrcConn = tokens[d['RRC_CONNECTED_UE_MAX']]
+                t.avgUeAct = tokens[d['CELL_LOAD_ACTIVE_UE_AVG']]
+                t.maxUeAct = tokens[d['CELL_LOAD_ACTIVE_UE_MAX']]
+                
+                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
+                
+                if not key in self.m8051Data:
+                    self.m8051Data[key] = [t]
+                else:
+                    self.m8051Data[key].append(t)
+        
+        self.aggM8051()
+    
+    def aggM8001(self):
+        self.ngwin.logEdit.append('Aggregating M8001')
+        processEvents()
+        
+        for key,val in self.m8001Data.items():
+            t = M8001()
+            for rec in val:
+                try:
+                    t.smallMsg1Att = t.smallMsg1Att + int(rec.smallMsg1Att)
+                    t.largeMsg1Att = t.largeMsg1Att + int(rec.largeMsg1Att)
+                    t.dedMsg1Att = t.dedMsg1Att + int(rec.dedMsg1Att)
+                    t.rachMsg2 = t.rachMsg2 + int(rec.rachMsg2)
+                except Exception as e:
+                    #ignore ValueError that may raised by int()
+                    continue
+            
+            self.m8001AggData[key] = t
+                
+
+    def aggM8007(self):
+        self.ngwin.logEdit.append('Aggregating M8007')
+        processEvents()
+
+        for key, val in self.m8007Data.items():
+            t = M8007()
+            for rec in val:
+                try:
+                    t.drbSetupAtt = t.drbSetupAtt + int(rec.drbSetupAtt)
+                    t.drbSetupSucc = t.drbSetupSucc + int(rec.drbSetupSucc)
+                    t.drbSetupFailTimer = t.drbSetupFailTimer + int(rec.drbsetupFailTimer)
+                except Exception as e:
+                    # ignore ValueError that may raised by int()
+                    continue
+
+            self.m8007AggData[key] = t
+
+        
+    def aggM8005(self):
+        self.ngwin.logEdit.append('Aggregating M8005')
+        processEvents()
+        
+        for key,val in self.m8005Data.items():
+            t = M8005()
+            cnt = 0
+            for rec in val:
+                try:
+                    t.avgRssiPucch = t.avgRssiPucch + int(rec.avgRssiPucch)
+                    t.avgRssiPusch = t.avgRssiPusch + int(rec.avgRssiPusch)
+                    t.avgSinrPucch = t.avgSinrPucch + int(rec.avgSinrPucch)
+                    t.avgSinrPusch = t.avgSinrPusch + int(rec.avgSinrPusch)
+                    cnt = cnt + 1
+                except Exception as e:
+                    #ignore ValueError that may raised by int()
+                    continue
+            
+            if cnt > 0:
+                t.avgRssiPucch = round(t.avgRssiPucch / cnt, 2)
+                t.avgRssiPusch = round(t.avgRssiPusch / cnt, 2)
+                t.avgSinrPucch = round(t.avgSinrPucch / cnt, 2)
+                t.avgSinrPusch = round(t.avgSinrPusch / cnt, 2)
+            else:
+                t.avgRssiPucch, t.avgRssiPusch, t.avgSinrPucch, t.avgSinrPusch = ('DIV0', 'DIV0', 'DIV0', 'DIV0')
+                
+            
+            self.m8005AggData[key] = t
+                
+    
+    def aggM8006(self):
+        self.ngwin.logEdit.append('Aggregating M8006')
+        processEvents()
+        
+        for key,val in self.m8006Data.items():
+            t = M8006()
+            for rec in val:
+                try:
+                    t.erabSetupAtt = t.erabSetupAtt + int(rec.erabSetupAtt)
+                    t.erabSetupSucc = t.erabSetupSucc + int(rec.erabSetupSucc)
+                    t.erabSetupFailRrnaIni = t.erabSetupFailRrnaIni + int(rec.erabSetupFailRrnaIni)
+                    t.erabSetupFailRrnaAdd = t.erabSetupFailRrnaAdd + int(rec.erabSetupFailRrnaAdd)
+                    t.erabSetupFailTruIni = t.erabSetupFailTruIni + int(rec.erabSetupFailTruIni)
+                    t.erabSetupFailTruAdd = t.erabSetupFailTruAdd + int(rec.erabSetupFailTruAdd)
+                    t.erabSetupFailUelIni = t.erabSetupFailUelIni + int(rec.erabSetupFailUelIni)
+                    t.erabSetupFailUelAdd = t.erabSetupFailUelAdd + int(rec.erabSetupFailUelAdd)
+                    t.erabSetupFailRipIni = t.erabSetupFailRipIni + int(rec.erabSetupFailRipIni)
+                    t.erabSetupFailRipAdd = t.erabSetupFailRipAdd + int(rec.erabSetupFailRipAdd)
+                    t.erabSetupFailUp = t.erabSetupFailUp + int(rec.erabSetupFailUp)
+                    t.erabSetupFailMob = t.erabSetupFailMob + int(rec.erabSetupFailMob)
+                    t.erabRelQci1Tot = t.erabRelQci1Tot + int(rec.erabRelQci1Tot)
+                    t.erabRelQci1Ina = t.erabRelQci1Ina + int(rec.erabRelQci1Ina)
+                    t.erabRelQci1UeLost = t.erabRelQci1UeLost + int(rec.erabRelQci1UeLost)
+                    t.erabRelQci1Tru = t.erabRelQci1Tru + int(rec.erabRelQci1Tru)
+                    t.erabRelQci1Red = t.erabRelQci1Red + int(rec.erabRelQci1Red)
+                    t.erabRelQci1Eugr = t.erabRelQci1Eugr + int(rec.erabRelQci1Eugr)
+                    t.erabRelQci1Rrna = t.erabRelQci1Rrna + int(rec.erabRelQci1Rrna)
+                    t.erabRelQci1HoFail = t.erabRelQci1HoFail + int(rec.erabRelQci1HoFail)
+                    t.erabRelQci1EpcPs = t.erabRelQci1EpcPs + int(rec.erabRelQci1EpcPs)
+                    t.erabRelQci1TnlUnsp = t.erabRelQci1TnlUnsp + int(rec.erabRelQci1TnlUnsp)
+                except Exception as e:
+                    #ignore ValueError that may raised by int()
+                    continue
+            
+            self.m8006AggData[key] = t
+                
+    
+    def aggM8013(self):
+        self.ngwin.logEdit.append('Aggregating M8013')
+        processEvents()
+        
+        for key,val in self.m8013Data.items():
+            t = M8013()
+            for rec in val:
+                try:
+                    t.rrcMsg3Mos = t.rrcMsg3Mos + int(rec.rrcMsg3Mos)
+                    t.rrcMsg3Mt = t.rrcMsg3Mt + int(rec.rrcMsg3Mt)
+                    t.rrcMsg3Mod = t.rrcMsg3Mod + int(rec.rrcMsg3Mod)
+                    t.rrcMsg3Emg = t.rrcMsg3Emg + int(rec.rrcMsg3Emg)
+                    t.rrcMsg3HiPrio = t.rrcMsg3HiPrio + int(rec.rrcMsg3HiPrio)
+                    t.rrcMsg3DelTol = t.rrcMsg3DelTol + int(rec.rrcMsg3DelTol)
+                    t.rrcMsg5 = t.rrcMsg5 + int(rec.rrcMsg5)
+                except Exception as e:
+                    #ignore ValueError that may raised by int()
+                    continue
+            
+            self.m8013AggData[key] = t
+                
+    
+    def aggM8051(self):
+        self.ngwin.logEdit.append('Aggregating M8051')
+        processEvents()
+        
+        for key,val in self.m8051Data.items():
+            t = M8051()
+            cnt = 0
+            for rec in val:
+                try:
+                    t.avgUeRrcConn = t.avgUeRrcConn + int(rec.avgUeRrcConn)
+                    t.maxUeRrcConn = max(t.maxUeRrcConn, int(rec.maxUeRrcConn))
+                    t.avgUeAct = t.avgUeAct + int(rec.avgUeAct)
+                    t.maxUeAct = max(t.maxUeAct, int(rec.maxUeAct))
+                    cnt = cnt + 1
+                except Exception as e:
+                    #ignore ValueError that may raised by int()
+                    continue
+                
+            if cnt > 0:
+                t.avgUeRrcConn = round(t.avgUeRrcConn / cnt, 2)
+                t.avgUeAct = round(t.avgUeAct / cnt, 2)
+            else:
+                t.avgUeRrcConn, t.avgUeAct = ('DIV0', 'DIV0')
+            
+            self.m8051AggData[key] = t
+                
+    
+    def aggM8015(self):
+        self.ngwin.logEdit.append('Aggregating M8015')
+        processEvents()
+        
+        for key,val in self.m8015Data.items():
+            t = M8015()
+            for rec in val:
+                try:
+                    t.iaHoPrepFail = t.iaHoPrepFail + int(rec.iaHoPrepFail)
+                    t.iaHoAtt = t.iaHoAtt + int(rec.iaHoAtt)
+                    t.iaHoSucc = t.iaHoSucc + int(rec.iaHoSucc)
+                    t.iaHoFailTime = t.iaHoFailTime + int(rec.iaHoFailTime)
+                    t.irHoPrepFailOth = t.irHoPrepFailOth + int(rec.irHoPrepFailOth)
+                    t.irHoPrepFailTime = t.irHoPrepFailTime + int(rec.irHoPrepFailTime)
+                    t.irHoPrepFailAc = t.irHoPrepFailAc + int(rec.irHoPrepFailAc)
+                    t.irHoPrepFailQci = t.irHoPrepFailQci + int(rec.irHoPrepFailQci)
+                    t.irHoAtt = t.irHoAtt + int(rec.irHoAtt)
+                    t.irHoSucc = t.irHoSucc + int(rec.irHoSucc)
+                    t.irHoFailTime = t.irHoFailTime + int(rec.irHoFailTime)
+                    t.mroLateHo = t.mroLateHo + int(rec.mroLateHo)
+                    t.mroEarlyType1Ho = t.mroEarlyType1Ho + int(rec.mroEarlyType1Ho)
+                    t.mroEarlyType2Ho = t.mroEarlyType2Ho + int(rec.mroEarlyType2Ho)
+                    t.mroPingPongHo = t.mroPingPongHo + int(rec.mroPingPongHo)
+                    t.ifLbHoAtt = t.ifLbHoAtt + int(rec.ifLbHoAtt)
+                    t.ifLbHoSucc = t.ifLbHoSucc + int(rec.ifLbHoSucc)
+                except Exception as e:
+                    #ignore ValueError that may raised by int()
+                    continue
+            
+            self.m8015AggData[key] = t
+                
+    
+def benchCsvLoad(numBts=1000, numPeriods=24, tables=('lncel', 'lnrel', 'm8015', 'm8006')):
+    #compare per-line loaders of NgM8015Baseline(readline, one object of string attributes per row) with bulk typed loading into CsvTable
+    #tables are lncel, lnrel or m80xx, for which NgM8015Baseline has per-line loaders
+    #counters of m80xx are typed only by int() in agg*, so per-line time of m80xx includes agg*
+    logger = logging.getLogger('ngbench')
+    logger.setLevel(logging.ERROR)
+    tmpDir = tempfile.mkdtemp()
+    try:
+        NgNedsGenerator(numBts, numPeriods=numPeriods).generate(tmpDir)
+        print('%-10s%10s%10s%16s%12s%10s' % ('table', 'rows', 'MB', 'per-line(s)', 'bulk(s)', 'speedup'))
+        results = []
+        for name in tables:
+            proc = NgM8015Baseline(NgConsoleWin(logger=logger), tmpDir)
+            loader = getattr(proc, 'load%s' % (name[0].upper() + name[1:]))
+            t0 = time.perf_counter()
+            loader()
+            if name.startswith('m80'):
+                getattr(proc, 'agg%s' % name.upper())()
+            lineWall = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            proc.loadCsvTables([name])
+            bulkWall = time.perf_counter() - t0
+            fn = os.path.join(tmpDir, NEDS_SCHEMAS[name][0])
+            print('%-10s%10d%10.1f%16.3f%12.3f%10.1f' % (name, len(proc.tables[name]), os.path.getsize(fn) / (1024 * 1024), lineWall, bulkWall, lineWall / bulkWall if bulkWall > 0 else 0))
+            results.append([name, len(proc.tables[name]), lineWall, bulkWall])
+        return results
+    finally:
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+def benchCounterAgg(numBts=1000, numPeriods=24, invalidRatio=0.0):
+    #compare per-record aggregation(agg* of NgM8015Baseline) with group-by of CsvGroups(aggCounters), loading is not timed
+    #groups whose aggregated records differ are counted, with invalidRatio > 0 they are expected:
+    #agg* drops the rest of a record on the first invalid value, while aggCounters skips invalid values per counter
+    logger = logging.getLogger('ngbench')
+    logger.setLevel(logging.ERROR)
+    tmpDir = tempfile.mkdtemp()
+    try:
+        NgNedsGenerator(numBts, numPeriods=numPeriods, invalidRatio=invalidRatio).generate(tmpDir)
+        print('%-10s%10s%10s%16s%12s%10s%10s' % ('table', 'rows', 'groups', 'per-record(s)', 'group-by(s)', 'speedup', 'diff'))
+        results = []
+        for name in M80XX_AGGS.keys():
+            proc = NgM8015Baseline(NgConsoleWin(logger=logger), tmpDir)
+            load = getattr(proc, 'load%s' % name.upper())
+            agg = getattr(proc, 'agg%s' % name.upper())
+            aggData = getattr(proc, '%sAggData' % name)
+            #load* calls agg* at the end, so agg* is timed by running it again
+            load()
+            t0 = time.perf_counter()
+            agg()
+            recordWall = time.perf_counter() - t0
+            before = {key:vars(val) for key,val in aggData.items()}
+
+            proc.loadCsvTables([name])
+            t0 = time.perf_counter()
+            proc.aggCounters(name)
+            groupWall = time.perf_counter() - t0
+            #aggregated columns are compared as records of agg*, keyed by texts of key columns
+            cls, keys, fields = M80XX_AGGS[name]
+            groups, cols = proc.aggCols[name]
+            after = dict()
+            for key,vals in zip(groups.keyTexts(proc.tables[name]), zip(*[cols[attr].tolist() for attr,col,func in fields])):
+                t = cls()
+                for (attr,col,func),val in zip(fields, vals):
+                    setattr(t, attr, val)
+                after[key] = vars(t)
+            diff = len(set(before.keys()) ^ set(after.keys())) + len([key for key,val in after.items() if key in before and val != before[key]])
+            print('%-10s%10d%10d%16.3f%12.3f%10.1f%10d' % (name, len(proc.tables[name]), len(after), recordWall, groupWall, recordWall / groupWall if groupWall > 0 else 0, diff))
+            results.append([name, len(proc.tables[name]), len(after), recordWall, groupWall, diff])
+        return results
+    finally:
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+def runStages(rat, numBts, numCells, numRops, workers=1, formats=('xlsx',)):
+    #generate raw pm of one scale and run NgRawPmParser over it, run in a fresh process so that peak rss is of this scale only
+    logger = logging.getLogger('ngbench')
+    logger.setLevel(logging.ERROR)
+    tmpDir = tempfile.mkdtemp()
+    try:
+        inDir = os.path.join(tmpDir, 'raw_pm')
+        gen = NgPmGenerator(rat, numBts, numCells, numRops=numRops)
+        gen.generate(inDir, 'tar.gz' if rat == '5g' else 'xml.gz')
+        args = {'inDir':inDir, 'cacheDir':os.path.join(tmpDir, 'cache'), 'outDir':os.path.join(tmpDir, 'output'), 'parseWorkers':workers,
+                'incrementalParse':False, 'cacheKpiCatalogue':False, 'reportFormats':list(formats)}
+        parser = ngrawpmparser.NgRawPmParser(NgConsoleWin(logger=logger), rat, args)
+        return {'inBytes':dirSize(inDir), 'rows':sum([len(table.keys) for table in parser.data.values()]),
+                'counters':sum([int(table.valid.sum()) for table in parser.data.values()]), 'stages':{z['stage']:z['wall'] for z in parser.stats.stages}, 'peakRss':peakRss()}
+    finally:
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+def benchStages(rat='5g', scales=BENCH_SCALES, workers=1, formats=('xlsx',)):
+    #wall time of each stage of NgRawPmParser and peak rss at each scale
+    results = []
+    print('%-14s%10s%10s%12s' % ('scale', 'MB(in)', 'rows', 'counters') + ''.join(['%11s' % stage for stage in BENCH_STAGES]) + '%11s%12s' % ('total', 'peak MB'))
+    for numBts, numCells, numRops in scales:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(runStages, rat, numBts, numCells, numRops, workers, formats).result()
+        results.append([(numBts, numCells, numRops), result])
+        stages = result['stages']
+        print('%-14s%10.1f%10d%12d' % ('%dx%dx%d' % (numBts, numCells, numRops), result['inBytes'] / (1024 * 1024), result['rows'], result['counters'])
+              + ''.join(['%11.3f' % stages.get(stage, 0) for stage in BENCH_STAGES]) + '%11.3f%12s' % (sum(stages.values()), '%.1f' % result['peakRss'] if result['peakRss'] is not None else 'n/a'))
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of raw PM parser.')
+    parser.add_argument('bench', choices=['tar', 'kpi', 'stages', 'anomaly', 'csv', 'agg'])
+    parser.add_argument('--in', dest='inDir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data/raw_pm'))
+    parser.add_argument('--rat', default='5g')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--kpis', type=int, default=500)
+    parser.add_argument('--scales', default=','.join(['%dx%dx%d' % scale for scale in BENCH_SCALES]), help='BTSsxCELLSxROPS,...')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--dns', type=int, default=20000)
+    parser.add_argument('--format', dest='fmt', default='xlsx')
+    parser.add_argument('--bts', type=int, default=1000)
+    parser.add_argument('--periods', type=int, default=24)
+    parser.add_argument('--invalid', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.bench == 'tar':
+        benchTarIngest(args.inDir, args.rat)
+    elif args.bench == 'kpi':
+        benchKpiEngine(args.rows, args.kpis)
+    elif args.bench == 'stages':
+        benchStages(args.rat, [tuple([int(z) for z in scale.split('x')]) for scale in args.scales.split(',')], args.workers, args.fmt.split(','))
+    elif args.bench == 'anomaly':
+        benchAnomaly(args.dns)
+    elif args.bench == 'csv':
+        benchCsvLoad(args.bts, args.periods)
+    elif args.bench == 'agg':
+        benchCounterAgg(args.bts, args.periods, args.invalid)
@@ -0,0 +1,29 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngconsole.py
+Description:
+    Stand-in of NgMainWin for headless runs(e.g. raw pm parser in cron), which writes log to python logging.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import re
+import html
+import logging
+
+class NgLogEdit(object):
+    #stand-in of NgMainWin.logEdit: html tags are stripped, messages in purple/red are logged as warnings
+    def __init__(self, logger):
+        self.logger = logger
+
+    def append(self, text):
+        level = logging.WARNING if re.search(r'<font color=(purple|red)>', text) else logging.INFO
+        self.logger.log(level, html.unescape(re.sub(r'<[^>]+>', '', text)))
+
+class NgConsoleWin(object):
+    def __init__(self, enableDebug=False, logger=None):
+        self.enableDebug = enableDebug
+        self.logEdit = NgLogEdit(logger if logger is not None else logging.getLogger('5gnrgui'))
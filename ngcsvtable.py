@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngcsvtable.py
+Description:
+    Bulk typed loader of csv files(e.g. output/neds_*.csv of M8015 analyzer) into columnar NumPy tables.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import numpy as np
+
+class CsvTable(object):
+    #columns of a csv file:
+    #integer columns: int64 values with valid mask, text of invalid values(e.g. 'None' for null) is kept in others, as PmTable
+    #string columns: int32 codes into a dictionary of interned strings
+    def __init__(self):
+        self.numRows = 0
+        self.values = dict() #[key=column, val=int64 array]
+        self.valid = dict() #[key=column, val=bool array]
+        self.others = dict() #[key=column, val={row, text}] for invalid values of integer columns
+        self.codes = dict() #[key=column, val=int32 array]
+        self.strings = dict() #[key=column, val=list of strings], code -> string
+
+    def __len__(self):
+        return self.numRows
+
+    def isInt(self, name):
+        return name in self.values
+
+    def text(self, name, row):
+        #value of (row, column) as in csv
+        if name in self.codes:
+            return self.strings[name][self.codes[name][row]]
+        if self.valid[name][row]:
+            return str(self.values[name][row])
+        return self.others[name].get(row, '')
+
+    def texts(self, name, rows=None):
+        #values of column(for rows if given) as in csv
+        if name in self.codes:
+            strings = self.strings[name]
+            codes = self.codes[name] if rows is None else self.codes[name][rows]
+            return [strings[code] for code in codes.tolist()]
+        rows = np.arange(self.numRows) if rows is None else np.asarray(rows)
+        others = self.others[name]
+        return [str(value) if valid else others.get(row, '') for row,value,valid in zip(rows.tolist(), self.values[name][rows].tolist(), self.valid[name][rows].tolist())]
+
+def parseIntColumn(tokens):
+    #(int64 values, valid mask, {index, text} of invalid values) of a list of tokens
+    #tokens are converted by numpy at once, if it fails, invalid tokens are found among distinct tokens(few for counters),
+    #replaced by 0 and converted again, so tokens are not checked one by one
+    try:
+        return np.array(tokens, dtype=np.int64), np.ones(len(tokens), dtype=bool), dict()
+    except (ValueError, OverflowError):
+        pass
+    objs = np.array(tokens, dtype=object)
+    valid = np.ones(len(tokens), dtype=bool)
+    for token in set(tokens):
+        if not token.strip().lstrip('+-').isdigit():
+            valid[objs == token] = False
+    invalid = np.flatnonzero(~valid)
+    others = dict(zip(invalid.tolist(), objs[invalid].tolist()))
+    objs[invalid] = '0'
+    try:
+        #all tokens are digits now
+        values = objs.astype(np.int64)
+    except (ValueError, OverflowError):
+        #e.g. integers beyond int64
+        values = np.zeros(len(tokens), dtype=np.int64)
+        for i,token in enumerate(objs.tolist()):
+            try:
+                values[i] = int(token)
+            except (ValueError, OverflowError):
+                values[i] = 0
+                valid[i] = False
+                others[i] = token
+    return values, valid, others
+
+def splitRows(text, numCols):
+    #fields of lines of text by column(list of lists), as line.strip().split(',') of each non-empty line
+    #if every line has numCols fields, text is split once and columns are sliced out of it
+    #every line has numCols fields if separators(',' and '\n') of text are numCols-1 commas then a newline, repeatedly
+    numLines = text.count('\n') + 1
+    if '\n\n' not in text and '\r' not in text:
+        buf = np.frombuffer(text.encode(), dtype=np.uint8)
+        seps = buf[(buf == ord(',')) | (buf == ord('\n'))]
+        if len(seps) == numLines * numCols - 1 and np.array_equal(seps == ord('\n'), np.arange(len(seps)) % numCols == numCols - 1):
+            fields = text.replace('\n', ',').split(',')
+            return [fields[col::numCols] for col in range(numCols)], numLines
+    rows = [line.strip().split(',') for line in text.split('\n') if line.strip() != '']
+    for row in rows:
+        if len(row) < numCols:
+            raise ValueError('%d fields found in line(%s), %d expected' % (len(row), ','.join(row), numCols))
+    return [[row[col] for row in rows] for col in range(numCols)], len(rows)
+
+def loadCsvTable(fn, ints, strs, chunkBytes=1 << 24):
+    #load columns ints(as integers) and strs(as strings) of csv file fn, other columns are skipped
+    #text is read in chunks of about chunkBytes(cut at line end) and converted column by column, so no object is created per row
+    #as with line.split(','), quoted fields are not supported
+    table = CsvTable()
+    with open(fn, 'r') as f:
+        header = f.readline().strip().split(',')
+        index = {name:i for i,name in enumerate(header)}
+        for name in ints + strs:
+            if name not in index:
+                raise ValueError('column %s not found in %s' % (name, fn))
+
+        chunks = {name:[] for name in ints + strs}
+        dictIndex = {name:dict() for name in strs} #[key=string, val=code]
+        numRows = 0
+        rest = ''
+        while True:
+            data = f.read(chunkBytes)
+            text = rest + data
+            if data:
+                end = text.rfind('\n')
+                text, rest = (text[:end], text[end + 1:]) if end >= 0 else ('', text)
+            else:
+                rest = ''
+            text = text.strip('\n')
+            if text != '':
+                cols, n = splitRows(text, len(header))
+                for name in ints:
+                    values, valid, others = parseIntColumn(cols[index[name]])
+                    chunks[name].append((values, valid, {numRows + i:text for i,text in others.items()}))
+                for name in strs:
+                    d = dictIndex[name]
+                    chunks[name].append(np.array([d.setdefault(z, len(d)) for z in cols[index[name]]], dtype=np.int32))
+                numRows = numRows + n
+            if not data:
+                break
+
+    table.numRows = numRows
+    for name in ints:
+        table.values[name] = np.concatenate([z[0] for z in chunks[name]]) if chunks[name] else np.zeros(0, dtype=np.int64)
+        table.valid[name] = np.concatenate([z[1] for z in chunks[name]]) if chunks[name] else np.zeros(0, dtype=bool)
+        table.others[name] = dict()
+        for z in chunks[name]:
+            table.others[name].update(z[2])
+    for name in strs:
+        table.codes[name] = np.concatenate(chunks[name]) if chunks[name] else np.zeros(0, dtype=np.int32)
+        table.strings[name] = list(dictIndex[name].keys())
+    return table
+
+class CsvGroups(object):
+    #rows of a CsvTable grouped by key columns, groups are numbered in the order of their first rows(as keys inserted into a dict)
+    #rows are sorted by group once, then each column is reduced per group with np.*.reduceat
+    #invalid values of integer columns are masked per column: they are skipped by reductions of that column only
+    def __init__(self, table, keys):
+        self.keys = keys
+        numRows = len(table)
+        cols = []
+        for name in keys:
+            if table.isInt(name):
+                #invalid values of a key column are grouped by their text, e.g. all 'None'
+                codes = np.zeros(numRows, dtype=np.int64)
+                d = dict()
+                for row,text in table.others[name].items():
+                    codes[row] = d.setdefault(text, len(d))
+                cols.extend([table.valid[name], np.where(table.valid[name], table.values[name], codes)])
+            else:
+                cols.append(table.codes[name])
+
+        order = np.lexsort(cols[::-1]) if numRows > 0 else np.zeros(0, dtype=np.int64)
+        start = np.zeros(numRows, dtype=bool)
+        start[:1] = True
+        for col in cols:
+            sortedCol = col[order]
+            start[1:] = start[1:] | (sortedCol[1:] != sortedCol[:-1])
+        sortedIds = np.cumsum(start) - 1
+        #lexsort is stable, so the first row of a group in sorted order is its first row in table
+        first = order[start]
+        rank = np.argsort(first, kind='stable')
+        renumber = np.empty(len(first), dtype=np.int64)
+        renumber[rank] = np.arange(len(first))
+
+        self.numGroups = len(first)
+        self.first = first[rank] #first row of each group
+        self.ids = np.empty(numRows, dtype=np.int64) #group of each row
+        self.ids[order] = renumber[sortedIds]
+        self.order = order
+        self.starts = np.flatnonzero(start) #start of each group(numbered in sorted order) in sorted rows
+        self.renumber = renumber
+
+    def __len__(self):
+        return self.numGroups
+
+    def reduce(self, ufunc, values):
+        #ufunc.reduceat of values per group, in the order of groups
+        result = np.zeros(self.numGroups, dtype=values.dtype)
+        if self.numGroups > 0:
+            result[self.renumber] = ufunc.reduceat(values[self.order], self.starts)
+        return result
+
+    def count(self, table, name):
+        #number of valid values of column name per group
+        return self.reduce(np.add, table.valid[name].astype(np.int64))
+
+    def sum(self, table, name):
+        #sum of valid values of column name per group, 0 if none
+        return self.reduce(np.add, np.where(table.valid[name], table.values[name], 0))
+
+    def max(self, table, name, initial=0):
+        #max of initial and valid values of column name per group
+        return np.maximum(self.reduce(np.maximum, np.where(table.valid[name], table.values[name], initial)), initial)
+
+    def keyTexts(self, table, sep='_'):
+        #key of each group as texts of key columns joined by sep, e.g. 'lnbts_lncel'
+        return [sep.join(z) for z in zip(*[table.texts(name, self.first) for name in self.keys])]
+
+def denseCodes(cols):
+    #dense int64 code of each row of key columns(list of int64 arrays of the same length): rows of equal keys get equal codes
+    codes = np.zeros(len(cols[0]), dtype=np.int64)
+    for col in cols:
+        if len(col) == 0:
+            break
+        values, inverse = np.unique(col, return_inverse=True)
+        codes = codes * len(values) + inverse.reshape(-1)
+        values, codes = np.unique(codes, return_inverse=True)
+        codes = codes.reshape(-1)
+    return codes
+
+def lookupRows(tableKeys, keys, tableValid=None, valid=None, last=True):
+    #row of table whose key columns(tableKeys) equal keys(list of int64 arrays of the same columns), -1 if not found
+    #tableValid/valid(if given) mask out rows of table/keys with invalid key values
+    #of several rows of the same key, the last row is taken(last=True, as dict assignment row by row) or the first row
+    n = len(tableKeys[0])
+    codes = denseCodes([np.concatenate([t, k]) for t,k in zip(tableKeys, keys)])
+    tableCodes, keyCodes = codes[:n], codes[n:]
+    rows = np.arange(n)
+    if tableValid is not None:
+        tableCodes, rows = tableCodes[tableValid], rows[tableValid]
+    if not last:
+        tableCodes, rows = tableCodes[::-1], rows[::-1]
+    index = np.full(len(codes) + 1, -1, dtype=np.int64)
+    #with repeated codes, the last assignment wins
+    index[tableCodes] = rows
+    result = index[keyCodes]
+    if valid is not None:
+        result[~valid] = -1
+    return result
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngkpianomaly.py
+Description:
+    Vectorized KPI anomaly/degradation detection over KPI time series of all DNs: each ROP is compared with
+    the baseline(rolling mean/stdev or median/MAD) of previous ROPs of the same DN.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import warnings
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+#baseline methods
+ANOMALY_METHODS = ('std', 'mad')
+#direction of degradation: down(e.g. success rate), up(e.g. failures) or both
+ANOMALY_DIRECTIONS = ('down', 'up', 'both')
+#columns of ranked degradation list
+ANOMALY_HEADER = ['KPI', 'AGG', 'DN', 'STIME', 'INTERVAL', 'VALUE', 'BASELINE', 'SPREAD', 'SCORE']
+#scale of MAD(and mean absolute deviation) to be comparable with stdev for normal distribution
+MAD_SCALE = 1.4826
+MEANAD_SCALE = 1.2533
+
+def kpiMatrix(table, name):
+    #time series of kpi(name) of KpiTable as matrix(rows for dns, columns for stimes in ascending order), nan for NA or missing ROPs
+    #rows/columns are taken from interned dn/stime ids of PmKeys, without looking at keys of each row
+    pmKeys = table.pmKeys
+    dnIds, rows = np.unique(pmKeys.dnIds[table.ids], return_inverse=True)
+    stimeIds, cols = np.unique(pmKeys.stimeIds[table.ids], return_inverse=True)
+    stimes = [pmKeys.stimes[i] for i in stimeIds.tolist()]
+    order = np.argsort(np.array(stimes))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    matrix = np.full((len(dnIds), len(stimes)), np.nan)
+    matrix[rows.ravel(), rank[cols.ravel()]] = table.kpiValues(name)
+    #interval of the first row of each stime
+    firstRows = np.full(len(stimes), len(table.ids), dtype=np.int64)
+    np.minimum.at(firstRows, cols.ravel(), np.arange(len(table.ids)))
+    intervals = [int(pmKeys.keys[i][1]) for i in table.ids[firstRows[order]].tolist()]
+    return [pmKeys.dns[i] for i in dnIds.tolist()], [stimes[i] for i in order.tolist()], intervals, matrix
+
+def nanMedian(windows, counts):
+    #median of the last axis ignoring nan, counts is number of non-nan values, nan for empty windows
+    #nan is sorted to the end, so that the median is taken from the first counts values
+    s = np.sort(windows, axis=-1)
+    lo = np.clip((counts - 1) // 2, 0, windows.shape[-1] - 1)[..., np.newaxis]
+    hi = np.clip(counts // 2, 0, windows.shape[-1] - 1)[..., np.newaxis]
+    median = (np.take_along_axis(s, lo, axis=-1) + np.take_along_axis(s, hi, axis=-1))[..., 0] / 2
+    median[counts == 0] = np.nan
+    return median
+
+def rollingBaseline(matrix, window, method='mad'):
+    #baseline, spread and number of valid samples of the previous window ROPs of each (dn, ROP), ROP itself is excluded
+    numDns, numRops = matrix.shape
+    padded = np.concatenate((np.full((numDns, window), np.nan), matrix[:, :-1] if numRops > 0 else matrix), axis=1)
+    windows = sliding_window_view(padded, window, axis=1)[:, :numRops] #(dns, ROPs, window)
+    history = np.sum(~np.isnan(windows), axis=2)
+    with warnings.catch_warnings():
+        #all-nan windows(e.g. first ROPs) give nan with RuntimeWarning
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        if method == 'std':
+            baseline = np.nanmean(windows, axis=2)
+            spread = np.nanstd(windows, axis=2)
+        else:
+            baseline = nanMedian(windows, history)
+            deviations = np.abs(windows - baseline[:, :, np.newaxis])
+            spread = MAD_SCALE * nanMedian(deviations, history)
+            #MAD is 0 if more than half of the window is the same value, fall back to mean absolute deviation
+            spread = np.where(spread > 0, spread, MEANAD_SCALE * np.nanmean(deviations, axis=2))
+    return baseline, spread, history
+
+def detectAnomalies(table, name, direction='down', window=8, threshold=3.0, method='mad', minHistory=None):
+    #ROPs of KpiTable deviating from baseline by more than threshold x spread in direction of degradation
+    #spread is floored at 1% of |baseline| and 1% of median |kpi| of all dns, so that a change of a flat series is still scored on the scale of the kpi
+    #return list of [kpi, agg, dn, stime, interval, value, baseline, spread, score], where score > 0 is degradation
+    dns, stimes, intervals, matrix = kpiMatrix(table, name)
+    if matrix.size == 0:
+        return []
+    baseline, spread, history = rollingBaseline(matrix, window, method)
+    valid = ~np.isnan(matrix)
+    floor = max(0.01 * float(np.median(np.abs(matrix[valid]))) if valid.any() else 0, 1e-6)
+    spread = np.maximum(spread, np.maximum(0.01 * np.abs(baseline), floor))
+    with np.errstate(invalid='ignore'):
+        score = (matrix - baseline) / spread
+        if direction == 'down':
+            score = -score
+        elif direction == 'both':
+            score = np.abs(score)
+        flagged = (score > threshold) & (history >= (minHistory if minHistory is not None else max(1, window // 2)))
+    rows, cols = np.nonzero(flagged)
+    values = matrix[rows, cols].tolist()
+    baselines = baseline[rows, cols].tolist()
+    spreads = spread[rows, cols].tolist()
+    scores = score[rows, cols].tolist()
+    return [[name, table.agg, dns[r], stimes[c], intervals[c], values[i], baselines[i], spreads[i], scores[i]] for i,(r,c) in enumerate(zip(rows.tolist(), cols.tolist()))]
+
+def rankAnomalies(report, kpis, window=8, threshold=3.0, method='mad', minHistory=None):
+    #ranked degradation list of report={agg, KpiTable} for kpis=list of (name, direction), in descending order of score
+    anomalies = []
+    for name,direction in kpis:
+        for agg,table in report.items():
+            if name in table.names:
+                anomalies.extend(detectAnomalies(table, name, direction, window, threshold, method, minHistory))
+    anomalies.sort(key=lambda z:z[-1], reverse=True)
+    return anomalies
@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngkpiengine.py
+Description:
+    Vectorized KPI evaluation of kpi_def(kpi=f*x/y or kpi=x) over PM counter matrix.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import numpy as np
+from ngpmstore import gatherCounters
+
+#status of each kpi value
+KPI_OK = 0
+KPI_NA = 1
+KPI_DIV0 = 2
+
+#kind of kpi definition
+KPI_RATIO = 0 #kpi=f*x/y, with precision p
+KPI_SUM = 1 #kpi=x
+KPI_INVALID = 2
+
+#number of rows evaluated at a time, which limits the size of gathered counters and counter terms
+KPI_CHUNK_ROWS = 1024
+
+class KpiWeights(object):
+    #sparse weight matrix(counters x kpis) of x or y, stored column by column(kpi by kpi)
+    def __init__(self, terms, counterIndex):
+        #terms: list of (list of [counter, weight], or int constant, or None) per kpi
+        self.const = np.zeros(len(terms), dtype=np.int64)
+        self.hasTerms = np.zeros(len(terms), dtype=np.bool_)
+        cols = []
+        weights = []
+        starts = []
+        for k,term in enumerate(terms):
+            if isinstance(term, int):
+                self.const[k] = term
+            elif term is not None and len(term) > 0:
+                self.hasTerms[k] = True
+                starts.append(len(cols))
+                for counter,weight in term:
+                    cols.append(counterIndex[counter])
+                    weights.append(weight)
+        self.kpiCols = np.nonzero(self.hasTerms)[0] #kpis with counter terms
+        self.termCols = np.array(cols, dtype=np.int64) #counter column of each term
+        self.termWeights = np.array(weights, dtype=np.int64)
+        self.starts = np.array(starts, dtype=np.int64) #first term of each kpi in kpiCols
+        self.unitWeights = bool(np.all(self.termWeights == 1))
+
+    def apply(self, values, valid):
+        #return (values @ weights + const, True if all counters involved are valid)
+        n = values.shape[0]
+        out = np.tile(self.const, (n, 1))
+        ok = np.ones(out.shape, dtype=np.bool_)
+        if len(self.termCols) > 0:
+            terms = values[:, self.termCols]
+            if not self.unitWeights:
+                terms *= self.termWeights
+            out[:, self.kpiCols] += np.add.reduceat(terms, self.starts, axis=1)
+            ok[:, self.kpiCols] = np.logical_and.reduceat(valid[:, self.termCols], self.starts, axis=1)
+        return out, ok
+
+class KpiCompiled(object):
+    #kpi definitions of one aggregation level compiled into weight matrices
+    def __init__(self, agg, kpis):
+        #kpis: list of [name, f, x, y, p, agg] with x/y post-processed into int or list of [counter, weight]
+        self.agg = agg
+        self.kpis = kpis
+        self.names = [kpi[0] for kpi in kpis]
+        self.kinds = []
+        for name,f,x,y,p,a in kpis:
+            if f is not None and x is not None and y is not None and p is not None:
+                self.kinds.append(KPI_RATIO)
+            elif f is None and x is not None and y is None and p is None:
+                self.kinds.append(KPI_SUM)
+            else:
+                self.kinds.append(KPI_INVALID)
+        self.kinds = np.array(self.kinds, dtype=np.int8)
+        self.factors = np.array([kpi[1] if kpi[1] is not None else 1 for kpi in kpis], dtype=np.int64)
+        self.precisions = [kpi[4] for kpi in kpis]
+
+        #counter-to-column index of counters involved
+        self.counters = []
+        self.counterIndex = dict()
+        for kpi in kpis:
+            for term in (kpi[2], kpi[3]):
+                if isinstance(term, list):
+                    for counter,weight in term:
+                        if counter not in self.counterIndex:
+                            self.counterIndex[counter] = len(self.counters)
+                            self.counters.append(counter)
+
+        self.wx = KpiWeights([kpi[2] for kpi in kpis], self.counterIndex)
+        self.wy = KpiWeights([kpi[3] for kpi in kpis], self.counterIndex)
+
+    def evaluate(self, pmKeys, ids):
+        #evaluate kpis of ids of pmKeys(PmKeys) with counters from pmKeys.tables, return KpiTable
+        table = KpiTable(self.agg, pmKeys, ids, self.names, self.kinds, self.precisions)
+        ratio = (self.kinds == KPI_RATIO)
+        for start in range(0, len(ids), KPI_CHUNK_ROWS):
+            end = min(start + KPI_CHUNK_ROWS, len(ids))
+            values, valid = gatherCounters(pmKeys, ids[start:end], self.counters)
+            x, okx = self.wx.apply(values, valid)
+            y, oky = self.wy.apply(values, valid)
+
+            status = np.where(okx, KPI_OK, KPI_NA).astype(np.int8)
+            status[:, ratio] = np.where(okx[:, ratio] & oky[:, ratio], np.where(y[:, ratio] != 0, KPI_OK, KPI_DIV0), KPI_NA)
+            status[:, self.kinds == KPI_INVALID] = KPI_NA
+
+            #kpi=f*x/y, where y==0 is masked out
+            with np.errstate(divide='ignore', invalid='ignore'):
+                r = (self.factors * x) / np.where(y != 0, y, 1)
+            table.sums[start:end] = x
+            table.ratios[start:end] = r
+            table.status[start:end] = status
+        return table
+
+class KpiTable(object):
+    #kpi values of one aggregation level: rows for ids of pmKeys(PmKeys), columns for kpis
+    def __init__(self, agg, pmKeys, ids, names, kinds, precisions):
+        self.agg = agg
+        self.pmKeys = pmKeys
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = names
+        self.kinds = kinds
+        self.precisions = precisions
+        self.sums = np.zeros((len(ids), len(names)), dtype=np.int64) #x for kpi=x
+        self.ratios = np.zeros((len(ids), len(names)), dtype=np.float64) #f*x/y for kpi=f*x/y
+        self.status = np.zeros((len(ids), len(names)), dtype=np.int8)
+
+    @property
+    def keys(self):
+        #(stime, interval, dn) of rows
+        keys = self.pmKeys.keys
+        return [keys[i] for i in self.ids.tolist()]
+
+    def rowValues(self, row):
+        #kpi values of row for export, with the same format as scalar kpi calculation: 'NA' if any counter is missing, 0 if y is 0
+        return self.formatValues(self.sums[row].tolist(), self.ratios[row].tolist(), self.status[row].tolist())
+
+    def formatValues(self, sums, ratios, status):
+        values = []
+        for k in range(len(self.names)):
+            if status[k] == KPI_NA:
+                values.append('NA')
+            elif status[k] == KPI_DIV0:
+                values.append(0)
+            elif self.kinds[k] == KPI_RATIO:
+                values.append('{:0.{precision}f}'.format(ratios[k], precision=self.precisions[k]))
+            else:
+                values.append(sums[k])
+        return values
+
+    def iterRows(self, chunkRows=4096):
+        #rows of [stime, interval, dn, kpi values...] for export, arrays are converted chunk by chunk
+        keys = self.pmKeys.keys
+        for start in range(0, len(self.ids), chunkRows):
+            end = min(start + chunkRows, len(self.ids))
+            ids = self.ids[start:end].tolist()
+            sums = self.sums[start:end].tolist()
+            ratios = self.ratios[start:end].tolist()
+            status = self.status[start:end].tolist()
+            for i in range(end - start):
+                row = list(keys[ids[i]])
+                row.extend(self.formatValues(sums[i], ratios[i], status[i]))
+                yield row
+
+    def take(self, rows):
+        #KpiTable of selected rows
+        table = KpiTable(self.agg, self.pmKeys, self.ids[rows], self.names, self.kinds, self.precisions)
+        table.sums = self.sums[rows]
+        table.ratios = self.ratios[rows]
+        table.status = self.status[rows]
+        return table
+
+    def kpiValues(self, name):
+        #values of kpi(name) as float, nan for 'NA'
+        k = self.names.index(name)
+        values = (self.ratios[:, k] if self.kinds[k] == KPI_RATIO else self.sums[:, k].astype(np.float64)).copy()
+        values[self.status[:, k] == KPI_DIV0] = 0
+        values[self.status[:, k] == KPI_NA] = np.nan
+        return values
+
+    def numNa(self):
+        #number of 'NA' per kpi
+        return (self.status == KPI_NA).sum(axis=0)
+
+def argmaxByGroup(groups, values):
+    #row with max value(nan is ignored, the first row wins on tie) of each group
+    values = np.where(np.isnan(values), -np.inf, values)
+    order = np.lexsort((-values, groups))
+    first = np.nonzero(np.diff(np.concatenate(([-1], groups[order]))))[0]
+    return order[first]
+
+def busyHourRows(table, name):
+    #for hourly KpiTable, rows of the busy hour of each (day, dn) by kpi(name)
+    index = dict()
+    groups = np.array([index.setdefault((key[0][:10], key[2]), len(index)) for key in table.keys], dtype=np.int64)
+    return np.sort(argmaxByGroup(groups, table.kpiValues(name)))
+
+def busyHours(table, name):
+    #for hourly KpiTable, stime of the busy hour of each day by kpi(name) summed over all dns: {day, stime}
+    keys = table.keys
+    hours = sorted(set([key[0] for key in keys]))
+    hourIndex = {hour:i for i,hour in enumerate(hours)}
+    rows = np.array([hourIndex[key[0]] for key in keys], dtype=np.int64)
+    total = np.bincount(rows, weights=np.nan_to_num(table.kpiValues(name)), minlength=len(hours))
+    dayIndex = dict()
+    groups = np.array([dayIndex.setdefault(hour[:10], len(dayIndex)) for hour in hours], dtype=np.int64)
+    return {hours[i][:10]:hours[i] for i in argmaxByGroup(groups, total).tolist()}
@@ -12,7 +12,44 @@ Change History:
 
 import os
 import time
-from PyQt5.QtWidgets import qApp
+import traceback
+import numpy as np
+try:
+    from PyQt5.QtWidgets import qApp
+except ImportError:
+    #headless run without PyQt5, e.g. ngbench.py
+    qApp = None
+from ngcsvtable import loadCsvTable, CsvGroups, denseCodes, lookupRows
+from ngnbrgraph import NgNbrGraph
+
+#schema of neds_*.csv: [key=table, val=(csv file, integer columns, string columns)], other columns are not loaded
+NEDS_SCHEMAS = {
+    'lncel': ('neds_lncel.csv', ['LNBTS_ID', 'LNCEL_ID', 'ENB_ID', 'LCR_ID', 'ECI', 'EARFCN', 'PCI', 'TAC'],
+              ['TH1', 'A3_OFF', 'HYS_A3_OFF', 'A3_REP_INT', 'A3_TTT', 'A5_TH3', 'A5_TH3A', 'HYS_A5_TH3', 'A5_REP_INT', 'A5_TTT',
+               'A2_TH2_IF', 'HYS_A2_TH2_IF', 'A2_TTT', 'A1_TH2A', 'HYS_A1_TH2A', 'A1_TTT']),
+    'lnadj': ('neds_lnadj.csv', ['LNBTS_ID', 'ADJ_ENB_ID'], ['CO_DN', 'ADJ_ENB_IP', 'X2_STAT']),
+    'lnadjl': ('neds_lnadjl.csv', ['LNBTS_ID', 'ADJ_ENB_ID', 'ADJ_LCR_ID', 'ADJ_EARFCN', 'ADJ_PCI', 'ADJ_TAC'], ['CO_DN']),
+    'lnhoif': ('neds_lnhoif.csv', ['LNCEL_ID', 'IF_EARFCN'],
+               ['CO_DN', 'IF_A3_OFF', 'IF_HYS_A3_OFF', 'IF_A3_REP_INT', 'IF_A3_TTT', 'IF_A5_TH3', 'IF_A5_TH3A', 'IF_HYS_A5_TH3', 'IF_A5_REP_INT', 'IF_A5_TTT', 'IF_MBW']),
+    'irfim': ('neds_irfim.csv', ['LNCEL_ID', 'IF_EARFCN'], ['CO_DN', 'IF_RES_PRIO', 'IF_RXLEV_MIN', 'IF_TH_LOW', 'IF_TH_HIGH', 'IF_MBW']),
+    'lnrel': ('neds_lnrel.csv', ['LNCEL_ID', 'ADJ_ENB_ID', 'ADJ_LCR_ID'], ['CO_DN', 'CIO', 'HO_ALLOWED', 'NR_STAT']),
+    'm8015': ('neds_m8015.csv', ['LNBTS_ID', 'LNCEL_ID', 'ECI_ID', 'INTRA_HO_PREP_FAIL_NB', 'INTRA_HO_ATT_NB', 'INTRA_HO_SUCC_NB', 'INTRA_HO_FAIL_NB',
+                                 'INTER_HO_PREP_FAIL_OTH_NB', 'INTER_HO_PREP_FAIL_TIME_NB', 'INTER_HO_PREP_FAIL_AC_NB', 'INTER_HO_PREP_FAIL_QCI_NB',
+                                 'INTER_HO_ATT_NB', 'INTER_HO_SUCC_NB', 'INTER_HO_FAIL_NB', 'MRO_LATE_HO_NB', 'MRO_EARLY_TYPE1_HO_NB', 'MRO_EARLY_TYPE2_HO_NB',
+                                 'MRO_PING_PONG_HO_NB', 'HO_LB_IF_ATT_NB', 'HO_LB_IF_SUCC_NB'], ['PERIOD_START_TIME']),
+    'm8001': ('neds_m8001.csv', ['LNBTS_ID', 'LNCEL_ID', 'RACH_STP_ATT_SMALL_MSG', 'RACH_STP_ATT_LARGE_MSG', 'RACH_STP_ATT_DEDICATED', 'RACH_STP_COMPLETIONS'], []),
+    'm8005': ('neds_m8005.csv', ['LNBTS_ID', 'LNCEL_ID', 'RSSI_PUCCH_AVG', 'RSSI_PUSCH_AVG', 'SINR_PUCCH_AVG', 'SINR_PUSCH_AVG'], []),
+    'm8006': ('neds_m8006.csv', ['LNBTS_ID', 'LNCEL_ID', 'EPS_BEARER_SETUP_ATTEMPTS', 'EPS_BEARER_SETUP_COMPLETIONS',
+                                 'ERAB_INI_SETUP_FAIL_RNL_RRNA', 'ERAB_ADD_SETUP_FAIL_RNL_RRNA', 'ERAB_INI_SETUP_FAIL_TNL_TRU', 'ERAB_ADD_SETUP_FAIL_TNL_TRU',
+                                 'ERAB_INI_SETUP_FAIL_RNL_UEL', 'ERAB_ADD_SETUP_FAIL_RNL_UEL', 'ERAB_INI_SETUP_FAIL_RNL_RIP', 'ERAB_ADD_SETUP_FAIL_RNL_RIP',
+                                 'ERAB_ADD_SETUP_FAIL_UP', 'ERAB_ADD_SETUP_FAIL_RNL_MOB', 'ERAB_REL_ENB_QCI1', 'ERAB_REL_ENB_RNL_INA_QCI1',
+                                 'ERAB_REL_ENB_RNL_UEL_QCI1', 'ERAB_REL_ENB_TNL_TRU_QCI1', 'ERAB_REL_ENB_RNL_RED_QCI1', 'ERAB_REL_ENB_RNL_EUGR_QCI1',
+                                 'ERAB_REL_ENB_RNL_RRNA_QCI1', 'ERAB_REL_HO_FAIL_TIM_QCI1', 'ERAB_REL_EPC_PATH_SWITCH_QCI1', 'ERAB_REL_ENB_TNL_UNSP_QCI1'], []),
+    'm8007': ('neds_m8007.csv', ['LNBTS_ID', 'LNCEL_ID', 'DATA_RB_STP_ATT', 'DATA_RB_STP_COMP', 'DATA_RB_STP_FAIL'], []),
+    'm8013': ('neds_m8013.csv', ['LNBTS_ID', 'LNCEL_ID', 'SIGN_CONN_ESTAB_ATT_MO_S', 'SIGN_CONN_ESTAB_ATT_MT', 'SIGN_CONN_ESTAB_ATT_MO_D', 'SIGN_CONN_ESTAB_ATT_EMG',
+                                 'SIGN_CONN_ESTAB_ATT_HIPRIO', 'SIGN_CONN_ESTAB_ATT_DEL_TOL', 'SIGN_CONN_ESTAB_COMP'], []),
+    'm8051': ('neds_m8051.csv', ['LNBTS_ID', 'LNCEL_ID', 'RRC_CONNECTED_UE_AVG', 'RRC_CONNECTED_UE_MAX', 'CELL_LOAD_ACTIVE_UE_AVG', 'CELL_LOAD_ACTIVE_UE_MAX'], []),
+    }
 
 class M8015(object):
     def __init__(self):
@@ -141,111 +178,52 @@ class M8051(object):
         _list = list(map(str, _list))
         return ','.join(_list)
 
-class Lncel(object):
-    def __init__(self):
-        self.lnbtsId = None
-        self.enbId = None
-        self.lcrId = None
-        self.eci = None
-        self.earfcn = None
-        self.pci = None
-        self.tac = None
-        self.th1 = None
-        self.a3Off = None
-        self.hysA3off = None
-        self.a3RepInt = None
-        self.a3Ttt = None
-        self.a5Th3 = None
-        self.a5Th3a = None
-        self.hysA5Th3 = None
-        self.a5RepInt = None
-        self.a5Ttt = None
-        self.a2Th2If = None
-        self.hysA2Th2If = None
-        self.a2Ttt = None
-        self.a1Th2a = None
-        self.hysA1Th2a = None
-        self.a1Ttt = None
-    
-    def __str__(self):
-        _list = [self.enbId, self.lcrId, self.eci, self.earfcn, self.pci, self.tac, self.th1,
-                 self.a3Off, self.hysA3Off, self.a3RepInt, self.a3Ttt,
-                 self.a5Th3, self.a5Th3a, self.hysA5Th3, self.a5RepInt, self.a5Ttt,
-                 self.a2Th2If, self.hysA2Th2If, self.a2Ttt,
-                 self.a1Th2a, self.hysA1Th2a, self.a1Ttt]
-        return ','.join(_list)
-
-class Lnadj(object):
-    def __init__(self):
-        self.coDn = None
-        self.adjEnbId = None
-        self.adjEnbIp = None
-        self.x2Stat = None
-        
-    def __str__(self):
-        _list = [self.coDn, self.adjEnbId, self.adjEnbIp, self.x2Stat]
-        return ','.join(_list)
-    
-class Lnadjl(object):
-    def __init__(self):
-        self.coDn = None
-        self.adjEnbId = None
-        self.adjLcrId = None
-        self.adjEarfcn = None
-        self.adjPci = None
-        self.adjTac = None
-        
-    def __str__(self):
-        _list = [self.coDn, self.adjEnbId, self.adjLcrId, self.adjEarfcn, self.adjPci, self.adjTac]
-        return ','.join(_list)
-    
-class Lnhoif(object):
-    def __init__(self):
-        self.coDn = None
-        self.ifEarfcn = None
-        self.ifA3Off = None
-        self.ifHysA3off = None
-        self.ifA3RepInt = None
-        self.ifA3Ttt = None
-        self.ifA5Th3 = None
-        self.ifA5Th3a = None
-        self.ifHysA5Th3 = None
-        self.ifA5RepInt = None
-        self.ifA5Ttt = None
-        self.ifMbw = None
-        
-    def __str__(self):
-        _list = [self.coDn, self.ifEarfcn, self.ifA3Off, self.ifHysA3Off, self.ifA3RepInt, self.ifA3Ttt,
-                 self.ifA5Th3, self.ifA5Th3a, self.ifHysA5Th3, self.ifA5RepInt, self.ifA5Ttt, self.ifMbw]
-        return ','.join(_list)
-
-class Irfim(object):
-    def __init__(self):
-        self.coDn = None
-        self.ifEarfcn = None
-        self.ifResPrio = None
-        self.ifRxlevMin = None
-        self.ifThLow = None
-        self.ifThHigh = None
-        self.ifMbw = None
-        
-    def __str__(self):
-        _list = [self.coDn, self.ifEarfcn, self.ifResPrio, self.ifRxlevMin, self.ifThLow, self.ifThHigh, self.ifMbw]
-        return ','.join(_list)
-    
-class Lnrel(object):
-    def __init__(self):
-        self.coDn = None
-        #self.adjEnbId = None
-        #self.adjLcrId = None
-        self.cio = None
-        self.hoAllowed = None
-        self.nrStat = None
-        
-    def __str__(self):
-        _list = [self.coDn, #self.adjEnbId, self.adjLcrId, 
-                 self.cio, self.hoAllowed, self.nrStat]
-        return ','.join(_list)
+#aggregation of counter tables: [key=table of NEDS_SCHEMAS, val=(class of aggregated record, key columns, list of (attribute, column, sum|avg|max))]
+#avg is rounded to 2 decimals, or 'DIV0' if no valid values, max is no less than 0
+M80XX_AGGS = {
+    'm8015': (M8015, ['LNBTS_ID', 'LNCEL_ID', 'ECI_ID'],
+              [('iaHoPrepFail', 'INTRA_HO_PREP_FAIL_NB', 'sum'), ('iaHoAtt', 'INTRA_HO_ATT_NB', 'sum'), ('iaHoSucc', 'INTRA_HO_SUCC_NB', 'sum'),
+               ('iaHoFailTime', 'INTRA_HO_FAIL_NB', 'sum'), ('irHoPrepFailOth', 'INTER_HO_PREP_FAIL_OTH_NB', 'sum'),
+               ('irHoPrepFailTime', 'INTER_HO_PREP_FAIL_TIME_NB', 'sum'), ('irHoPrepFailAc', 'INTER_HO_PREP_FAIL_AC_NB', 'sum'),
+               ('irHoPrepFailQci', 'INTER_HO_PREP_FAIL_QCI_NB', 'sum'), ('irHoAtt', 'INTER_HO_ATT_NB', 'sum'), ('irHoSucc', 'INTER_HO_SUCC_NB', 'sum'),
+               ('irHoFailTime', 'INTER_HO_FAIL_NB', 'sum'), ('mroLateHo', 'MRO_LATE_HO_NB', 'sum'), ('mroEarlyType1Ho', 'MRO_EARLY_TYPE1_HO_NB', 'sum'),
+               ('mroEarlyType2Ho', 'MRO_EARLY_TYPE2_HO_NB', 'sum'), ('mroPingPongHo', 'MRO_PING_PONG_HO_NB', 'sum'),
+               ('ifLbHoAtt', 'HO_LB_IF_ATT_NB', 'sum'), ('ifLbHoSucc', 'HO_LB_IF_SUCC_NB', 'sum')]),
+    'm8001': (M8001, ['LNBTS_ID', 'LNCEL_ID'],
+              [('smallMsg1Att', 'RACH_STP_ATT_SMALL_MSG', 'sum'), ('largeMsg1Att', 'RACH_STP_ATT_LARGE_MSG', 'sum'),
+               ('dedMsg1Att', 'RACH_STP_ATT_DEDICATED', 'sum'), ('rachMsg2', 'RACH_STP_COMPLETIONS', 'sum')]),
+    'm8005': (M8005, ['LNBTS_ID', 'LNCEL_ID'],
+              [('avgRssiPucch', 'RSSI_PUCCH_AVG', 'avg'), ('avgRssiPusch', 'RSSI_PUSCH_AVG', 'avg'),
+               ('avgSinrPucch', 'SINR_PUCCH_AVG', 'avg'), ('avgSinrPusch', 'SINR_PUSCH_AVG', 'avg')]),
+    'm8006': (M8006, ['LNBTS_ID', 'LNCEL_ID'],
+              [('erabSetupAtt', 'EPS_BEARER_SETUP_ATTEMPTS', 'sum'), ('erabSetupSucc', 'EPS_BEARER_SETUP_COMPLETIONS', 'sum'),
+               ('erabSetupFailRrnaIni', 'ERAB_INI_SETUP_FAIL_RNL_RRNA', 'sum'), ('erabSetupFailRrnaAdd', 'ERAB_ADD_SETUP_FAIL_RNL_RRNA', 'sum'),
+               ('erabSetupFailTruIni', 'ERAB_INI_SETUP_FAIL_TNL_TRU', 'sum'), ('erabSetupFailTruAdd', 'ERAB_ADD_SETUP_FAIL_TNL_TRU', 'sum'),
+               ('erabSetupFailUelIni', 'ERAB_INI_SETUP_FAIL_RNL_UEL', 'sum'), ('erabSetupFailUelAdd', 'ERAB_ADD_SETUP_FAIL_RNL_UEL', 'sum'),
+               ('erabSetupFailRipIni', 'ERAB_INI_SETUP_FAIL_RNL_RIP', 'sum'), ('erabSetupFailRipAdd', 'ERAB_ADD_SETUP_FAIL_RNL_RIP', 'sum'),
+               ('erabSetupFailUp', 'ERAB_ADD_SETUP_FAIL_UP', 'sum'), ('erabSetupFailMob', 'ERAB_ADD_SETUP_FAIL_RNL_MOB', 'sum'),
+               ('erabRelQci1Tot', 'ERAB_REL_ENB_QCI1', 'sum'), ('erabRelQci1Ina', 'ERAB_REL_ENB_RNL_INA_QCI1', 'sum'),
+               ('erabRelQci1UeLost', 'ERAB_REL_ENB_RNL_UEL_QCI1', 'sum'), ('erabRelQci1Tru', 'ERAB_REL_ENB_TNL_TRU_QCI1', 'sum'),
+               ('erabRelQci1Red', 'ERAB_REL_ENB_RNL_RED_QCI1', 'sum'), ('erabRelQci1Eugr', 'ERAB_REL_ENB_RNL_EUGR_QCI1', 'sum'),
+               ('erabRelQci1Rrna', 'ERAB_REL_ENB_RNL_RRNA_QCI1', 'sum'), ('erabRelQci1HoFail', 'ERAB_REL_HO_FAIL_TIM_QCI1', 'sum'),
+               ('erabRelQci1EpcPs', 'ERAB_REL_EPC_PATH_SWITCH_QCI1', 'sum'), ('erabRelQci1TnlUnsp', 'ERAB_REL_ENB_TNL_UNSP_QCI1', 'sum')]),
+    'm8007': (M8007, ['LNBTS_ID', 'LNCEL_ID'],
+              [('drbSetupAtt', 'DATA_RB_STP_ATT', 'sum'), ('drbSetupSucc', 'DATA_RB_STP_COMP', 'sum'), ('drbSetupFailTimer', 'DATA_RB_STP_FAIL', 'sum')]),
+    'm8013': (M8013, ['LNBTS_ID', 'LNCEL_ID'],
+              [('rrcMsg3Mos', 'SIGN_CONN_ESTAB_ATT_MO_S', 'sum'), ('rrcMsg3Mt', 'SIGN_CONN_ESTAB_ATT_MT', 'sum'), ('rrcMsg3Mod', 'SIGN_CONN_ESTAB_ATT_MO_D', 'sum'),
+               ('rrcMsg3Emg', 'SIGN_CONN_ESTAB_ATT_EMG', 'sum'), ('rrcMsg3HiPrio', 'SIGN_CONN_ESTAB_ATT_HIPRIO', 'sum'),
+               ('rrcMsg3DelTol', 'SIGN_CONN_ESTAB_ATT_DEL_TOL', 'sum'), ('rrcMsg5', 'SIGN_CONN_ESTAB_COMP', 'sum')]),
+    'm8051': (M8051, ['LNBTS_ID', 'LNCEL_ID'],
+              [('avgUeRrcConn', 'RRC_CONNECTED_UE_AVG', 'avg'), ('maxUeRrcConn', 'RRC_CONNECTED_UE_MAX', 'max'),
+               ('avgUeAct', 'CELL_LOAD_ACTIVE_UE_AVG', 'avg'), ('maxUeAct', 'CELL_LOAD_ACTIVE_UE_MAX', 'max')]),
+    }
+
+#ranking metrics of worst relations of user case #02: failures(HO preparation and execution), lowest HOSR2, MRO late/early/ping-pong HO
+M8015_RANK_METRICS = ('fail', 'hosr', 'mro_late', 'mro_early', 'mro_ppong')
+
+#counters of M8015 counted as HO attempts of a relation: HO preparations and executions, intra and inter eNB
+M8015_HO_COUNTERS = ['INTRA_HO_PREP_FAIL_NB', 'INTRA_HO_ATT_NB', 'INTER_HO_PREP_FAIL_AC_NB', 'INTER_HO_PREP_FAIL_OTH_NB',
+                     'INTER_HO_PREP_FAIL_QCI_NB', 'INTER_HO_PREP_FAIL_TIME_NB', 'INTER_HO_ATT_NB']
 
 class HoStat(object):
     def __init__(self):
@@ -266,43 +244,102 @@ class HoStat(object):
         _list = list(map(_list, str))
         return ','.join(_list)
         
+def parseTopN(token):
+    #number of relations, 0 for all
+    n = int(token)
+    if n < 0:
+        raise ValueError('invalid top n: %s' % token)
+    return n
+
+def parseRankMetric(token):
+    #one of M8015_RANK_METRICS
+    token = token.strip().lower()
+    if token not in M8015_RANK_METRICS:
+        raise ValueError('invalid ranking metric: %s' % token)
+    return token
+
+def rankRows(score, fail, k=0):
+    #rows in descending order of score, then of fail(rows of equal score and fail keep their order), only the first k rows if k > 0
+    #with k > 0, rows of the top k scores are picked by np.argpartition in linear time, so only about k rows are sorted
+    rows = np.arange(len(score))
+    if 0 < k < len(score):
+        kth = score[np.argpartition(score, len(score) - k)[len(score) - k]]
+        rows = np.flatnonzero(score >= kth)
+    order = rows[np.lexsort((rows, -fail[rows], -score[rows]))]
+    return order[:k] if k > 0 else order
+
+def valuesNa(values, rows):
+    #values[rows] as objects, 'NA' where rows < 0(not found by lookupRows)
+    result = np.full(len(rows), 'NA', dtype=object)
+    found = rows >= 0
+    result[found] = values[rows[found]].tolist()
+    return result
+
+def sumNa(arrays, rows):
+    #sum of arrays at rows, 'NA' where rows < 0
+    return valuesNa(np.sum(arrays, axis=0), rows)
+
+def ratioNa(num, den, rows):
+    #100*num/den in % rounded to 2 decimals, 'DIV0' if den is 0, 'NA' where rows < 0
+    result = np.full(len(rows), 'NA', dtype=object)
+    found = np.flatnonzero(rows >= 0)
+    result[found] = [round(100 * n / d, 2) if d > 0 else 'DIV0' for n,d in zip(num[found].tolist(), den[found].tolist())]
+    return result
+
+def textsNa(table, name, rows):
+    #texts of column name of CsvTable at rows, 'NA' where rows < 0
+    result = np.full(len(rows), 'NA', dtype=object)
+    found = rows >= 0
+    result[found] = table.texts(name, rows[found])
+    return result
+
+def joinTextsNa(table, names, rows):
+    #texts of columns names of CsvTable at rows joined by '_', 'NA' where rows < 0
+    result = np.full(len(rows), 'NA', dtype=object)
+    found = rows >= 0
+    result[found] = ['_'.join(z) for z in zip(*[table.texts(name, rows[found]) for name in names])]
+    return result
+
+def dnsNa(table, rows):
+    #CO_DN of CsvTable at rows without the leading PLMN, 'NA' where rows < 0
+    #dn of each distinct CO_DN is made once
+    dns = np.array(['/'.join(z.split('/')[1:]) for z in table.strings['CO_DN']], dtype=object)
+    result = np.full(len(rows), 'NA', dtype=object)
+    found = rows >= 0
+    result[found] = dns[table.codes['CO_DN'][rows[found]]]
+    return result
+
+def lastRows(keys):
+    #{key, row} of keys(one per row of a CsvTable, e.g. texts of key columns): the last row of each key in the order of its first row,
+    #as dict assignment row by row
+    rows = dict()
+    for row,key in enumerate(keys):
+        rows[key] = row
+    return rows
+
 class NgM8015Proc(object):
-    def __init__(self, ngwin):
+    def __init__(self, ngwin, csvDir=None, args=None):
         self.ngwin = ngwin
+        #directory of neds_*.csv exported by NgSqlQuery
+        self.csvDir = csvDir if csvDir is not None else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
+        
+        #parse M8015 analyzer configuration, args(if any) overrides m8015_config.txt
+        self.args = dict()
+        self.args['topN'] = 0
+        self.args['topNMetric'] = 'fail'
+        self.parseM8015Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'm8015_config.txt'))
+        #args are checked as values of m8015_config.txt, invalid ones are ignored
+        if args is not None:
+            for key,val in args.items():
+                try:
+                    if key == 'topN':
+                        val = parseTopN(str(val))
+                    elif key == 'topNMetric':
+                        val = parseRankMetric(str(val))
+                    self.args[key] = val
+                except ValueError as e:
+                    self.ngwin.logEdit.append('<font color=purple>Invalid M8015 analyzer argument(%s=%s), which will be ignored!</font>' % (key, val))
         
-        #connection defined as below:
-        #m8015Data.key.lncel_id == lncelData.key
-        #m8015Data.key.lncel_id == lnhoifData.key
-        #m8015Data.key.lncel_id == lnrelData.key.lncel_id
-        #m8015Data.key.lnbts_id == lnadjData.key
-        #m8015Data.key.lnbts_id == lnadjlData.key
-        self.m8015Data= dict() #[key='m8015.lnbts_id+m8015.lncel_id+m8015.eci_id', val=list of M8015]
-        self.m8015AggData= dict() #[key='m8015.lnbts_id+m8015.lncel_id+m8015.eci_id', val=aggregated M8015]
-        
-        self.m8001Data= dict() #[key='m8001.lnbts_id+m8001.lncel_id', val=list of M8001]
-        self.m8001AggData= dict() #[key='m8001.lnbts_id+m8001.lncel_id', val=aggregated M8001]
-
-        self.m8007Data= dict() #[key='m8007.lnbts_id+m8007.lncel_id', val=list of M8007]
-        self.m8007AggData= dict() #[key='m8007.lnbts_id+m8007.lncel_id', val=aggregated M8007]
-
-        self.m8005Data= dict() #[key='m8005.lnbts_id+m8005.lncel_id', val=list of M8005]
-        self.m8005AggData= dict() #[key='m8005.lnbts_id+m8005.lncel_id', val=aggregated M8005]
-        
-        self.m8006Data= dict() #[key='m8006.lnbts_id+m8006.lncel_id', val=list of M8006]
-        self.m8006AggData= dict() #[key='m8006.lnbts_id+m8006.lncel_id', val=aggregated M8006]
-        
-        self.m8013Data= dict() #[key='m8013.lnbts_id+m8013.lncel_id', val=list of M8013]
-        self.m8013AggData= dict() #[key='m8013.lnbts_id+m8013.lncel_id', val=aggregated M8013]
-        
-        self.m8051Data= dict() #[key='m8051.lnbts_id+m8051.lncel_id', val=list of M8051]
-        self.m8051AggData= dict() #[key='m8051.lnbts_id+m8051.lncel_id', val=aggregated M8051]
-        
-        self.lncelData = dict() #[key=lncel.lncel_id, val=Lncel]
-        self.lnadjData = dict() #[key=lnadj.lnbts_id, val=Lnadj]
-        self.lnadjlData = dict() #[key=lnadjl.lnbts_id, val=Lnadjl]
-        self.lnhoifData = dict() #[key=lnhoif.lncel_id+lnhoif.if_earfcn, val=Lnhoif]
-        self.irfimData = dict() #[key=irfim.lncel_id+irfim.if_earfcn, val=Irfim]
-        self.lnrelData = dict() #[key='lnrel.lncel_id+lnrel.adj_enb_id+lnrel.adj_lcr_id', val=Lnrel]
         self.gridData = [] #optional data for atu grid, enbid+lcrid
         
         self.lnbtsIdLncelIdMap = dict() #[key=ECI, val=lnbts_id+lncel_id]
@@ -316,45 +353,65 @@ class NgM8015Proc(object):
         self.earfcnLnhoif = dict() #[key=enbid+lcrid, val=list of lnhoif earfcn]
         self.earfcnIrfim = dict() #[key=enbid+lcrid, val=list of irfim earfcn]
 
+        #connection defined as below:
+        #m8015.lncel_id == lncel.lncel_id
+        #m8015.lncel_id == lnhoif.lncel_id
+        #m8015.lncel_id == lnrel.lncel_id
+        #m8015.lnbts_id == lnadj.lnbts_id
+        #m8015.lnbts_id == lnadjl.lnbts_id
+        self.tables = dict() #[key=table of NEDS_SCHEMAS, val=CsvTable]
+        self.aggCols = dict() #[key=table of M80XX_AGGS, val=(CsvGroups, {attribute, values per group})]
+
         self.ngwin.logEdit.append('<font color=blue>M8015 analyzer initialized!</font>')
     
+    def parseM8015Config(self, fn):
+        try:
+            with open(fn, 'r') as f:
+                self.ngwin.logEdit.append('<font color=blue>Parsing M8015 analyzer configuration: %s</font>' % fn)
+                processEvents()
+                
+                while True:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.startswith('#') or line.strip() == '':
+                        continue
+                    
+                    tokens = line.split('=')
+                    tokens = list(map(lambda x:x.strip(), tokens))
+                    if len(tokens) == 2:
+                        if tokens[0].lower() == 'top_n':
+                            self.args['topN'] = parseTopN(tokens[1])
+                        elif tokens[0].lower() == 'top_n_metric':
+                            self.args['topNMetric'] = parseRankMetric(tokens[1])
+                        else:
+                            pass
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+    
     def loadCsvData(self):
-        self.loadLncel()
-        self.loadLnadj()
-        self.loadLnadjl()
-        self.loadLnhoif()
-        self.loadIrfim()
-        self.loadLnrel()
-        self.loadM8015()
-        self.loadM8001()
-        self.loadM8005()
-        self.loadM8006()
-        self.loadM8007()
-        self.loadM8013()
-        self.loadM8051()
+        #all tables are bulk loaded once(as used by all user cases), counter tables are aggregated by aggCounters
+        self.loadCsvTables()
+        for name in M80XX_AGGS.keys():
+            self.aggCounters(name)
         self.loadOpt()
     
-    def print_(self):
-        for key,val in self.lncelData.items():
-            print('key=%s,val=%s' % (key, val))
-        for key,val in self.lnadjData.items():
-            print('key=%s,val=%s' % (key, val))
-        for key,val in self.lnadjlData.items():
-            print('key=%s,val=%s' % (key, val))
-        for key,val in self.lnhoifData.items():
-            print('key=%s,val=%s' % (key, val))
-        for key,val in self.lnrelData.items():
-            print('key=%s,val=%s' % (key, val))
-        for key,val in self.m8015Data.items():
-            print('key=%s,val=%s' % (key, val))
-    
+    def loadCsvTables(self, names=None):
+        #bulk load neds_*.csv(all of NEDS_SCHEMAS, or names) into self.tables, with integers parsed once and strings interned
+        for name in names if names is not None else NEDS_SCHEMAS.keys():
+            fn, ints, strs = NEDS_SCHEMAS[name]
+            self.ngwin.logEdit.append('Loading %s' % os.path.join(self.csvDir, fn))
+            processEvents()
+            self.tables[name] = loadCsvTable(os.path.join(self.csvDir, fn), ints, strs)
+
     def loadOpt(self):
         try:
             outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
             with open(os.path.join(outDir, 'grid.csv'), 'r') as f:
                 #print('Loading %s' % f.name)
                 self.ngwin.logEdit.append('Loading %s' % f.name)
-                qApp.processEvents()
+                processEvents()
                 
                 line = f.readline().strip()
                 tokens = line.split(',')
@@ -374,751 +431,88 @@ class NgM8015Proc(object):
         except Exception as e:
             return
         
-    def loadLncel(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_lncel.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            #note: use strip to remove the tailing '/n'
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = Lncel()
-                t.lnbtsId = tokens[d['LNBTS_ID']]
-                t.enbId = tokens[d['ENB_ID']]
-                t.lcrId = tokens[d['LCR_ID']]
-                t.eci = tokens[d['ECI']]
-                t.earfcn = tokens[d['EARFCN']]
-                t.pci = tokens[d['PCI']]
-                t.tac = tokens[d['TAC']]
-                t.th1 = tokens[d['TH1']]
-                t.a3Off = tokens[d['A3_OFF']]
-                t.hysA3Off = tokens[d['HYS_A3_OFF']]
-                t.a3RepInt = tokens[d['A3_REP_INT']]
-                t.a3Ttt = tokens[d['A3_TTT']]
-                t.a5Th3 = tokens[d['A5_TH3']]
-                t.a5Th3a = tokens[d['A5_TH3A']]
-                t.hysA5Th3 = tokens[d['HYS_A5_TH3']]
-                t.a5RepInt = tokens[d['A5_REP_INT']]
-                t.a5Ttt = tokens[d['A5_TTT']]
-                t.a2Th2If = tokens[d['A2_TH2_IF']]
-                t.hysA2Th2If = tokens[d['HYS_A2_TH2_IF']]
-                t.a2Ttt = tokens[d['A2_TTT']]
-                t.a1Th2a = tokens[d['A1_TH2A']]
-                t.hysA1Th2a = tokens[d['HYS_A1_TH2A']]
-                t.a1Ttt = tokens[d['A1_TTT']]
-                
-                self.lncelData[tokens[d['LNCEL_ID']]] = t 
-    
-    def loadLnadj(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_lnadj.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = Lnadj()
-                t.coDn = '/'.join(tokens[d['CO_DN']].split('/')[1:])
-                t.adjEnbId = tokens[d['ADJ_ENB_ID']]
-                t.adjEnbIp = tokens[d['ADJ_ENB_IP']]
-                t.x2Stat = tokens[d['X2_STAT']]
-                
-                self.lnadjData[tokens[d['LNBTS_ID']] + '_' + tokens[d['ADJ_ENB_ID']]] = t
-    
-    def loadLnadjl(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_lnadjl.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = Lnadjl()
-                t.coDn = '/'.join(tokens[d['CO_DN']].split('/')[1:])
-                t.adjEnbId = tokens[d['ADJ_ENB_ID']]
-                t.adjLcrId = tokens[d['ADJ_LCR_ID']]
-                t.adjEarfcn = tokens[d['ADJ_EARFCN']]
-                t.adjPci = tokens[d['ADJ_PCI']]
-                t.adjTac = tokens[d['ADJ_TAC']]
-                
-                self.lnadjlData[tokens[d['LNBTS_ID']]] = t
-    
-    def loadLnhoif(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_lnhoif.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = Lnhoif()
-                t.coDn = '/'.join(tokens[d['CO_DN']].split('/')[1:])
-                t.ifEarfcn = tokens[d['IF_EARFCN']]
-                t.ifA3Off = tokens[d['IF_A3_OFF']]
-                t.ifHysA3Off = tokens[d['IF_HYS_A3_OFF']]
-                t.ifA3RepInt = tokens[d['IF_A3_REP_INT']]
-                t.ifA3Ttt = tokens[d['IF_A3_TTT']]
-                t.ifA5Th3 = tokens[d['IF_A5_TH3']]
-                t.ifA5Th3a = tokens[d['IF_A5_TH3A']]
-                t.ifHysA5Th3 = tokens[d['IF_HYS_A5_TH3']]
-                t.ifA5RepInt = tokens[d['IF_A5_REP_INT']]
-                t.ifA5Ttt = tokens[d['IF_A5_TTT']]
-                t.ifMbw = tokens[d['IF_MBW']]
-                
-                self.lnhoifData[tokens[d['LNCEL_ID']] + '_' + tokens[d['IF_EARFCN']]] = t
-    
-    def loadIrfim(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_irfim.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = Irfim()
-                t.coDn = '/'.join(tokens[d['CO_DN']].split('/')[1:])
-                t.ifEarfcn = tokens[d['IF_EARFCN']]
-                t.ifResPrio = tokens[d['IF_RES_PRIO']]
-                t.ifRxlevMin = tokens[d['IF_RXLEV_MIN']]
-                t.ifThLow = tokens[d['IF_TH_LOW']]
-                t.ifThHigh = tokens[d['IF_TH_HIGH']]
-                t.ifMbw = tokens[d['IF_MBW']]
-                
-                self.irfimData[tokens[d['LNCEL_ID']] + '_' + tokens[d['IF_EARFCN']]] = t
-    
-    def loadLnrel(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_lnrel.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = Lnrel()
-                t.coDn = '/'.join(tokens[d['CO_DN']].split('/')[1:])
-                t.adjEnbId = tokens[d['ADJ_ENB_ID']]
-                t.adjLcrId = tokens[d['ADJ_LCR_ID']]
-                t.cio = tokens[d['CIO']]
-                t.hoAllowed = tokens[d['HO_ALLOWED']]
-                t.nrStat = tokens[d['NR_STAT']]
-                
-                self.lnrelData[tokens[d['LNCEL_ID']] + '_' + tokens[d['ADJ_ENB_ID']] + '_' + tokens[d['ADJ_LCR_ID']]] = t
-    
-    def loadM8015(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_m8015.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = M8015()
-                t.periodStartTime = tokens[d['PERIOD_START_TIME']]
-                t.iaHoPrepFail = tokens[d['INTRA_HO_PREP_FAIL_NB']]
-                t.iaHoAtt = tokens[d['INTRA_HO_ATT_NB']]
-                t.iaHoSucc = tokens[d['INTRA_HO_SUCC_NB']]
-                t.iaHoFailTime = tokens[d['INTRA_HO_FAIL_NB']]
-                t.irHoPrepFailOth = tokens[d['INTER_HO_PREP_FAIL_OTH_NB']]
-                t.irHoPrepFailTime = tokens[d['INTER_HO_PREP_FAIL_TIME_NB']]
-                t.irHoPrepFailAc = tokens[d['INTER_HO_PREP_FAIL_AC_NB']]
-                t.irHoPrepFailQci = tokens[d['INTER_HO_PREP_FAIL_QCI_NB']]
-                t.irHoAtt = tokens[d['INTER_HO_ATT_NB']]
-                t.irHoSucc = tokens[d['INTER_HO_SUCC_NB']]
-                t.irHoFailTime = tokens[d['INTER_HO_FAIL_NB']]
-                t.mroLateHo = tokens[d['MRO_LATE_HO_NB']]
-                t.mroEarlyType1Ho = tokens[d['MRO_EARLY_TYPE1_HO_NB']]
-                t.mroEarlyType2Ho = tokens[d['MRO_EARLY_TYPE2_HO_NB']]
-                t.mroPingPongHo = tokens[d['MRO_PING_PONG_HO_NB']]
-                t.ifLbHoAtt = tokens[d['HO_LB_IF_ATT_NB']]
-                t.ifLbHoSucc = tokens[d['HO_LB_IF_SUCC_NB']]
-                
-                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']] + '_' + tokens[d['ECI_ID']]
-                
-                if not key in self.m8015Data:
-                    self.m8015Data[key] = [t]
-                else:
-                    self.m8015Data[key].append(t)
-        
-        self.aggM8015()
-    
-    def loadM8001(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_m8001.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = M8001()
-                t.smallMsg1Att = tokens[d['RACH_STP_ATT_SMALL_MSG']]
-                t.largeMsg1Att = tokens[d['RACH_STP_ATT_LARGE_MSG']]
-                t.dedMsg1Att = tokens[d['RACH_STP_ATT_DEDICATED']]
-                t.rachMsg2 = tokens[d['RACH_STP_COMPLETIONS']]
-                
-                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
-                
-                if not key in self.m8001Data:
-                    self.m8001Data[key] = [t]
-                else:
-                    self.m8001Data[key].append(t)
-        
-        self.aggM8001()
-
-    def loadM8007(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_m8007.csv'), 'r') as f:
-            # print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            # print(d)
-
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-
-                tokens = line.split(',')
-
-                t = M8007()
-                t.drbSetupAtt= tokens[d['DATA_RB_STP_ATT']]
-                t.drbSetupSucc= tokens[d['DATA_RB_STP_COMP']]
-                t.drbSetupFailTimer= tokens[d['DATA_RB_STP_FAIL']]
-
-                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
-
-                if not key in self.m8007Data:
-                    self.m8007Data[key] = [t]
-                else:
-                    self.m8007Data[key].append(t)
-
-        self.aggM8007()
-
-    def loadM8005(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_m8005.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = M8005()
-                t.avgRssiPucch = tokens[d['RSSI_PUCCH_AVG']]
-                t.avgRssiPusch = tokens[d['RSSI_PUSCH_AVG']]
-                t.avgSinrPucch = tokens[d['SINR_PUCCH_AVG']]
-                t.avgSinrPusch = tokens[d['SINR_PUSCH_AVG']]
-                
-                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
-                
-                if not key in self.m8005Data:
-                    self.m8005Data[key] = [t]
-                else:
-                    self.m8005Data[key].append(t)
-        
-        self.aggM8005()
-    
-    def loadM8006(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_m8006.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = M8006()
-                t.erabSetupAtt = tokens[d['EPS_BEARER_SETUP_ATTEMPTS']]
-                t.erabSetupSucc = tokens[d['EPS_BEARER_SETUP_COMPLETIONS']]
-                t.erabSetupFailRrnaIni = tokens[d['ERAB_INI_SETUP_FAIL_RNL_RRNA']]
-                t.erabSetupFailRrnaAdd = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_RRNA']]
-                t.erabSetupFailTruIni = tokens[d['ERAB_INI_SETUP_FAIL_TNL_TRU']]
-                t.erabSetupFailTruAdd = tokens[d['ERAB_ADD_SETUP_FAIL_TNL_TRU']]
-                t.erabSetupFailUelIni = tokens[d['ERAB_INI_SETUP_FAIL_RNL_UEL']]
-                t.erabSetupFailUelAdd = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_UEL']]
-                t.erabSetupFailRipIni = tokens[d['ERAB_INI_SETUP_FAIL_RNL_RIP']]
-                t.erabSetupFailRipAdd = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_RIP']]
-                t.erabSetupFailUp = tokens[d['ERAB_ADD_SETUP_FAIL_UP']]
-                t.erabSetupFailMob = tokens[d['ERAB_ADD_SETUP_FAIL_RNL_MOB']]
-                t.erabRelQci1Tot = tokens[d['ERAB_REL_ENB_QCI1']]
-                t.erabRelQci1Ina = tokens[d['ERAB_REL_ENB_RNL_INA_QCI1']]
-                t.erabRelQci1UeLost = tokens[d['ERAB_REL_ENB_RNL_UEL_QCI1']]
-                t.erabRelQci1Tru = tokens[d['ERAB_REL_ENB_TNL_TRU_QCI1']]
-                t.erabRelQci1Red = tokens[d['ERAB_REL_ENB_RNL_RED_QCI1']]
-                t.erabRelQci1Eugr = tokens[d['ERAB_REL_ENB_RNL_EUGR_QCI1']]
-                t.erabRelQci1Rrna = tokens[d['ERAB_REL_ENB_RNL_RRNA_QCI1']]
-                t.erabRelQci1HoFail = tokens[d['ERAB_REL_HO_FAIL_TIM_QCI1']]
-                t.erabRelQci1EpcPs = tokens[d['ERAB_REL_EPC_PATH_SWITCH_QCI1']]
-                t.erabRelQci1TnlUnsp = tokens[d['ERAB_REL_ENB_TNL_UNSP_QCI1']]
-                
-                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
-                
-                if not key in self.m8006Data:
-                    self.m8006Data[key] = [t]
-                else:
-                    self.m8006Data[key].append(t)
-        
-        self.aggM8006()
-    
-    def loadM8013(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_m8013.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = M8013()
-                t.rrcMsg3Mos = tokens[d['SIGN_CONN_ESTAB_ATT_MO_S']]
-                t.rrcMsg3Mt = tokens[d['SIGN_CONN_ESTAB_ATT_MT']]
-                t.rrcMsg3Mod = tokens[d['SIGN_CONN_ESTAB_ATT_MO_D']]
-                t.rrcMsg3Emg = tokens[d['SIGN_CONN_ESTAB_ATT_EMG']]
-                t.rrcMsg3HiPrio = tokens[d['SIGN_CONN_ESTAB_ATT_HIPRIO']]
-                t.rrcMsg3DelTol = tokens[d['SIGN_CONN_ESTAB_ATT_DEL_TOL']]
-                t.rrcMsg5 = tokens[d['SIGN_CONN_ESTAB_COMP']]
-                
-                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
-                
-                if not key in self.m8013Data:
-                    self.m8013Data[key] = [t]
-                else:
-                    self.m8013Data[key].append(t)
-        
-        self.aggM8013()
-    
-    def loadM8051(self):
-        outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
-        with open(os.path.join(outDir, 'neds_m8051.csv'), 'r') as f:
-            #print('Loading %s' % f.name)
-            self.ngwin.logEdit.append('Loading %s' % f.name)
-            qApp.processEvents()
-            
-            line = f.readline().strip()
-            tokens = line.split(',')
-            d = dict(zip(tokens, range(len(tokens))))
-            #print(d)
-            
-            while True:
-                line = f.readline().strip()
-                if not line:
-                    break
-                
-                tokens = line.split(',')
-                
-                t = M8051()
-                t.avgUeRrcConn = tokens[d['RRC_CONNECTED_UE_AVG']]
-                t.maxUeRrcConn = tokens[d['RRC_CONNECTED_UE_MAX']]
-                t.avgUeAct = tokens[d['CELL_LOAD_ACTIVE_UE_AVG']]
-                t.maxUeAct = tokens[d['CELL_LOAD_ACTIVE_UE_MAX']]
-                
-                key = tokens[d['LNBTS_ID']] + '_' + tokens[d['LNCEL_ID']]
-                
-                if not key in self.m8051Data:
-                    self.m8051Data[key] = [t]
-                else:
-                    self.m8051Data[key].append(t)
-        
-        self.aggM8051()
-    
-    def aggM8001(self):
-        self.ngwin.logEdit.append('Aggregating M8001')
-        qApp.processEvents()
-        
-        for key,val in self.m8001Data.items():
-            t = M8001()
-            for rec in val:
-                try:
-                    t.smallMsg1Att = t.smallMsg1Att + int(rec.smallMsg1Att)
-                    t.largeMsg1Att = t.largeMsg1Att + int(rec.largeMsg1Att)
-                    t.dedMsg1Att = t.dedMsg1Att + int(rec.dedMsg1Att)
-                    t.rachMsg2 = t.rachMsg2 + int(rec.rachMsg2)
-                except Exception as e:
-                    #ignore ValueError that may raised by int()
-                    continue
-            
-            self.m8001AggData[key] = t
-                
-        '''
-        for key,val in self.m8001AggData.items():
-            print('key=%s,val=%s' % (key,val))
-        '''
+    def aggCounters(self, name):
+        #aggregate counter table name(loaded by loadCsvTables) into self.aggCols as defined by M80XX_AGGS
+        #invalid values(e.g. 'None') are skipped per counter, other counters of the same record are still aggregated
+        self.ngwin.logEdit.append('Aggregating %s' % name.upper())
+        processEvents()
+
+        keys, fields = M80XX_AGGS[name][1:]
+        table = self.tables[name]
+        groups = CsvGroups(table, keys)
+        cols = dict()
+        for attr,col,func in fields:
+            if func == 'sum':
+                cols[attr] = groups.sum(table, col)
+            elif func == 'max':
+                cols[attr] = groups.max(table, col, 0)
+            elif func == 'avg':
+                cols[attr] = np.empty(len(groups), dtype=object)
+                cols[attr][:] = [round(s / n, 2) if n > 0 else 'DIV0' for s,n in zip(groups.sum(table, col).tolist(), groups.count(table, col).tolist())]
+        self.aggCols[name] = (groups, cols)
 
-    def aggM8007(self):
-        self.ngwin.logEdit.append('Aggregating M8007')
-        qApp.processEvents()
-
-        for key, val in self.m8007Data.items():
-            t = M8007()
-            for rec in val:
-                try:
-                    t.drbSetupAtt = t.drbSetupAtt + int(rec.drbSetupAtt)
-                    t.drbSetupSucc = t.drbSetupSucc + int(rec.drbSetupSucc)
-                    t.drbSetupFailTimer = t.drbSetupFailTimer + int(rec.drbsetupFailTimer)
-                except Exception as e:
-                    # ignore ValueError that may raised by int()
-                    continue
-
-            self.m8007AggData[key] = t
-
-        '''
-        for key,val in self.m8007AggData.items():
-            print('key=%s,val=%s' % (key,val))
-        '''
-        
-    def aggM8005(self):
-        self.ngwin.logEdit.append('Aggregating M8005')
-        qApp.processEvents()
-        
-        for key,val in self.m8005Data.items():
-            t = M8005()
-            cnt = 0
-            for rec in val:
-                try:
-                    t.avgRssiPucch = t.avgRssiPucch + int(rec.avgRssiPucch)
-                    t.avgRssiPusch = t.avgRssiPusch + int(rec.avgRssiPusch)
-                    t.avgSinrPucch = t.avgSinrPucch + int(rec.avgSinrPucch)
-                    t.avgSinrPusch = t.avgSinrPusch + int(rec.avgSinrPusch)
-                    cnt = cnt + 1
-                except Exception as e:
-                    #ignore ValueError that may raised by int()
-                    continue
-            
-            if cnt > 0:
-                t.avgRssiPucch = round(t.avgRssiPucch / cnt, 2)
-                t.avgRssiPusch = round(t.avgRssiPusch / cnt, 2)
-                t.avgSinrPucch = round(t.avgSinrPucch / cnt, 2)
-                t.avgSinrPusch = round(t.avgSinrPusch / cnt, 2)
-            else:
-                t.avgRssiPucch, t.avgRssiPusch, t.avgSinrPucch, t.avgSinrPusch = ('DIV0', 'DIV0', 'DIV0', 'DIV0')
-                
-            
-            self.m8005AggData[key] = t
-                
-        '''
-        for key,val in self.m8005AggData.items():
-            print('key=%s,val=%s' % (key,val))
-        '''
-    
-    def aggM8006(self):
-        self.ngwin.logEdit.append('Aggregating M8006')
-        qApp.processEvents()
-        
-        for key,val in self.m8006Data.items():
-            t = M8006()
-            for rec in val:
-                try:
-                    t.erabSetupAtt = t.erabSetupAtt + int(rec.erabSetupAtt)
-                    t.erabSetupSucc = t.erabSetupSucc + int(rec.erabSetupSucc)
-                    t.erabSetupFailRrnaIni = t.erabSetupFailRrnaIni + int(rec.erabSetupFailRrnaIni)
-                    t.erabSetupFailRrnaAdd = t.erabSetupFailRrnaAdd + int(rec.erabSetupFailRrnaAdd)
-                    t.erabSetupFailTruIni = t.erabSetupFailTruIni + int(rec.erabSetupFailTruIni)
-                    t.erabSetupFailTruAdd = t.erabSetupFailTruAdd + int(rec.erabSetupFailTruAdd)
-                    t.erabSetupFailUelIni = t.erabSetupFailUelIni + int(rec.erabSetupFailUelIni)
-                    t.erabSetupFailUelAdd = t.erabSetupFailUelAdd + int(rec.erabSetupFailUelAdd)
-                    t.erabSetupFailRipIni = t.erabSetupFailRipIni + int(rec.erabSetupFailRipIni)
-                    t.erabSetupFailRipAdd = t.erabSetupFailRipAdd + int(rec.erabSetupFailRipAdd)
-                    t.erabSetupFailUp = t.erabSetupFailUp + int(rec.erabSetupFailUp)
-                    t.erabSetupFailMob = t.erabSetupFailMob + int(rec.erabSetupFailMob)
-                    t.erabRelQci1Tot = t.erabRelQci1Tot + int(rec.erabRelQci1Tot)
-                    t.erabRelQci1Ina = t.erabRelQci1Ina + int(rec.erabRelQci1Ina)
-                    t.erabRelQci1UeLost = t.erabRelQci1UeLost + int(rec.erabRelQci1UeLost)
-                    t.erabRelQci1Tru = t.erabRelQci1Tru + int(rec.erabRelQci1Tru)
-                    t.erabRelQci1Red = t.erabRelQci1Red + int(rec.erabRelQci1Red)
-                    t.erabRelQci1Eugr = t.erabRelQci1Eugr + int(rec.erabRelQci1Eugr)
-                    t.erabRelQci1Rrna = t.erabRelQci1Rrna + int(rec.erabRelQci1Rrna)
-                    t.erabRelQci1HoFail = t.erabRelQci1HoFail + int(rec.erabRelQci1HoFail)
-                    t.erabRelQci1EpcPs = t.erabRelQci1EpcPs + int(rec.erabRelQci1EpcPs)
-                    t.erabRelQci1TnlUnsp = t.erabRelQci1TnlUnsp + int(rec.erabRelQci1TnlUnsp)
-                except Exception as e:
-                    #ignore ValueError that may raised by int()
-                    continue
-            
-            self.m8006AggData[key] = t
-                
-        '''
-        for key,val in self.m8006AggData.items():
-            print('key=%s,val=%s' % (key,val))
-        '''
-    
-    def aggM8013(self):
-        self.ngwin.logEdit.append('Aggregating M8013')
-        qApp.processEvents()
-        
-        for key,val in self.m8013Data.items():
-            t = M8013()
-            for rec in val:
-                try:
-                    t.rrcMsg3Mos = t.rrcMsg3Mos + int(rec.rrcMsg3Mos)
-                    t.rrcMsg3Mt = t.rrcMsg3Mt + int(rec.rrcMsg3Mt)
-                    t.rrcMsg3Mod = t.rrcMsg3Mod + int(rec.rrcMsg3Mod)
-                    t.rrcMsg3Emg = t.rrcMsg3Emg + int(rec.rrcMsg3Emg)
-                    t.rrcMsg3HiPrio = t.rrcMsg3HiPrio + int(rec.rrcMsg3HiPrio)
-                    t.rrcMsg3DelTol = t.rrcMsg3DelTol + int(rec.rrcMsg3DelTol)
-                    t.rrcMsg5 = t.rrcMsg5 + int(rec.rrcMsg5)
-                except Exception as e:
-                    #ignore ValueError that may raised by int()
-                    continue
-            
-            self.m8013AggData[key] = t
-                
-        '''
-        for key,val in self.m8013AggData.items():
-            print('key=%s,val=%s' % (key,val))
-        '''
-    
-    def aggM8051(self):
-        self.ngwin.logEdit.append('Aggregating M8051')
-        qApp.processEvents()
-        
-        for key,val in self.m8051Data.items():
-            t = M8051()
-            cnt = 0
-            for rec in val:
-                try:
-                    t.avgUeRrcConn = t.avgUeRrcConn + int(rec.avgUeRrcConn)
-                    t.maxUeRrcConn = max(t.maxUeRrcConn, int(rec.maxUeRrcConn))
-                    t.avgUeAct = t.avgUeAct + int(rec.avgUeAct)
-                    t.maxUeAct = max(t.maxUeAct, int(rec.maxUeAct))
-                    cnt = cnt + 1
-                except Exception as e:
-                    #ignore ValueError that may raised by int()
-                    continue
-                
-            if cnt > 0:
-                t.avgUeRrcConn = round(t.avgUeRrcConn / cnt, 2)
-                t.avgUeAct = round(t.avgUeAct / cnt, 2)
-            else:
-                t.avgUeRrcConn, t.avgUeAct = ('DIV0', 'DIV0')
-            
-            self.m8051AggData[key] = t
-                
-        '''
-        for key,val in self.m8051AggData.items():
-            print('key=%s,val=%s' % (key,val))
-        '''
-    
-    def aggM8015(self):
-        #print('Aggregating M8015')
-        self.ngwin.logEdit.append('Aggregating M8015')
-        qApp.processEvents()
-        
-        for key,val in self.m8015Data.items():
-            t = M8015()
-            for rec in val:
-                try:
-                    t.iaHoPrepFail = t.iaHoPrepFail + int(rec.iaHoPrepFail)
-                    t.iaHoAtt = t.iaHoAtt + int(rec.iaHoAtt)
-                    t.iaHoSucc = t.iaHoSucc + int(rec.iaHoSucc)
-                    t.iaHoFailTime = t.iaHoFailTime + int(rec.iaHoFailTime)
-                    t.irHoPrepFailOth = t.irHoPrepFailOth + int(rec.irHoPrepFailOth)
-                    t.irHoPrepFailTime = t.irHoPrepFailTime + int(rec.irHoPrepFailTime)
-                    t.irHoPrepFailAc = t.irHoPrepFailAc + int(rec.irHoPrepFailAc)
-                    t.irHoPrepFailQci = t.irHoPrepFailQci + int(rec.irHoPrepFailQci)
-                    t.irHoAtt = t.irHoAtt + int(rec.irHoAtt)
-                    t.irHoSucc = t.irHoSucc + int(rec.irHoSucc)
-                    t.irHoFailTime = t.irHoFailTime + int(rec.irHoFailTime)
-                    t.mroLateHo = t.mroLateHo + int(rec.mroLateHo)
-                    t.mroEarlyType1Ho = t.mroEarlyType1Ho + int(rec.mroEarlyType1Ho)
-                    t.mroEarlyType2Ho = t.mroEarlyType2Ho + int(rec.mroEarlyType2Ho)
-                    t.mroPingPongHo = t.mroPingPongHo + int(rec.mroPingPongHo)
-                    t.ifLbHoAtt = t.ifLbHoAtt + int(rec.ifLbHoAtt)
-                    t.ifLbHoSucc = t.ifLbHoSucc + int(rec.ifLbHoSucc)
-                except Exception as e:
-                    #ignore ValueError that may raised by int()
-                    continue
-            
-            self.m8015AggData[key] = t
-                
-        '''
-        for key,val in self.m8015AggData.items():
-            print('key=%s,val=%s' % (key,val))
-        '''
-    
     def makeEciMap(self):
         #print('Making per ECI map')
         self.ngwin.logEdit.append('Making per ECI map')
-        qApp.processEvents()
+        processEvents()
         
-        for key,val in self.lncelData.items():
-            self.lnbtsIdLncelIdMap[val.eci] = val.lnbtsId + '_' + key
+        #LNCEL of the last row of each lncel id, then LNADJL of all rows(as joinEcis), the first row of each eci wins
+        lncel = self.tables['lncel']
+        lnbtsIds, ecis, earfcns, pcis, tacs = [lncel.texts(z) for z in ('LNBTS_ID', 'ECI', 'EARFCN', 'PCI', 'TAC')]
+        for lncelId,row in lastRows(lncel.texts('LNCEL_ID')).items():
+            eci = ecis[row]
+            self.lnbtsIdLncelIdMap[eci] = lnbtsIds[row] + '_' + lncelId
             
-            if not val.eci in self.earfcnMap:
-                self.earfcnMap[val.eci] = val.earfcn
-                self.pciMap[val.eci] = val.pci
-                self.tacMap[val.eci] = val.tac
-        
-        for key,val in self.lnadjlData.items():
-            eci = 256*val.adjEnbId+val.adjLcrId
             if not eci in self.earfcnMap:
-                self.earfcnMap[eci] = val.adjEarfcn
-                self.pciMap[eci] = val.adjPci
-                self.tacMap[eci] = val.adjTac
+                self.earfcnMap[eci] = earfcns[row]
+                self.pciMap[eci] = pcis[row]
+                self.tacMap[eci] = tacs[row]
+        
+        lnadjl = self.tables['lnadjl']
+        rows = np.flatnonzero(lnadjl.valid['ADJ_ENB_ID'] & lnadjl.valid['ADJ_LCR_ID'])
+        adjlEcis = (256 * lnadjl.values['ADJ_ENB_ID'][rows] + lnadjl.values['ADJ_LCR_ID'][rows]).tolist()
+        for eci,earfcn,pci,tac in zip(adjlEcis, *[lnadjl.texts(z, rows) for z in ('ADJ_EARFCN', 'ADJ_PCI', 'ADJ_TAC')]):
+            eci = str(eci)
+            if not eci in self.earfcnMap:
+                self.earfcnMap[eci] = earfcn
+                self.pciMap[eci] = pci
+                self.tacMap[eci] = tac
                 
     def procUserCase01(self):
         #print('Performing analysis for user case #01: per earfcn hosr')
         self.ngwin.logEdit.append('<font color=blue>Performing analysis for user case #01: per earfcn hosr</font>')
-        qApp.processEvents()
+        processEvents()
         
         #user case#1: EARFCNx -> EARFCNy HOSR analysis
-        for key,val in self.m8015AggData.items():
-            tokens = key.split('_')
-            if len(tokens) == 3:
-                lnbtsId = tokens[0]
-                lncelId = tokens[1]
-                eci = tokens[2]
-            else:
-                continue
-            
-            if not lncelId in self.lncelData:
-                continue
-            
-            eciSrc = self.lncelData[lncelId].eci
-            
-            if eciSrc in self.earfcnMap:
-                earfcnSrc = self.earfcnMap[eciSrc]
-            else:
-                earfcnSrc = 'NA'
-                
-            if eci in self.earfcnMap:
-                earfcnDst = self.earfcnMap[eci]
-            else:
-                earfcnDst = 'NA'
-            
-            key = earfcnSrc + '_' + earfcnDst 
+        #source cell of each aggregated M8015 relation by lncel id(the last row, as LNCEL per line), relations of unknown source cell are skipped
+        #earfcn of source/target eci as joinEcis, 'NA' if not found
+        lncel = self.tables['lncel']
+        m8015 = self.tables['m8015']
+        groups, m8015Cols = self.aggCols['m8015']
+        srcRows = lookupRows([lncel.values['LNCEL_ID']], [m8015.values['LNCEL_ID'][groups.first]], lncel.valid['LNCEL_ID'], m8015.valid['LNCEL_ID'][groups.first])
+        rel = np.flatnonzero(srcRows >= 0)
+        eciSrc = np.where(lncel.valid['ECI'][srcRows[rel]], lncel.values['ECI'][srcRows[rel]], -1)
+        eciDst = np.where(m8015.valid['ECI_ID'][groups.first[rel]], m8015.values['ECI_ID'][groups.first[rel]], -1)
+        earfcnSrc = self.joinEcis(eciSrc)[0][0]
+        earfcnDst = self.joinEcis(eciDst)[0][0]
+        
+        #counters are summed per earfcn pair
+        index = dict()
+        ids = np.array([index.setdefault(x + '_' + y, len(index)) for x,y in zip(earfcnSrc.tolist(), earfcnDst.tolist())], dtype=np.int64)
+        sums = dict()
+        for attr in ('iaHoAtt', 'iaHoSucc', 'irHoAtt', 'irHoSucc'):
+            sums[attr] = np.zeros(len(index), dtype=np.int64)
+            np.add.at(sums[attr], ids, m8015Cols[attr][rel])
+        for key,i in index.items():
             if not key in self.m8015Earfcnxy:
                 self.m8015Earfcnxy[key] = HoStat()
-            self.m8015Earfcnxy[key].iaHoAtt = self.m8015Earfcnxy[key].iaHoAtt + val.iaHoAtt
-            self.m8015Earfcnxy[key].iaHoSucc = self.m8015Earfcnxy[key].iaHoSucc + val.iaHoSucc
-            self.m8015Earfcnxy[key].irHoAtt = self.m8015Earfcnxy[key].irHoAtt + val.irHoAtt
-            self.m8015Earfcnxy[key].irHoSucc = self.m8015Earfcnxy[key].irHoSucc + val.irHoSucc
+            for attr in sums.keys():
+                setattr(self.m8015Earfcnxy[key], attr, getattr(self.m8015Earfcnxy[key], attr) + int(sums[attr][i]))
         
         outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
         with open(os.path.join(outDir, 'm8015_per_earfcn_%s.csv' % time.strftime('%Y%m%d_%H%M%S', time.localtime())), 'w') as f:
             self.ngwin.logEdit.append('-->Exporting results to: %s' % f.name)
-            qApp.processEvents()
+            processEvents()
                     
             header = ['DN', 'IA_HO_ATT', 'IA_HO_SUCC', 'IR_HO_ATT', 'IR_HO_SUCC', 'HO_ATT_TOT', 'HO_SUCC_TOT', 'HOSR2(%)']
             f.write(','.join(header))
@@ -1137,299 +531,270 @@ class NgM8015Proc(object):
                 f.write(','.join(line))
                 f.write('\n')
         
+    def joinCells(self, name, keys, cols, valid=None):
+        #rows of aggregated counter table name(as in self.aggCols) of cells keys=[lnbts ids, lncel ids], -1 if not found
+        groups, aggCols = self.aggCols[name]
+        table = self.tables[name]
+        tableKeys = [table.values[z][groups.first] for z in M80XX_AGGS[name][1]]
+        tableValid = np.logical_and.reduce([table.valid[z][groups.first] for z in M80XX_AGGS[name][1]])
+        return lookupRows(tableKeys, keys, tableValid, valid)
+
+    def joinEcis(self, ecis):
+        #(earfcn, pci, tac) texts of ecis from LNCEL or else LNADJL(first row of each eci, as makeEciMap), 'NA' if not found
+        #earfcn values(-1 if not found) are returned too, for join with LNHOIF
+        lncel = self.tables['lncel']
+        lnadjl = self.tables['lnadjl']
+        rowsLncel = lookupRows([lncel.values['ECI']], [ecis], lncel.valid['ECI'], last=False)
+        adjlEcis = 256 * lnadjl.values['ADJ_ENB_ID'] + lnadjl.values['ADJ_LCR_ID']
+        rowsLnadjl = lookupRows([adjlEcis], [ecis], lnadjl.valid['ADJ_ENB_ID'] & lnadjl.valid['ADJ_LCR_ID'], last=False)
+        rowsLnadjl[rowsLncel >= 0] = -1
+        result = []
+        for col,adjlCol in (('EARFCN', 'ADJ_EARFCN'), ('PCI', 'ADJ_PCI'), ('TAC', 'ADJ_TAC')):
+            texts = textsNa(lncel, col, rowsLncel)
+            fromAdjl = rowsLnadjl >= 0
+            texts[fromAdjl] = lnadjl.texts(adjlCol, rowsLnadjl[fromAdjl])
+            result.append(texts)
+        earfcns = np.full(len(ecis), -1, dtype=np.int64)
+        for table,col,rows in ((lncel, 'EARFCN', rowsLncel), (lnadjl, 'ADJ_EARFCN', rowsLnadjl)):
+            found = np.flatnonzero(rows >= 0)
+            found = found[table.valid[col][rows[found]]]
+            earfcns[found] = table.values[col][rows[found]]
+        return result, earfcns
+
+    def makeM8015Relations(self, topN=0, metric='fail'):
+        #M8015 relations(source cell -> target eci) of user case #02 with attributes of LNADJ/LNREL/LNCEL/LNHOIF and M80xx of cells
+        #cells and relations are joined by integer keys(lookupRows), so the report is assembled column by column
+        #relations are ranked by metric(one of M8015_RANK_METRICS), only the worst topN(if > 0) are joined
+        #return (header, columns) with rows in the order of rank, the worst first
+        topN, metric = parseTopN(str(topN)), parseRankMetric(metric)
+        lncel = self.tables['lncel']
+        m8015 = self.tables['m8015']
+        groups, m8015Cols = self.aggCols['m8015']
+        valid = np.logical_and.reduce([m8015.valid[z][groups.first] for z in ('LNBTS_ID', 'LNCEL_ID', 'ECI_ID')])
+        lnbtsIds, lncelIds, ecis = [m8015.values[z][groups.first] for z in ('LNBTS_ID', 'LNCEL_ID', 'ECI_ID')]
+
+        #source cell of each relation, relations of unknown source cell are skipped
+        srcRows = lookupRows([lncel.values['LNCEL_ID']], [lncelIds], lncel.valid['LNCEL_ID'], valid)
+        rel = np.flatnonzero((srcRows >= 0) & lncel.valid['ECI'][np.maximum(srcRows, 0)])
+        eciSrc = lncel.values['ECI'][srcRows[rel]]
+        #one relation per (source eci, target eci): values of the last relation in the order of the first one, as m8015Ecixy
+        codes = denseCodes([eciSrc, ecis[rel]])
+        lastRel = np.full(len(codes) + 1, -1, dtype=np.int64)
+        lastRel[codes] = np.arange(len(codes))
+        firstRel = np.sort(np.unique(codes, return_index=True)[1])
+        rel = rel[lastRel[codes[firstRel]]]
+
+        c = dict([(attr, m8015Cols[attr][rel]) for attr in m8015Cols.keys()])
+        irHoPrepFail = c['irHoPrepFailAc'] + c['irHoPrepFailOth'] + c['irHoPrepFailQci'] + c['irHoPrepFailTime']
+        hoAtt = c['iaHoAtt'] + c['irHoAtt']
+        hoSucc = c['iaHoSucc'] + c['irHoSucc']
+        hoPrepFail = c['iaHoPrepFail'] + irHoPrepFail
+        #relations without any HO attempt are skipped
+        keep = np.flatnonzero((hoPrepFail + hoAtt) != 0)
+        fail = (hoPrepFail + hoAtt - hoSucc)[keep]
+        if metric == 'hosr':
+            #100 - HOSR2(%), relations without HO execution attempt(only preparation failures) rank last
+            score = np.where(hoAtt[keep] != 0, 100 - 100 * hoSucc[keep] / np.maximum(hoAtt[keep], 1), -1.0)
+        elif metric == 'mro_late':
+            score = c['mroLateHo'][keep]
+        elif metric == 'mro_early':
+            score = (c['mroEarlyType1Ho'] + c['mroEarlyType2Ho'])[keep]
+        elif metric == 'mro_ppong':
+            score = c['mroPingPongHo'][keep]
+        else:
+            score = fail
+        order = keep[rankRows(score, fail, topN)]
+        self.ngwin.logEdit.append('<font color=blue>%d of %d relations selected by %s</font>' % (len(order), len(keep), metric))
+        processEvents()
+
+        rel = rel[order]
+        c = dict([(attr, val[order]) for attr,val in c.items()])
+        irHoPrepFail, hoAtt, hoSucc, hoPrepFail = irHoPrepFail[order], hoAtt[order], hoSucc[order], hoPrepFail[order]
+
+        lnbtsIds, lncelIds, eciDst, srcRows = lnbtsIds[rel], lncelIds[rel], ecis[rel], srcRows[rel]
+        eciSrc = lncel.values['ECI'][srcRows]
+        enbIdSrc, lcrIdSrc = eciSrc // 256, eciSrc % 256
+        enbIdDst, lcrIdDst = eciDst // 256, eciDst % 256
+        (earfcnSrc, pciSrc, tacSrc), _ = self.joinEcis(eciSrc)
+        (earfcnDst, pciDst, tacDst), earfcnDstValues = self.joinEcis(eciDst)
+
+        columns = []
+        columns.append(('DN', [str(x) + '_' + str(y) for x,y in zip(eciSrc.tolist(), eciDst.tolist())]))
+        columns.extend([('SRC_ENB_ID', enbIdSrc), ('SRC_LCR_ID', lcrIdSrc), ('SRC_EARFCN', earfcnSrc), ('SRC_PCI', pciSrc), ('SRC_TAC', tacSrc)])
+        columns.extend([('DST_ENB_ID', enbIdDst), ('DST_LCR_ID', lcrIdDst), ('DST_EARFCN', earfcnDst), ('DST_PCI', pciDst), ('DST_TAC', tacDst)])
+
+        #M8015 info
+        columns.extend([('IA_HO_PREP_FAIL', c['iaHoPrepFail']), ('IA_HO_ATT', c['iaHoAtt']), ('IA_HO_SUCC', c['iaHoSucc']),
+                        ('IR_HO_PREP_FAIL', irHoPrepFail), ('IR_HO_ATT', c['irHoAtt']), ('IR_HO_SUCC', c['irHoSucc'])])
+        columns.extend([('HO_ATT_TOT', hoAtt), ('HO_SUCC_TOT', hoSucc), ('HO_PREP_FAIL', hoPrepFail), ('HO_EXEC_FAIL', hoAtt - hoSucc)])
+        columns.append(('HOSR2(%)', ['%.2f' % (100 * succ / att) if att != 0 else 'DIV0' for succ,att in zip(hoSucc.tolist(), hoAtt.tolist())]))
+        columns.extend([('MRO_LATE_HO', c['mroLateHo']), ('MRO_EARLY_HO', c['mroEarlyType1Ho'] + c['mroEarlyType2Ho']), ('MRO_PPONG_HO', c['mroPingPongHo'])])
+
+        #LNADJ info
+        lnadj = self.tables['lnadj']
+        rows = lookupRows([lnadj.values['LNBTS_ID'], lnadj.values['ADJ_ENB_ID']], [lnbtsIds, enbIdDst], lnadj.valid['LNBTS_ID'] & lnadj.valid['ADJ_ENB_ID'])
+        columns.extend([('DN_LNADJ', dnsNa(lnadj, rows)), ('X2_STAT', textsNa(lnadj, 'X2_STAT', rows))])
+
+        #LNREL info
+        lnrel = self.tables['lnrel']
+        rows = lookupRows([lnrel.values['LNCEL_ID'], lnrel.values['ADJ_ENB_ID'], lnrel.values['ADJ_LCR_ID']], [lncelIds, enbIdDst, lcrIdDst],
+                          lnrel.valid['LNCEL_ID'] & lnrel.valid['ADJ_ENB_ID'] & lnrel.valid['ADJ_LCR_ID'])
+        columns.extend([('DN_LNREL', dnsNa(lnrel, rows)), ('CIO', textsNa(lnrel, 'CIO', rows)), ('HO_ALLOWED', textsNa(lnrel, 'HO_ALLOWED', rows))])
+
+        #LNCEL info
+        columns.extend([('IA_A3', joinTextsNa(lncel, ['A3_OFF', 'HYS_A3_OFF'], srcRows)), ('IA_A5', joinTextsNa(lncel, ['A5_TH3', 'A5_TH3A', 'HYS_A5_TH3'], srcRows)),
+                        ('IF_A2', joinTextsNa(lncel, ['A2_TH2_IF', 'HYS_A2_TH2_IF'], srcRows)), ('IF_A1', joinTextsNa(lncel, ['A1_TH2A', 'HYS_A1_TH2A'], srcRows))])
+
+        #LNHOIF info
+        lnhoif = self.tables['lnhoif']
+        rows = lookupRows([lnhoif.values['LNCEL_ID'], lnhoif.values['IF_EARFCN']], [lncelIds, earfcnDstValues],
+                          lnhoif.valid['LNCEL_ID'] & lnhoif.valid['IF_EARFCN'], earfcnDstValues >= 0)
+        columns.extend([('DN_LNHOIF', dnsNa(lnhoif, rows)), ('IF_A3', joinTextsNa(lnhoif, ['IF_A3_OFF', 'IF_HYS_A3_OFF'], rows)),
+                        ('IF_A5', joinTextsNa(lnhoif, ['IF_A5_TH3', 'IF_A5_TH3A', 'IF_HYS_A5_TH3'], rows))])
+
+        #erab abnormal release(cause=ue_lost or ho_fail) for qci1, source cell only
+        rows = self.joinCells('m8006', [lnbtsIds, lncelIds], None)
+        m8006 = self.aggCols['m8006'][1]
+        columns.extend([('SRC_ERAB_REL_UEL_QCI1', valuesNa(m8006['erabRelQci1UeLost'], rows)), ('SRC_ERAB_REL_HOFAIL_QCI1', valuesNa(m8006['erabRelQci1HoFail'], rows))])
+
+        #counters of target cell: target eci -> lnbts/lncel of LNCEL(last row of each eci, as lnbtsIdLncelIdMap)
+        dstRows = lookupRows([lncel.values['ECI']], [eciDst], lncel.valid['ECI'])
+        found = dstRows >= 0
+        dstValid = found & lncel.valid['LNBTS_ID'][np.maximum(dstRows, 0)] & lncel.valid['LNCEL_ID'][np.maximum(dstRows, 0)]
+        dstKeys = [lncel.values['LNBTS_ID'][np.maximum(dstRows, 0)], lncel.values['LNCEL_ID'][np.maximum(dstRows, 0)]]
+        dst = dict([(name, self.joinCells(name, dstKeys, dstValid)) for name in ('m8001', 'm8005', 'm8006', 'm8007', 'm8013', 'm8051')])
+
+        #msg1/2/3/5 count, target cell only
+        m8001 = self.aggCols['m8001'][1]
+        m8013 = self.aggCols['m8013'][1]
+        rows = np.where((dst['m8001'] >= 0) & (dst['m8013'] >= 0), dst['m8001'], -1)
+        rows13 = np.where(rows >= 0, dst['m8013'], -1)
+        msg1 = sumNa([m8001['smallMsg1Att'], m8001['largeMsg1Att'], m8001['dedMsg1Att']], rows)
+        msg2 = valuesNa(m8001['rachMsg2'], rows)
+        msg3 = sumNa([m8013[z] for z in ('rrcMsg3Mos', 'rrcMsg3Mt', 'rrcMsg3Mod', 'rrcMsg3Emg', 'rrcMsg3HiPrio', 'rrcMsg3DelTol')], rows13)
+        msg5 = valuesNa(m8013['rrcMsg5'], rows13)
+        columns.extend([('DST_NUM_MSG1', msg1), ('DST_NUM_MSG2', msg2), ('DST_RRC_MSG3', msg3), ('DST_RRC_MSG5', msg5),
+                        ('DST_RASR_MSG2', ratioNa(msg2, msg1, rows)), ('DST_RASR_MSG3', ratioNa(msg3, msg1, rows)), ('DST_RRC_SSR', ratioNa(msg5, msg3, rows))])
+
+        #drb/erab setup count, target cell only
+        m8006 = self.aggCols['m8006'][1]
+        m8007 = self.aggCols['m8007'][1]
+        rows = np.where((dst['m8006'] >= 0) & (dst['m8007'] >= 0), dst['m8007'], -1)
+        rows06 = np.where(rows >= 0, dst['m8006'], -1)
+        drbAtt, drbSucc, drbFailTim = [valuesNa(m8007[z], rows) for z in ('drbSetupAtt', 'drbSetupSucc', 'drbSetupFailTimer')]
+        columns.extend([('DST_DRB_ATT', drbAtt), ('DST_DRB_SUCC', drbSucc), ('DST_DRB_FAIL_TIM', drbFailTim),
+                        ('DST_DRB_FAIL_OTH', sumNa([m8007['drbSetupAtt'], -m8007['drbSetupSucc'], -m8007['drbSetupFailTimer']], rows))])
+        erabFails = [('DST_ERAB_FAIL_RRNA', ['erabSetupFailRrnaIni', 'erabSetupFailRrnaAdd']), ('DST_ERAB_FAIL_TRU', ['erabSetupFailTruIni', 'erabSetupFailTruAdd']),
+                     ('DST_ERAB_FAIL_UEL', ['erabSetupFailUelIni', 'erabSetupFailUelAdd']), ('DST_ERAB_FAIL_RIP', ['erabSetupFailRipIni', 'erabSetupFailRipAdd']),
+                     ('DST_ERAB_FAIL_UP', ['erabSetupFailUp']), ('DST_ERAB_FAIL_MOB', ['erabSetupFailMob'])]
+        columns.extend([('DST_ERAB_ATT', valuesNa(m8006['erabSetupAtt'], rows06)), ('DST_ERAB_SUCC', valuesNa(m8006['erabSetupSucc'], rows06))])
+        columns.extend([(header, sumNa([m8006[z] for z in attrs], rows06)) for header,attrs in erabFails])
+        columns.append(('DST_ERAB_FAIL_OTH', sumNa([m8006['erabSetupAtt'], -m8006['erabSetupSucc']] + [-m8006[z] for header,attrs in erabFails for z in attrs], rows06)))
+
+        #rrc_connected/active ue count, target cell only
+        m8051 = self.aggCols['m8051'][1]
+        columns.extend([('DST_AVG_UE_RRC_CONN', valuesNa(m8051['avgUeRrcConn'], dst['m8051'])), ('DST_MAX_UE_RRC_CONN', valuesNa(m8051['maxUeRrcConn'], dst['m8051'])),
+                        ('DST_AVG_UE_ACT', valuesNa(m8051['avgUeAct'], dst['m8051'])), ('DST_MAX_UE_ACT', valuesNa(m8051['maxUeAct'], dst['m8051']))])
+
+        #pucch/pusch rssi/sinr, target cell only
+        m8005 = self.aggCols['m8005'][1]
+        columns.extend([('DST_RSSI_PUCCH', valuesNa(m8005['avgRssiPucch'], dst['m8005'])), ('DST_SINR_PUCCH', valuesNa(m8005['avgSinrPucch'], dst['m8005'])),
+                        ('DST_RSSI_PUSCH', valuesNa(m8005['avgRssiPusch'], dst['m8005'])), ('DST_SINR_PUSCH', valuesNa(m8005['avgSinrPusch'], dst['m8005']))])
+
+        #for ATU grid info
+        grid = set(self.gridData)
+        columns.append(('IS_GRID', [('YES' if '%d_%d' % (a, b) in grid else 'NO') + '_' + ('YES' if '%d_%d' % (x, y) in grid else 'NO')
+                                    for a,b,x,y in zip(enbIdSrc.tolist(), lcrIdSrc.tolist(), enbIdDst.tolist(), lcrIdDst.tolist())]))
+
+        return [z[0] for z in columns], [z[1] for z in columns]
+
     def procUserCase02(self):
         #print('Performing analysis for user case #02: hosr top n')
         self.ngwin.logEdit.append('<font color=blue>Performing analysis for user case #02: hosr top n</font>')
-        qApp.processEvents()
+        processEvents()
         
         #user case#2: hosr top n analysis
-        for key,val in self.m8015AggData.items():
-            tokens = key.split('_')
-            if len(tokens) == 3:
-                lnbtsId = tokens[0]
-                lncelId = tokens[1]
-                eci = tokens[2]
-            else:
-                continue
-            
-            if not lncelId in self.lncelData:
-                continue
-            
-            eciSrc = self.lncelData[lncelId].eci
-            
-            key = eciSrc + '_' + eci
-            if not key in self.m8015Ecixy:
-                self.m8015Ecixy[key] = HoStat()
-            self.m8015Ecixy[key].lnbtsId = lnbtsId
-            self.m8015Ecixy[key].lncelId = lncelId 
-            self.m8015Ecixy[key].iaHoPrepFail = val.iaHoPrepFail
-            self.m8015Ecixy[key].iaHoAtt = val.iaHoAtt
-            self.m8015Ecixy[key].iaHoSucc = val.iaHoSucc
-            self.m8015Ecixy[key].irHoPrepFail = val.irHoPrepFailAc + val.irHoPrepFailOth + val.irHoPrepFailQci + val.irHoPrepFailTime
-            self.m8015Ecixy[key].irHoAtt = val.irHoAtt
-            self.m8015Ecixy[key].irHoSucc = val.irHoSucc
-            self.m8015Ecixy[key].mroLateHo= val.mroLateHo
-            self.m8015Ecixy[key].mroEarlyHo= val.mroEarlyType1Ho + val.mroEarlyType2Ho
-            self.m8015Ecixy[key].mroPingPongHo= val.mroPingPongHo
-            
+        header, columns = self.makeM8015Relations(self.args['topN'], self.args['topNMetric'])
+        
         outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
         with open(os.path.join(outDir, 'm8015_topn_%s.csv' % time.strftime('%Y%m%d_%H%M%S', time.localtime())), 'w') as f:
             self.ngwin.logEdit.append('-->Exporting results to: %s' % f.name)
-            qApp.processEvents()
-                    
-            header = ['DN','SRC_ENB_ID', 'SRC_LCR_ID', 'SRC_EARFCN', 'SRC_PCI', 'SRC_TAC', 'DST_ENB_ID', 'DST_LCR_ID', 'DST_EARFCN', 'DST_PCI', 'DST_TAC']
-            header.extend(['IA_HO_PREP_FAIL', 'IA_HO_ATT', 'IA_HO_SUCC', 'IR_HO_PREP_FAIL', 'IR_HO_ATT', 'IR_HO_SUCC', 'HO_ATT_TOT', 'HO_SUCC_TOT', 'HO_PREP_FAIL', 'HO_EXEC_FAIL', 'HOSR2(%)', 'MRO_LATE_HO', 'MRO_EARLY_HO', 'MRO_PPONG_HO'])
-            header.extend(['DN_LNADJ', 'X2_STAT'])
-            header.extend(['DN_LNREL', 'CIO', 'HO_ALLOWED'])
-            header.extend(['IA_A3', 'IA_A5', 'IF_A2', 'IF_A1'])
-            header.extend(['DN_LNHOIF', 'IF_A3', 'IF_A5'])
-            header.extend(['SRC_ERAB_REL_UEL_QCI1', 'SRC_ERAB_REL_HOFAIL_QCI1'])
-            header.extend(['DST_NUM_MSG1', 'DST_NUM_MSG2', 'DST_RRC_MSG3', 'DST_RRC_MSG5', 'DST_RASR_MSG2', 'DST_RASR_MSG3', 'DST_RRC_SSR'])
-            header.extend(['DST_DRB_ATT', 'DST_DRB_SUCC', 'DST_DRB_FAIL_TIM', 'DST_DRB_FAIL_OTH', 'DST_ERAB_ATT', 'DST_ERAB_SUCC',
-                           'DST_ERAB_FAIL_RRNA', 'DST_ERAB_FAIL_TRU', 'DST_ERAB_FAIL_UEL', 'DST_ERAB_FAIL_RIP', 'DST_ERAB_FAIL_UP', 'DST_ERAB_FAIL_MOB', 'DST_ERAB_FAIL_OTH'])
-            header.extend(['DST_AVG_UE_RRC_CONN', 'DST_MAX_UE_RRC_CONN', 'DST_AVG_UE_ACT', 'DST_MAX_UE_ACT'])
-            header.extend(['DST_RSSI_PUCCH', 'DST_SINR_PUCCH', 'DST_RSSI_PUSCH', 'DST_SINR_PUSCH'])
-            header.extend(['IS_GRID'])
+            processEvents()
+            
             f.write(','.join(header))
             f.write('\n')
             
-            #for key,val in self.m8015Ecixy.items():
-            for key,val in sorted(self.m8015Ecixy.items(), key=lambda d : d[1].iaHoPrepFail+d[1].irHoPrepFail+d[1].iaHoAtt+d[1].irHoAtt-d[1].iaHoSucc-d[1].irHoSucc, reverse=True):
-                if val.iaHoPrepFail + val.iaHoAtt + val.irHoPrepFail + val.irHoAtt == 0:
-                    continue
-                
-                #src/dst cell info
-                line = [key]
-                eciSrc, eciDst = key.split('_')
-                lcrIdSrc = int(eciSrc) % 256
-                lcrIdDst = int(eciDst) % 256
-                enbIdSrc = (int(eciSrc) - lcrIdSrc) // 256
-                enbIdDst = (int(eciDst) - lcrIdDst) // 256
-                
-                if eciSrc in self.earfcnMap:
-                    earfcnSrc = self.earfcnMap[eciSrc]
-                else:
-                    earfcnSrc = 'NA'
-                    
-                if eciDst in self.earfcnMap:
-                    earfcnDst = self.earfcnMap[eciDst]
-                else:
-                    earfcnDst = 'NA'
-                
-                if eciSrc in self.pciMap:
-                    pciSrc = self.pciMap[eciSrc]
-                else:
-                    pciSrc = 'NA'
-                    
-                if eciDst in self.pciMap:
-                    pciDst = self.pciMap[eciDst]
-                else:
-                    pciDst = 'NA'
-                    
-                if eciSrc in self.tacMap:
-                    tacSrc = self.tacMap[eciSrc]
-                else:
-                    tacSrc = 'NA'
-                    
-                if eciDst in self.tacMap:
-                    tacDst = self.tacMap[eciDst]
-                else:
-                    tacDst = 'NA'
-                    
-                line.extend([enbIdSrc, lcrIdSrc, earfcnSrc, pciSrc, tacSrc])
-                line.extend([enbIdDst, lcrIdDst, earfcnDst, pciDst, tacDst])
-                
-                #M8015 info
-                line.extend([val.iaHoPrepFail, val.iaHoAtt, val.iaHoSucc, val.irHoPrepFail, val.irHoAtt, val.irHoSucc])
-                line.append(val.iaHoAtt + val.irHoAtt)
-                line.append(val.iaHoSucc + val.irHoSucc)
-                line.append(val.iaHoPrepFail + val.irHoPrepFail)
-                line.append(val.iaHoAtt + val.irHoAtt - val.iaHoSucc - val.irHoSucc)
-                if val.iaHoAtt + val.irHoAtt == 0:
-                    line.append('DIV0')
-                else:
-                    line.append('%.2f' % (100*(val.iaHoSucc+val.irHoSucc)/(val.iaHoAtt+val.irHoAtt)))
-                line.extend([val.mroLateHo, val.mroEarlyHo, val.mroPingPongHo])
-                
-                #LNADJ info
-                lnadjKey = val.lnbtsId + '_' + str(enbIdDst)
-                if lnadjKey in self.lnadjData:
-                    dnLnadj = self.lnadjData[lnadjKey].coDn
-                    x2Stat = self.lnadjData[lnadjKey].x2Stat
-                else:
-                    dnLnadj, x2Stat = ('NA', 'NA')
-                line.extend([dnLnadj, x2Stat])
-                
-                #LNREL info
-                lnrelKey = val.lncelId + '_' + str(enbIdDst) + '_' + str(lcrIdDst)
-                if lnrelKey in self.lnrelData:
-                    dnLnrel = self.lnrelData[lnrelKey].coDn
-                    cio = self.lnrelData[lnrelKey].cio
-                    hoAllowed = self.lnrelData[lnrelKey].hoAllowed
-                else:
-                    dnLnrel, cio, hoAllowed = ('NA', 'NA', 'NA')
-                line.extend([dnLnrel, cio, hoAllowed])
-                
-                #LNCEL info
-                lncelKey = val.lncelId
-                if lncelKey in self.lncelData:
-                    iaA3 = self.lncelData[lncelKey].a3Off + '_' + self.lncelData[lncelKey].hysA3Off
-                    iaA5 = self.lncelData[lncelKey].a5Th3 + '_' + self.lncelData[lncelKey].a5Th3a + '_' + self.lncelData[lncelKey].hysA5Th3
-                    ifA2 = self.lncelData[lncelKey].a2Th2If + '_' + self.lncelData[lncelKey].hysA2Th2If
-                    ifA1 = self.lncelData[lncelKey].a1Th2a + '_' + self.lncelData[lncelKey].hysA1Th2a
-                else:
-                    iaA3, iaA5, ifA2, ifA1 = ('NA', 'NA', 'NA', 'NA')
-                line.extend([iaA3, iaA5, ifA2, ifA1])
-                    
-                #LNHOIF info
-                lnhoifKey = val.lncelId + '_' + earfcnDst
-                if lnhoifKey in self.lnhoifData:
-                    dnLnhoif = self.lnhoifData[lnhoifKey].coDn
-                    ifA3 = self.lnhoifData[lnhoifKey].ifA3Off + '_' + self.lnhoifData[lnhoifKey].ifHysA3Off
-                    ifA5 = self.lnhoifData[lnhoifKey].ifA5Th3 + '_' + self.lnhoifData[lnhoifKey].ifA5Th3a + '_' + self.lnhoifData[lnhoifKey].ifHysA5Th3
-                else:
-                    dnLnhoif, ifA3, ifA5 = ('NA', 'NA', 'NA')
-                line.extend([dnLnhoif, ifA3, ifA5])
-                
-                #erab abnormal release(cause=ue_lost or ho_fail) for qci1, source cell only
-                m8006Key = val.lnbtsId + '_' + val.lncelId
-                if m8006Key in self.m8006AggData:
-                    ueLost = self.m8006AggData[m8006Key].erabRelQci1UeLost
-                    hoFail = self.m8006AggData[m8006Key].erabRelQci1HoFail
-                else:
-                    ueLost, hoFail = ('NA', 'NA')
-                line.extend([ueLost, hoFail])
-                
-                msg1, msg2, msg3, msg5, rasrMsg2, rasrMsg3, rrcSsr = ('NA', 'NA', 'NA', 'NA', 'NA', 'NA', 'NA')
-                drbAtt, drbSucc, drbFailTim, drbFailOth = ('NA', 'NA', 'NA', 'NA')
-                erabAtt, erabSucc, erabFailRrna, erabFailTru, erabFailUel, erabFailRip, erabFailUp, erabFailMob, erabFailOth = ('NA', 'NA', 'NA', 'NA', 'NA', 'NA', 'NA', 'NA', 'NA')
-                avgUeRrc, maxUeRrc, avgUeAct, maxUeAct = ('NA', 'NA', 'NA', 'NA')
-                rssiPucch, sinrPucch, rssiPusch, sinrPusch = ('NA', 'NA', 'NA', 'NA')
-                if eciDst in self.lnbtsIdLncelIdMap:
-                    #msg1/2/3/5 count, target cell only
-                    m8001Key = self.lnbtsIdLncelIdMap[eciDst]
-                    m8013Key = self.lnbtsIdLncelIdMap[eciDst]
-                    if m8001Key in self.m8001AggData and m8013Key in self.m8013AggData:
-                        msg1 = self.m8001AggData[m8001Key].smallMsg1Att + self.m8001AggData[m8001Key].largeMsg1Att + self.m8001AggData[m8001Key].dedMsg1Att
-                        msg2 = self.m8001AggData[m8001Key].rachMsg2
-                        msg3 = self.m8013AggData[m8013Key].rrcMsg3Mos + self.m8013AggData[m8013Key].rrcMsg3Mt + self.m8013AggData[m8013Key].rrcMsg3Mod + self.m8013AggData[m8013Key].rrcMsg3Emg + self.m8013AggData[m8013Key].rrcMsg3HiPrio + self.m8013AggData[m8013Key].rrcMsg3DelTol
-                        msg5 = self.m8013AggData[m8013Key].rrcMsg5
-                        rasrMsg2 = round(100 * msg2 / msg1, 2) if msg1 > 0 else 'DIV0'
-                        rasrMsg3 = round(100 * msg3 / msg1, 2) if msg1 > 0 else 'DIV0'
-                        rrcSsr = round(100 * msg5 / msg3, 2) if msg3 > 0 else 'DIV0'
-
-                    #drb/erab setup count, target cell only
-                    m8006Key = self.lnbtsIdLncelIdMap[eciDst]
-                    m8007Key = self.lnbtsIdLncelIdMap[eciDst]
-                    if m8006Key in self.m8006AggData and m8007Key in self.m8007AggData:
-                        drbAtt = self.m8007AggData[m8007Key].drbSetupAtt
-                        drbSucc = self.m8007AggData[m8007Key].drbSetupSucc
-                        drbFailTim = self.m8007AggData[m8007Key].drbSetupFailTimer
-                        drbFailOth = drbAtt - drbSucc - drbFailTim
-                        erabAtt = self.m8006AggData[m8006Key].erabSetupAtt
-                        erabSucc = self.m8006AggData[m8006Key].erabSetupSucc
-                        erabFailRrna = self.m8006AggData[m8006Key].erabSetupFailRrnaIni + self.m8006AggData[m8006Key].erabSetupFailRrnaAdd
-                        erabFailTru = self.m8006AggData[m8006Key].erabSetupFailTruIni + self.m8006AggData[m8006Key].erabSetupFailTruAdd
-                        erabFailUel = self.m8006AggData[m8006Key].erabSetupFailUelIni + self.m8006AggData[m8006Key].erabSetupFailUelAdd
-                        erabFailRip = self.m8006AggData[m8006Key].erabSetupFailRipIni + self.m8006AggData[m8006Key].erabSetupFailRipAdd
-                        erabFailUp = self.m8006AggData[m8006Key].erabSetupFailUp
-                        erabFailMob = self.m8006AggData[m8006Key].erabSetupFailMob
-                        erabFailOth = erabAtt - erabSucc - erabFailRrna - erabFailTru - erabFailUel - erabFailRip - erabFailUp - erabFailMob
-
-                    #rrc_connected/active ue count, target cell only
-                    m8051Key = self.lnbtsIdLncelIdMap[eciDst]
-                    if m8051Key in self.m8051AggData:
-                        avgUeRrc = self.m8051AggData[m8051Key].avgUeRrcConn
-                        maxUeRrc = self.m8051AggData[m8051Key].maxUeRrcConn
-                        avgUeAct = self.m8051AggData[m8051Key].avgUeAct
-                        maxUeAct = self.m8051AggData[m8051Key].maxUeAct
-                    
-                    #pucch/pusch rssi/sinr, target cell only
-                    m8005Key = self.lnbtsIdLncelIdMap[eciDst]
-                    if m8005Key in self.m8005AggData:
-                        rssiPucch = self.m8005AggData[m8005Key].avgRssiPucch
-                        sinrPucch = self.m8005AggData[m8005Key].avgSinrPucch
-                        rssiPusch = self.m8005AggData[m8005Key].avgRssiPusch
-                        sinrPusch = self.m8005AggData[m8005Key].avgSinrPusch
-                        
-                line.extend([msg1, msg2, msg3, msg5, rasrMsg2, rasrMsg3, rrcSsr])
-                line.extend([drbAtt, drbSucc, drbFailTim, drbFailOth])
-                line.extend([erabAtt, erabSucc, erabFailRrna, erabFailTru, erabFailUel, erabFailRip, erabFailUp, erabFailMob, erabFailOth])
-                line.extend([avgUeRrc, maxUeRrc, avgUeAct, maxUeAct])
-                line.extend([rssiPucch, sinrPucch, rssiPusch, sinrPusch])
-                
-                #for ATU grid info
-                gridSrcKey = str(enbIdSrc) + '_' + str(lcrIdSrc)
-                gridDstKey = str(enbIdDst) + '_' + str(lcrIdDst)
-                if gridSrcKey in self.gridData:
-                    isGrid = 'YES'
-                else:
-                    isGrid = 'NO'
-                isGrid = isGrid + '_'
-                if gridDstKey in self.gridData:
-                    isGrid = isGrid + 'YES'
-                else:
-                    isGrid = isGrid + 'NO'
-                line.extend([isGrid])
-                
-                line = list(map(str, line))
-                f.write(','.join(line))
-                f.write('\n')
+            #values are converted to text column by column, then written in blocks of rows
+            columns = [list(map(str, col.tolist() if isinstance(col, np.ndarray) else col)) for col in columns]
+            for start in range(0, len(columns[0]), 65536):
+                f.writelines([','.join(line) + '\n' for line in zip(*[col[start:start + 65536] for col in columns])])
                 
     def procUserCase03(self):
         self.ngwin.logEdit.append('<font color=blue>Performing analysis for user case #03: clean LNADJ/LNREL</font>')
-        qApp.processEvents()
+        processEvents()
         
         #user case#3: clean lnadj/lnrel
-        for lncelidx in self.lncelData.keys():
-            for lncelidy in self.lncelData.keys():
-                if lncelidx == lncelidy:
-                    continue
-                lnbtsidx = self.lncelData[lncelidx].lnbtsId
-                enbx = self.lncelData[lncelidx].enbId
-                lcrx = self.lncelData[lncelidy].lcrId
-                lnbtsidy = self.lncelData[lncelidy].lnbtsId
-                enby = self.lncelData[lncelidy].enbId
-                lcry = self.lncelData[lncelidy].lcrId
-                
-                #x-->y
-                m8015xy = lnbtsidx + '_' + lncelidx + '_' + str(256*int(enby)+int(lcry)) 
-                lnrelxy = lncelidx + '_' + enby + '_' + lcry
-                lnadjxy = lnbtsidx + '_' + enby
-                
-                #y-->x
-                m8015yx = lnbtsidy + '_' + lncelidy + '_' + str(256*int(enbx)+int(lcrx))
-                lnrelyx = lncelidy + '_' + enbx + '_' + lcrx
-                lnadjyx = lnbtsidy + '_' + enbx
-                
-                if lnrelxy in self.lnrelData and lnrelyx in self.lnrelData:
-                    if checkM8015(m8015xy) and checkM8015(m8015yx):
-                        continue
-                    else:
-                        #possible uni-directional NR
-                        pass
-                elif not (lnrelxy in self.lnrelData or lnrelyx in self.lnrelData):
-                    if enbx == enby or lnadjxy in self.lnadjData or lnadjyx in self.lnadjData:
-                        #redundant NR?
-                        pass
+        #only cell pairs with LNREL, M8015 or LNADJ in either direction(or of the same eNB) are checked, as looked up in neighbour graph:
+        #(1) possible uni-directional NR: LNREL x->y and y->x, but HO not in both directions
+        #(2) redundant NR?: no LNREL x->y or y->x, but same eNB or LNADJ x->y or y->x
+        names = [name for name in ('lncel', 'lnrel', 'lnadj', 'm8015') if name not in self.tables]
+        if len(names) > 0:
+            self.loadCsvTables(names)
+        graph = NgNbrGraph(self.tables['lncel'], self.tables['lnrel'], self.tables['lnadj'], self.tables['m8015'], M8015_HO_COUNTERS)
+        numRel, numHo, numAdj = graph.numEdges()
+        self.ngwin.logEdit.append('Neighbour graph: %d cells, %d LNREL, %d M8015 relations, %d LNADJ' % (graph.numCells, numRel, numHo, numAdj))
+        processEvents()
+        
+        x, y = graph.pairs()
+        relxy = graph.hasRel(x, y)
+        relyx = graph.hasRel(y, x)
+        hoxy = graph.numHo(x, y)
+        hoyx = graph.numHo(y, x)
+        adj = graph.hasAdj(x, y) | graph.hasAdj(y, x)
+        oneWay = relxy & relyx & ~((hoxy > 0) & (hoyx > 0))
+        redundant = ~relxy & ~relyx & ((graph.enbIds[x] == graph.enbIds[y]) | adj)
+        rows = np.flatnonzero(oneWay | redundant)
+        self.ngwin.logEdit.append('%d cell pairs checked: %d possible uni-directional NR, %d redundant NR' % (len(x), int(oneWay.sum()), int(redundant.sum())))
+        processEvents()
+        
+        #exported next to neds_*.csv
+        outDir = self.csvDir
+        with open(os.path.join(outDir, 'lnrel_clean_%s.csv' % time.strftime('%Y%m%d_%H%M%S', time.localtime())), 'w') as f:
+            self.ngwin.logEdit.append('-->Exporting results to: %s' % f.name)
+            processEvents()
+            
+            header = ['LNCEL_ID_X', 'ENB_ID_X', 'LCR_ID_X', 'LNCEL_ID_Y', 'ENB_ID_Y', 'LCR_ID_Y', 'LNREL_XY', 'LNREL_YX', 'HO_XY', 'HO_YX', 'LNADJ', 'CHECK']
+            f.write(','.join(header))
+            f.write('\n')
+            
+            cols = [graph.lncelIds[x[rows]], graph.enbIds[x[rows]], graph.lcrIds[x[rows]], graph.lncelIds[y[rows]], graph.enbIds[y[rows]], graph.lcrIds[y[rows]],
+                    np.where(relxy[rows], 'YES', 'NO'), np.where(relyx[rows], 'YES', 'NO'), hoxy[rows], hoyx[rows], np.where(adj[rows], 'YES', 'NO'),
+                    np.where(oneWay[rows], 'UNI_DIRECTIONAL_NR', 'REDUNDANT_NR')]
+            for line in zip(*[col.tolist() for col in cols]):
+                line = list(map(str, line))
+                f.write(','.join(line))
+                f.write('\n')
             
     def procUserCase04(self):
         self.ngwin.logEdit.append('<font color=blue>Performing analysis for user case #04: lnhoif/irfim configuration analysis</font>')
-        qApp.processEvents()
+        processEvents()
         
         earfcnSet = ['37900', '38098', '38400', '38544', '38950', '39148']
         
+        #cells of LNCEL: the last row of each lncel id
+        lncel = self.tables['lncel']
+        cells = lastRows(lncel.texts('LNCEL_ID'))
+        enbIds, lcrIds, earfcns = [lncel.texts(z) for z in ('ENB_ID', 'LCR_ID', 'EARFCN')]
+        
         #check LNHOIF
-        for key in self.lnhoifData.keys():
-            tokens = key.split('_')
-            lncelId = tokens[0]
-            earfcn = tokens[1]
-            
+        lnhoif = self.tables['lnhoif']
+        for lncelId,earfcn in lastRows(zip(lnhoif.texts('LNCEL_ID'), lnhoif.texts('IF_EARFCN'))).keys():
             if earfcn == 'None':
                 continue
             
-            if lncelId in self.lncelData:
-                dn = self.lncelData[lncelId].enbId + '_' + self.lncelData[lncelId].lcrId
+            if lncelId in cells:
+                row = cells[lncelId]
+                dn = enbIds[row] + '_' + lcrIds[row]
                 if not dn in self.earfcnLnhoif:
                     self.earfcnLnhoif[dn] = [earfcn]
                 else:
@@ -1437,21 +802,21 @@ class NgM8015Proc(object):
         
         #check IRFIM
         invalidIrfim = ['ENBID,LCRID,EARFCN,IRFIM_DN,IF_EARFCN,IF_RES_PRIO,IF_RXLEV_MIN,IF_TH_LOW,IF_TH_HIGH,IF_MBW']
-        for key in self.irfimData.keys():
-            tokens = key.split('_')
-            lncelId = tokens[0]
-            earfcn = tokens[1]
-            
+        irfim = self.tables['irfim']
+        for (lncelId,earfcn),irfimRow in lastRows(zip(irfim.texts('LNCEL_ID'), irfim.texts('IF_EARFCN'))).items():
             if earfcn == 'None':
                 continue
             
-            if lncelId in self.lncelData:
-                if earfcn == self.lncelData[lncelId].earfcn:
+            if lncelId in cells:
+                row = cells[lncelId]
+                if earfcn == earfcns[row]:
                     #invalid IRFIM founded
-                    invalidIrfim.append(','.join([self.lncelData[lncelId].enbId, self.lncelData[lncelId].lcrId, self.lncelData[lncelId].earfcn, str(self.irfimData[key])]))
+                    irfimDn = '/'.join(irfim.text('CO_DN', irfimRow).split('/')[1:])
+                    invalidIrfim.append(','.join([enbIds[row], lcrIds[row], earfcns[row], irfimDn] +
+                                                 [irfim.text(z, irfimRow) for z in ('IF_EARFCN', 'IF_RES_PRIO', 'IF_RXLEV_MIN', 'IF_TH_LOW', 'IF_TH_HIGH', 'IF_MBW')]))
                     continue
                     
-                dn = self.lncelData[lncelId].enbId + '_' + self.lncelData[lncelId].lcrId
+                dn = enbIds[row] + '_' + lcrIds[row]
                 if not dn in self.earfcnIrfim:
                     self.earfcnIrfim[dn] = [earfcn]
                 else:
@@ -1460,27 +825,27 @@ class NgM8015Proc(object):
         outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
         with open(os.path.join(outDir, 'lnhoif_irfim_check_%s.csv' % time.strftime('%Y%m%d_%H%M%S', time.localtime())), 'w') as f:
             self.ngwin.logEdit.append('-->Exporting results to: %s' % f.name)
-            qApp.processEvents()
+            processEvents()
             
             header = ['ENBID', 'LCRID', 'EARFCN', 'LNHOIF_EARFCN', 'MISSED_LNHOIF_EARFCN', 'IRFIM_EARFCN', 'MISSED_IRFIM_EARFCN']
             f.write(','.join(header))
             f.write('\n')
             
-            for key,val in self.lncelData.items():
-                dn = val.enbId + '_' + val.lcrId
+            for key,row in cells.items():
+                dn = enbIds[row] + '_' + lcrIds[row]
                 if not dn in self.earfcnLnhoif and not dn in self.earfcnLnhoif:
                     continue
                 
-                line = [val.enbId, val.lcrId, val.earfcn]
+                line = [enbIds[row], lcrIds[row], earfcns[row]]
                 
                 if dn in self.earfcnLnhoif:
                     configued = '/'.join(self.earfcnLnhoif[dn])
-                    #missed = '/'.join([f for f in earfcnSet if not f in self.earfcnLnhoif[dn] and f != val.earfcn])
-                    missed = [f for f in earfcnSet if not f in self.earfcnLnhoif[dn] and f != val.earfcn]
+                    #missed = '/'.join([f for f in earfcnSet if not f in self.earfcnLnhoif[dn] and f != earfcns[row]])
+                    missed = [f for f in earfcnSet if not f in self.earfcnLnhoif[dn] and f != earfcns[row]]
                     #special handling for band 38/41
-                    if val.earfcn == '40540':
+                    if earfcns[row] == '40540':
                         missed.remove('37900')
-                    elif val.earfcn == '40738':
+                    elif earfcns[row] == '40738':
                         missed.remove('38098')
                     missed = '/'.join(missed)
                     
@@ -1490,12 +855,12 @@ class NgM8015Proc(object):
                 
                 if dn in self.earfcnIrfim:
                     configued = '/'.join(self.earfcnIrfim[dn])
-                    #missed = '/'.join([f for f in earfcnSet if not f in self.earfcnIrfim[dn] and f != val.earfcn])
-                    missed = [f for f in earfcnSet if not f in self.earfcnIrfim[dn] and f != val.earfcn]
+                    #missed = '/'.join([f for f in earfcnSet if not f in self.earfcnIrfim[dn] and f != earfcns[row]])
+                    missed = [f for f in earfcnSet if not f in self.earfcnIrfim[dn] and f != earfcns[row]]
                     #special handling for band 38/41
-                    if val.earfcn == '40540':
+                    if earfcns[row] == '40540':
                         missed.remove('37900')
-                    elif val.earfcn == '40738':
+                    elif earfcns[row] == '40738':
                         missed.remove('38098')
                     missed = '/'.join(missed)
                     
@@ -1509,21 +874,15 @@ class NgM8015Proc(object):
         if len(invalidIrfim) > 1:
             with open(os.path.join(outDir, 'irfim_problem_%s.csv' % time.strftime('%Y%m%d_%H%M%S', time.localtime())), 'w') as f:
                 self.ngwin.logEdit.append('-->Exporting results to: %s' % f.name)
-                qApp.processEvents()
+                processEvents()
                 for val in invalidIrfim:
                     f.write(val)
                     f.write('\n')
                 
-    def checkM8015(self, key):
-        if not key in self.m8015AggData:
-            return False
-        
-        val = self.m8015AggData[key]
-        numHo = val.iaHoPrepFail + val.iaHoAtt + val.irHoPrepFailAc + val.irHoPrepFailOth + val.irHoPrepFailQci + val.irHoPrepFailTime + val.irHoAtt
-        if numHo > 0:
-            return True 
-        else:
-            return False
-        
     def procUserCasexx(self):
         pass
+
+def processEvents():
+    #keep GUI responsive, no-op for headless run
+    if qApp is not None:
+        qApp.processEvents()
@@ -23,6 +23,7 @@ from ngsqlquery import NgSqlQuery
 from ngm8015proc import NgM8015Proc
 from ngsshsftp import NgSshSftp
 from ngrawpmparser import NgRawPmParser
+from ngmultirat import NgMultiRatJob
 import os
 
 class NgMainWin(QMainWindow):
@@ -82,6 +83,7 @@ class NgMainWin(QMainWindow):
             proc.makeEciMap()
             proc.procUserCase01()
             proc.procUserCase02()
+            proc.procUserCase03()
             proc.procUserCase04()
             self.logEdit.append('<font color=blue>Done!</font>')
 
@@ -91,6 +93,14 @@ class NgMainWin(QMainWindow):
     def onExecRawPmParser5g(self):
         parser = NgRawPmParser(self, '5g')
 
+    def onExecRawPmParser4g(self):
+        #PM.BTS*.xml.gz are parsed as gzip streams
+        parser = NgRawPmParser(self, '4g')
+
+    def onExecRawPmParserNsa(self):
+        #4g and 5g raw PM are parsed concurrently and joined into one KPI report
+        job = NgMultiRatJob(self)
+
     def onExecLteResGrid(self):
         dlg = NgLteGridUi(self)
         dlg.exec_()
@@ -131,6 +141,10 @@ class NgMainWin(QMainWindow):
         self.sshSftpAction.triggered.connect(self.onExecSshSftpClient)
         self.rawPmParserAction = QAction('Raw PM Parser(5G)')
         self.rawPmParserAction.triggered.connect(self.onExecRawPmParser5g)
+        self.rawPmParser4gAction = QAction('Raw PM Parser(4G)')
+        self.rawPmParser4gAction.triggered.connect(self.onExecRawPmParser4g)
+        self.rawPmParserNsaAction = QAction('Raw PM Parser(4G+5G NSA)')
+        self.rawPmParserNsaAction.triggered.connect(self.onExecRawPmParserNsa)
 
         #Options menu
         self.enableDebugAction = QAction('Enable Debug')
@@ -161,6 +175,8 @@ class NgMainWin(QMainWindow):
         self.miscMenu.addAction(self.sqlQueryAction)
         self.miscMenu.addAction(self.sshSftpAction)
         self.miscMenu.addAction(self.rawPmParserAction)
+        self.miscMenu.addAction(self.rawPmParser4gAction)
+        self.miscMenu.addAction(self.rawPmParserNsaAction)
 
         self.optionsMenu = self.menuBar().addMenu('Options')
         self.optionsMenu.addAction(self.enableDebugAction)
@@ -0,0 +1,225 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngmultirat.py
+Description:
+    NSA(4G+5G) job of raw PM parser: 4g(MeNB) and 5g(gNB) raw PM are parsed concurrently in separate worker processes,
+    rolled up to the same time bucket and joined into one combined KPI report.
+    usage: python ngmultirat.py [--in-4g DIR] [--in-5g DIR] [--bucket hour|day|MINUTES] [--level bts|network]
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import sys
+import time
+import argparse
+import logging
+import traceback
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import ngrawpmparser
+from ngpmstore import rollupPm, rollupDn
+from ngpmexport import REPORT_FORMATS, createReportWriter
+from ngpmstats import NgStageStats
+from ngrawpmparser import NgRawPmParser, UNUSED_AGGS, rollupLabel, processEvents, rawPmDir, parseRollupMinutes, parseMultiRatLevel, parseReportFormat
+
+#rats of NSA job, in the order of columns of combined report
+MULTI_RAT_RATS = ('4g', '5g')
+
+class NgJobWin(object):
+    #stand-in of NgMainWin in worker processes: log messages are kept and replayed to logEdit of the job when the worker finishes
+    def __init__(self, enableDebug=False):
+        self.enableDebug = enableDebug
+        self.logEdit = self
+        self.lines = []
+
+    def append(self, text):
+        self.lines.append(text)
+
+def joinDn(dn, level):
+    #dn of rolled-up row -> dn of combined report, e.g. 'LNBTS-1/LNCEL' and 'MRBTS-1/NRCELL' -> 'MRBTS-1' at bts level
+    if level == 'bts':
+        return 'MRBTS-%s' % dn.split('/')[0].split('-')[-1]
+    return 'NETWORK'
+
+def initMultiRatWorker():
+    #workers are headless: a worker forked from the GUI process inherits qApp(and its display connection), so processEvents of the parser
+    #is made a no-op there, events are processed by the GUI process only
+    ngrawpmparser.qApp = None
+
+def multiRatWorker(rat, args, enableDebug=False):
+    #run NgRawPmParser of rat, then calculate kpis of counters rolled up to (time bucket, level)
+    #return (rat, list of (agg, kpi names, rows of [stime, interval, dn, kpi values...]), settings, stats summary, log messages, error)
+    #settings={multiRatBucket, multiRatLevel, reportFormats, writeStats} as resolved from raw_pm_config.txt and args
+    win = NgJobWin(enableDebug)
+    try:
+        parser = NgRawPmParser(win, rat, args)
+        settings = {key:parser.args[key] for key in ('multiRatBucket', 'multiRatLevel', 'reportFormats', 'writeStats')}
+        level = parser.args['multiRatLevel']
+        data = rollupDn(rollupPm(parser.data, parser.args['multiRatBucket']), level)
+        tables = []
+        for agg,table in parser.calcKpis(data).items():
+            if agg in UNUSED_AGGS or len(table.names) == 0:
+                continue
+            rows = list(table.iterRows())
+            for row in rows:
+                row[2] = joinDn(row[2], level)
+            tables.append((agg, table.names, rows))
+        return rat, tables, settings, parser.stats.summary(rat=rat), win.lines, None
+    except Exception as e:
+        return rat, None, None, None, win.lines, traceback.format_exc()
+
+def joinKpiTables(ratTables):
+    #join kpi tables of all rats on (time bucket, dn) into one table: rows are indexed by a hash of (stime, interval, dn),
+    #so each row of each table is visited once, and kpis missing from a row(e.g. no 4g counters in that bucket) are 'NA'
+    #ratTables=list of (rat, tables), return (header, rows) with rows in the order of (stime, dn)
+    index = dict() #[key=(stime, interval, dn), val=row of combined table]
+    header = ['STIME', 'INTERVAL', 'DN']
+    blocks = [] #list of (rows of combined table, first column, values)
+    for rat,tables in ratTables:
+        for agg,names,rows in tables:
+            ids = np.array([index.setdefault((row[0], row[1], row[2]), len(index)) for row in rows], dtype=np.int64)
+            blocks.append((ids, len(header), rows))
+            header.extend(['%s.%s.%s' % (rat.upper(), agg, name) for name in names])
+
+    keys = list(index.keys())
+    combined = np.full((len(keys), len(header)), 'NA', dtype=object)
+    combined[:, :3] = np.array(keys, dtype=object).reshape((len(keys), 3))
+    for ids,col,rows in blocks:
+        if len(rows) > 0:
+            values = np.empty((len(rows), len(rows[0]) - 3), dtype=object)
+            values[:] = [row[3:] for row in rows]
+            combined[ids, col:col + values.shape[1]] = values
+    order = sorted(range(len(keys)), key=lambda i:(keys[i][0], keys[i][2]))
+    return header, combined[order].tolist()
+
+class NgMultiRatJob(object):
+    def __init__(self, ngwin, args=None, inDirs=None):
+        #args(if any) overrides raw_pm_config.txt of both rats, inDirs={rat, directory of raw pm} overrides raw_pm_dir_<rat>
+        #cache of each rat is kept in <cacheDir>/<rat>, so that incremental parsing of one rat doesn't prune cached results of the other
+        self.ngwin = ngwin
+        self.args = dict(args) if args is not None else dict()
+        cacheDir = self.args.get('cacheDir', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data/raw_pm_cache'))
+        outDir = self.args.get('outDir', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output'))
+        jobArgs = dict()
+        for rat in MULTI_RAT_RATS:
+            jobArgs[rat] = dict(self.args)
+            jobArgs[rat]['cacheDir'] = os.path.join(cacheDir, rat)
+            #only the combined report(and its stats summary) is exported
+            jobArgs[rat]['exportReport'] = False
+            if inDirs is not None and rat in inDirs:
+                jobArgs[rat]['inDir'] = inDirs[rat]
+
+        #each rat reads all raw pm files of its directory, so 4g and 5g of the same directory are refused
+        ratDirs = [os.path.normcase(os.path.abspath(rawPmDir(rat, jobArgs[rat]))) for rat in MULTI_RAT_RATS]
+        if len(set(ratDirs)) < len(ratDirs):
+            self.ngwin.logEdit.append('<font color=purple>4G and 5G raw PM must be in separate directories for NSA job, but both are %s! '
+                                      'Please check raw_pm_dir_4g/raw_pm_dir_5g of raw_pm_config.txt(or --in-4g/--in-5g).</font>' % ratDirs[0])
+            processEvents()
+            return
+
+        self.ngwin.logEdit.append('<font color=blue>Parsing 4G and 5G raw PM concurrently, please wait...</font>')
+        processEvents()
+        t0 = time.perf_counter()
+        self.stats = NgStageStats()
+        results = dict()
+        ratStats = dict() #[key=rat, val=stats summary of parser]
+        settings = None
+        with ProcessPoolExecutor(max_workers=len(MULTI_RAT_RATS), initializer=initMultiRatWorker) as executor:
+            futures = [executor.submit(multiRatWorker, rat, jobArgs[rat], self.ngwin.enableDebug) for rat in MULTI_RAT_RATS]
+            pending = set(futures)
+            while pending:
+                #keep gui responsive while workers are running
+                done, pending = concurrent.futures.wait(pending, timeout=0.2)
+                for future in done:
+                    rat, tables, ratSettings, stats, lines, error = future.result()
+                    for line in lines:
+                        self.ngwin.logEdit.append('[%s] %s' % (rat.upper(), line))
+                    if error is not None:
+                        self.ngwin.logEdit.append('<font color=purple>Error when processing raw PM(rat=%s)</font>' % rat)
+                        self.ngwin.logEdit.append(error)
+                    else:
+                        results[rat] = tables
+                        ratStats[rat] = stats
+                        settings = ratSettings
+                processEvents()
+        self.ngwin.logEdit.append('<font color=blue>4G and 5G KPIs calculated in %.1f seconds.</font>' % (time.perf_counter() - t0))
+        processEvents()
+        self.stats.endStage('rats', {'rats':len(results)})
+        if len(results) == 0:
+            return
+
+        self.header, self.rows = joinKpiTables([(rat, results[rat]) for rat in MULTI_RAT_RATS if rat in results])
+        self.ngwin.logEdit.append('<font color=blue>Combined KPI report: %d rows, %d KPIs(%s)</font>' % (len(self.rows), len(self.header) - 3,
+                                  ', '.join(['%s=%d' % (rat, sum([len(names) for agg,names,rows in results[rat]])) for rat in MULTI_RAT_RATS if rat in results])))
+        processEvents()
+        self.stats.endStage('join', {'rows':len(self.rows), 'kpis':len(self.header) - 3})
+
+        #one sheet of all kpis: KPI_NSA_<level>_<bucket>, e.g. KPI_NSA_BTS_HOUR
+        base = os.path.join(outDir, 'nsa_kpi_report_%s' % time.strftime('%Y%m%d%H%M%S', time.localtime()))
+        name = 'KPI_NSA_%s_%s' % (settings['multiRatLevel'].upper(), rollupLabel(settings['multiRatBucket']))
+        if not os.path.exists(outDir):
+            os.makedirs(outDir)
+        for fmt in settings['reportFormats']:
+            try:
+                writer = createReportWriter(fmt, base)
+            except Exception as e:
+                self.ngwin.logEdit.append('<font color=purple>Report format(=%s) is not available: %s</font>' % (fmt, e))
+                continue
+            #a failed format doesn't prevent the others from being exported
+            try:
+                parts = writer.writeTable(name, self.header, self.rows)
+                if parts > 1:
+                    self.ngwin.logEdit.append('<font color=purple>Sheet %s exceeds excel row limit, which is split into %d sheets!</font>' % (name, parts))
+                numRows, elapsed = writer.close()
+                self.ngwin.logEdit.append('<font color=blue>Exported %d rows to %s in %.1f seconds</font>' % (numRows, writer.fn, elapsed))
+            except Exception as e:
+                self.ngwin.logEdit.append('<font color=purple>Error when exporting to %s(format=%s)</font>' % (writer.fn, fmt))
+                self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+        self.stats.endStage('export', {'formats':len(settings['reportFormats'])})
+
+        #one stats summary of the job next to the combined report, with stats summaries of parsers of both rats
+        if settings['writeStats']:
+            try:
+                self.stats.save(base + '_stats.json', rat='nsa', rats=ratStats)
+                self.ngwin.logEdit.append('<font color=blue>Stage stats written to %s</font>' % (base + '_stats.json'))
+            except Exception as e:
+                self.ngwin.logEdit.append(traceback.format_exc())
+        self.ngwin.logEdit.append('<font color=blue>Done!</font>')
+        processEvents()
+
+if __name__ == '__main__':
+    #headless run, e.g. python -m ngmultirat --in-4g data/raw_pm_4g --in-5g data/raw_pm_5g --bucket hour --level bts
+    from ngconsole import NgConsoleWin
+
+    parser = argparse.ArgumentParser(description='NSA(4G+5G) job of raw PM parser: parse 4g and 5g raw PM concurrently and export one combined KPI report.')
+    parser.add_argument('--in-4g', dest='inDir4g', help='directory of 4g raw PM')
+    parser.add_argument('--in-5g', dest='inDir5g', help='directory of 5g raw PM')
+    parser.add_argument('--out', dest='outDir', help='directory of KPI report')
+    parser.add_argument('--cache', dest='cacheDir', help='directory of cached results of incremental parsing, one sub-directory per rat')
+    parser.add_argument('--workers', type=int, help='number of worker processes of each rat, 0 = one worker per cpu core')
+    parser.add_argument('--bucket', help='time bucket of join: hour, day or minutes')
+    parser.add_argument('--level', help='level of join: bts or network')
+    parser.add_argument('--format', dest='reportFormats', help='report formats, comma separated list of %s' % ', '.join(REPORT_FORMATS))
+    parser.add_argument('--debug', action='store_true')
+    opts = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    args = dict()
+    for key,val in (('outDir', opts.outDir), ('cacheDir', opts.cacheDir), ('parseWorkers', opts.workers)):
+        if val is not None:
+            args[key] = os.path.abspath(val) if key.endswith('Dir') else val
+    if opts.bucket is not None:
+        args['multiRatBucket'] = parseRollupMinutes(opts.bucket)
+    if opts.level is not None:
+        args['multiRatLevel'] = parseMultiRatLevel(opts.level)
+    if opts.reportFormats is not None:
+        args['reportFormats'] = [parseReportFormat(z) for z in opts.reportFormats.split(',') if z.strip() != '']
+    inDirs = {rat:os.path.abspath(val) for rat,val in (('4g', opts.inDir4g), ('5g', opts.inDir5g)) if val is not None}
+    NgMultiRatJob(NgConsoleWin(opts.debug, logging.getLogger('ngmultirat')), args, inDirs)
+    sys.exit(0)
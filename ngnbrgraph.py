@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngnbrgraph.py
+Description:
+    Neighbour graph of M8015 analyzer: LNREL and M8015 edges as adjacency lists over integer cell ids, LNADJ as eNB pairs.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import numpy as np
+from ngcsvtable import CsvGroups
+
+def groupCells(keys):
+    #cells grouped by keys(e.g. enb id of each cell): (sorted unique keys, start of each group in cells, size of each group, cells sorted by keys)
+    cells = np.argsort(keys, kind='stable')
+    groups, starts, sizes = np.unique(keys[cells], return_index=True, return_counts=True)
+    return groups, starts, sizes, cells
+
+def expandPairs(srcStarts, srcSizes, srcCells, dstStarts, dstSizes, dstCells):
+    #all cell pairs(src, dst) of src group x dst group of each entry, groups given by start/size in srcCells/dstCells, see groupCells
+    sizes = srcSizes * dstSizes
+    entries = np.repeat(np.arange(len(sizes)), sizes)
+    offsets = np.arange(len(entries)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    src = srcCells[srcStarts[entries] + offsets // dstSizes[entries]]
+    dst = dstCells[dstStarts[entries] + offsets % dstSizes[entries]]
+    return src, dst
+
+def lookup(sortedKeys, keys):
+    #index of keys in sortedKeys(sorted and unique), -1 if not found
+    pos = np.searchsorted(sortedKeys, keys)
+    pos = np.minimum(pos, max(len(sortedKeys) - 1, 0))
+    found = (sortedKeys[pos] == keys) if len(sortedKeys) > 0 else np.zeros(len(keys), dtype=bool)
+    return np.where(found, pos, -1)
+
+class NgNbrGraph(object):
+    #cells are numbered 0..numCells-1 in the order of lncel table, edges of each kind are kept as sorted codes src*numCells+dst,
+    #which are adjacency lists(CSR) of all cells at once: neighbours of cell x are dst of codes in [ptr[x], ptr[x+1])
+    #pair lookups are binary searches into these codes, so checks of N pairs cost O(N*log(E)) instead of scanning all cell pairs
+    def __init__(self, lncel, lnrel, lnadj, m8015=None, hoCounters=()):
+        #lncel/lnrel/lnadj/m8015 are CsvTable of NEDS_SCHEMAS, number of HO of a M8015 edge is sum of hoCounters
+        valid = lncel.valid['LNCEL_ID'] & lncel.valid['ECI']
+        self.lncelIds = lncel.values['LNCEL_ID'][valid]
+        self.lnbtsIds = lncel.values['LNBTS_ID'][valid]
+        self.enbIds = lncel.values['ENB_ID'][valid]
+        self.lcrIds = lncel.values['LCR_ID'][valid]
+        self.ecis = lncel.values['ECI'][valid]
+        self.numCells = len(self.lncelIds)
+        #first cell of each lncel id/eci
+        self.sortedLncelIds, first = np.unique(self.lncelIds, return_index=True)
+        self.cellOfLncelId = first
+        self.sortedEcis, first = np.unique(self.ecis, return_index=True)
+        self.cellOfEci = first
+
+        #LNREL: lncel -> (adj enb, adj lcr)
+        valid = lnrel.valid['LNCEL_ID'] & lnrel.valid['ADJ_ENB_ID'] & lnrel.valid['ADJ_LCR_ID']
+        src = self.cellsOfLncelIds(lnrel.values['LNCEL_ID'][valid])
+        dst = self.cellsOfEcis(256 * lnrel.values['ADJ_ENB_ID'][valid] + lnrel.values['ADJ_LCR_ID'][valid])
+        self.relCodes = self.edgeCodes(src, dst)
+        self.relPtr = self.edgePtr(self.relCodes)
+
+        #M8015: lncel -> eci, with number of HO of each edge
+        self.hoCodes = np.zeros(0, dtype=np.int64)
+        self.hoNums = np.zeros(0, dtype=np.int64)
+        if m8015 is not None and len(m8015) > 0:
+            groups = CsvGroups(m8015, ['LNCEL_ID', 'ECI_ID'])
+            keyValid = (groups.count(m8015, 'LNCEL_ID') > 0) & (groups.count(m8015, 'ECI_ID') > 0)
+            src = self.cellsOfLncelIds(m8015.values['LNCEL_ID'][groups.first])
+            dst = self.cellsOfEcis(m8015.values['ECI_ID'][groups.first])
+            nums = np.zeros(len(groups), dtype=np.int64)
+            for name in hoCounters:
+                nums = nums + groups.sum(m8015, name)
+            keep = keyValid & (src >= 0) & (dst >= 0) & (src != dst)
+            codes = src[keep] * self.numCells + dst[keep]
+            order = np.argsort(codes, kind='stable')
+            self.hoCodes = codes[order]
+            self.hoNums = nums[keep][order]
+        self.hoPtr = self.edgePtr(self.hoCodes)
+
+        #LNADJ: lnbts -> adj enb
+        valid = lnadj.valid['LNBTS_ID'] & lnadj.valid['ADJ_ENB_ID']
+        self.adjCodes = np.unique(self.btsCodes(lnadj.values['LNBTS_ID'][valid], lnadj.values['ADJ_ENB_ID'][valid]))
+
+    def cellsOfLncelIds(self, lncelIds):
+        cells = lookup(self.sortedLncelIds, lncelIds)
+        return np.where(cells >= 0, self.cellOfLncelId[cells], -1)
+
+    def cellsOfEcis(self, ecis):
+        cells = lookup(self.sortedEcis, ecis)
+        return np.where(cells >= 0, self.cellOfEci[cells], -1)
+
+    def edgeCodes(self, src, dst):
+        #sorted unique codes of edges src->dst, edges of unknown cells(-1) and loops are dropped
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        return np.unique(src[keep] * self.numCells + dst[keep])
+
+    def edgePtr(self, codes):
+        #CSR row pointers of sorted edge codes
+        return np.searchsorted(codes // max(self.numCells, 1), np.arange(self.numCells + 1))
+
+    def btsCodes(self, lnbtsIds, enbIds):
+        #lnbts ids and enb ids are below 2^31 in NetAct
+        return lnbtsIds.astype(np.int64) * (1 << 31) + enbIds
+
+    def numEdges(self):
+        return len(self.relCodes), len(self.hoCodes), len(self.adjCodes)
+
+    def neighbours(self, cell, kind='lnrel'):
+        #target cells of LNREL(kind=lnrel) or M8015(kind=ho) of cell
+        codes, ptr = (self.relCodes, self.relPtr) if kind == 'lnrel' else (self.hoCodes, self.hoPtr)
+        return codes[ptr[cell]:ptr[cell + 1]] % self.numCells
+
+    def hasRel(self, src, dst):
+        #LNREL src->dst configured
+        return lookup(self.relCodes, src * self.numCells + dst) >= 0
+
+    def numHo(self, src, dst):
+        #number of HO src->dst reported by M8015, 0 if none
+        pos = lookup(self.hoCodes, src * self.numCells + dst)
+        return np.where(pos >= 0, self.hoNums[np.maximum(pos, 0)] if len(self.hoNums) > 0 else 0, 0)
+
+    def hasAdj(self, src, dst):
+        #LNADJ from lnbts of src to enb of dst configured
+        return lookup(self.adjCodes, self.btsCodes(self.lnbtsIds[src], self.enbIds[dst])) >= 0
+
+    def adjPairs(self):
+        #cell pairs(src, dst) of the same eNB, or of LNADJ from lnbts of src to enb of dst, loops included
+        #pairs are expanded per eNB/LNADJ(cells of lnbts x cells of adj enb), so their number is about cells per eNB squared times (eNBs + LNADJ)
+        enbs, enbStarts, enbSizes, enbCells = groupCells(self.enbIds)
+        btss, btsStarts, btsSizes, btsCells = groupCells(self.lnbtsIds)
+        #LNADJ(lnbts, enb) of known lnbts and enb
+        adjBts = lookup(btss, self.adjCodes // (1 << 31))
+        adjEnb = lookup(enbs, self.adjCodes % (1 << 31))
+        keep = (adjBts >= 0) & (adjEnb >= 0)
+        adjBts, adjEnb = adjBts[keep], adjEnb[keep]
+        src1, dst1 = expandPairs(enbStarts, enbSizes, enbCells, enbStarts, enbSizes, enbCells)
+        src2, dst2 = expandPairs(btsStarts[adjBts], btsSizes[adjBts], btsCells, enbStarts[adjEnb], enbSizes[adjEnb], enbCells)
+        return np.concatenate([src1, src2]), np.concatenate([dst1, dst2])
+
+    def pairs(self):
+        #cell pairs(x, y) with x < y of any LNREL, M8015 or LNADJ edge between them(in either direction), or of the same eNB
+        src, dst = self.adjPairs()
+        codes = np.concatenate([self.relCodes, self.hoCodes])
+        src = np.concatenate([codes // max(self.numCells, 1), src])
+        dst = np.concatenate([codes % max(self.numCells, 1), dst])
+        keep = src != dst
+        codes = np.unique(np.minimum(src[keep], dst[keep]) * self.numCells + np.maximum(src[keep], dst[keep]))
+        return codes // max(self.numCells, 1), codes % max(self.numCells, 1)
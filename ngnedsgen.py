@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngnedsgen.py
+Description:
+    Synthetic neds_*.csv generator for benchmarks of M8015 analyzer, columns are those of NEDS_SCHEMAS.
+    usage: python ngnedsgen.py OUTDIR [--bts N] [--cells N] [--nbrs N] [--periods N]
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+from ngm8015proc import NEDS_SCHEMAS
+
+#candidate earfcns of cells
+NEDS_EARFCNS = [37900, 38098, 38400, 38544, 38950, 39148]
+
+class NgNedsGenerator(object):
+    #numBts eNBs x numCells cells, each cell has numNbrs LNREL to cells of nearby eNBs
+    #M8015 is reported for most LNREL(some relations carry no traffic) and for a few pairs without LNREL(missing NR)
+    def __init__(self, numBts=100, numCells=3, numNbrs=16, numPeriods=24, startTime=datetime(2018, 3, 22, 0, 0, 0), invalidRatio=0.001, seed=1):
+        self.numBts = numBts
+        self.numCells = numCells
+        self.numNbrs = numNbrs
+        self.numPeriods = numPeriods
+        self.startTime = startTime
+        self.invalidRatio = invalidRatio
+        self.rng = np.random.default_rng(seed)
+
+        numCellsTot = numBts * numCells
+        cells = np.arange(numCellsTot)
+        self.bts = cells // numCells
+        self.lnbtsIds = 100000 + self.bts
+        self.enbIds = 400000 + self.bts
+        self.lncelIds = 1000000 + cells
+        self.lcrIds = cells % numCells + 1
+        self.ecis = 256 * self.enbIds + self.lcrIds
+        self.earfcns = np.array(NEDS_EARFCNS)[self.rng.integers(0, len(NEDS_EARFCNS), numCellsTot)]
+
+        #relations: target cells of eNBs within +/-10 of source eNB
+        src = np.repeat(cells, numNbrs)
+        dst = np.clip(self.bts[src] + self.rng.integers(-10, 11, len(src)), 0, numBts - 1) * numCells + self.rng.integers(0, numCells, len(src))
+        pairs = np.unique(np.stack([src, dst], axis=1)[src != dst], axis=0)
+        self.relSrc, self.relDst = pairs[:, 0], pairs[:, 1]
+        #traffic: 90% of relations, plus 5% pairs without relation
+        traffic = self.rng.random(len(self.relSrc)) < 0.9
+        extra = self.rng.integers(0, numCellsTot, (len(self.relSrc) // 20, 2))
+        extra = extra[extra[:, 0] != extra[:, 1]]
+        pairs = np.unique(np.concatenate([pairs[traffic], extra]), axis=0)
+        self.hoSrc, self.hoDst = pairs[:, 0], pairs[:, 1]
+
+    def ints(self, low, high, n):
+        #random integers as text, invalidRatio of them are 'None'(null exported by NgSqlQuery)
+        values = self.rng.integers(low, high, n).astype(str).astype(object)
+        values[self.rng.random(n) < self.invalidRatio] = 'None'
+        return values
+
+    def writeCsv(self, outDir, name, columns):
+        fn, ints, strs = NEDS_SCHEMAS[name]
+        header = ints + strs
+        cols = [np.asarray(columns[col]).astype(str) for col in header]
+        with open(os.path.join(outDir, fn), 'w') as f:
+            f.write(','.join(header))
+            f.write('\n')
+            for start in range(0, len(cols[0]), 65536):
+                f.write('\n'.join([','.join(row) for row in zip(*[col[start:start + 65536].tolist() for col in cols])]))
+                f.write('\n')
+        return os.path.join(outDir, fn)
+
+    def periods(self, n):
+        #period start time of each of n rows per period
+        return np.repeat(np.array([(self.startTime + timedelta(hours=p)).strftime('%Y-%m-%d %H:%M:%S') for p in range(self.numPeriods)]), n)
+
+    def generate(self, outDir):
+        if not os.path.exists(outDir):
+            os.makedirs(outDir)
+        fns = []
+        n = len(self.lncelIds)
+        dn = np.array(['PLMN-PLMN/MRBTS-%d/LNBTS-%d' % (e, e) for e in (400000 + np.arange(self.numBts)).tolist()])[self.bts]
+
+        columns = {'LNBTS_ID':self.lnbtsIds, 'LNCEL_ID':self.lncelIds, 'ENB_ID':self.enbIds, 'LCR_ID':self.lcrIds, 'ECI':self.ecis, 'EARFCN':self.earfcns,
+                   'PCI':self.rng.integers(0, 504, n), 'TAC':12000 + self.bts // 50}
+        for col in NEDS_SCHEMAS['lncel'][2]:
+            columns[col] = self.rng.integers(0, 30, n)
+        fns.append(self.writeCsv(outDir, 'lncel', columns))
+
+        src, dst = self.relSrc, self.relDst
+        columns = {'LNCEL_ID':self.lncelIds[src], 'ADJ_ENB_ID':self.enbIds[dst], 'ADJ_LCR_ID':self.lcrIds[dst],
+                   'CO_DN':['%s/LNCEL-%d/LNREL-%d' % (z, lcr, k) for k,(z,lcr) in enumerate(zip(dn[src].tolist(), self.lcrIds[src].tolist()))],
+                   'CIO':self.rng.choice(['dB0', 'dB-2', 'dB2'], len(src)), 'HO_ALLOWED':self.rng.choice(['allowed', 'forbidden'], len(src), p=[0.95, 0.05]),
+                   'NR_STAT':self.rng.choice(['0', '1'], len(src))}
+        fns.append(self.writeCsv(outDir, 'lnrel', columns))
+
+        adj = np.unique(np.stack([self.bts[src], self.bts[dst]], axis=1), axis=0)
+        adj = adj[adj[:, 0] != adj[:, 1]]
+        columns = {'LNBTS_ID':100000 + adj[:, 0], 'ADJ_ENB_ID':400000 + adj[:, 1], 'CO_DN':np.char.add(dn[adj[:, 0] * self.numCells], np.char.add('/LNADJ-', np.arange(len(adj)).astype(str))),
+                   'ADJ_ENB_IP':np.char.add('10.0.', (adj[:, 1] % 256).astype(str)), 'X2_STAT':self.rng.choice(['available', 'unavailable'], len(adj), p=[0.97, 0.03])}
+        fns.append(self.writeCsv(outDir, 'lnadj', columns))
+
+        adjl = np.unique(np.stack([self.bts[src], dst], axis=1), axis=0)
+        adjl = adjl[adjl[:, 0] != self.bts[adjl[:, 1]]]
+        columns = {'LNBTS_ID':100000 + adjl[:, 0], 'ADJ_ENB_ID':self.enbIds[adjl[:, 1]], 'ADJ_LCR_ID':self.lcrIds[adjl[:, 1]], 'ADJ_EARFCN':self.earfcns[adjl[:, 1]],
+                   'ADJ_PCI':self.rng.integers(0, 504, len(adjl)), 'ADJ_TAC':12000 + self.bts[adjl[:, 1]] // 50, 'CO_DN':np.char.add('LNADJL-', np.arange(len(adjl)).astype(str))}
+        fns.append(self.writeCsv(outDir, 'lnadjl', columns))
+
+        #two inter-frequency layers per cell
+        cells = np.repeat(np.arange(n), 2)
+        ifEarfcns = np.array(NEDS_EARFCNS)[(np.searchsorted(NEDS_EARFCNS, self.earfcns[cells]) + np.tile([1, 2], n)) % len(NEDS_EARFCNS)]
+        for name in ('lnhoif', 'irfim'):
+            columns = {'LNCEL_ID':self.lncelIds[cells], 'IF_EARFCN':ifEarfcns, 'CO_DN':np.char.add(dn[cells], np.char.add('/%s-' % name.upper(), np.arange(len(cells)).astype(str)))}
+            for col in NEDS_SCHEMAS[name][2][1:]:
+                columns[col] = self.rng.integers(0, 30, len(cells))
+            fns.append(self.writeCsv(outDir, name, columns))
+
+        #counters per period: M8015 per (source cell, target eci), the others per cell
+        numRows = len(self.hoSrc) * self.numPeriods
+        src = np.tile(self.hoSrc, self.numPeriods)
+        dst = np.tile(self.hoDst, self.numPeriods)
+        columns = {'LNBTS_ID':self.lnbtsIds[src], 'LNCEL_ID':self.lncelIds[src], 'ECI_ID':self.ecis[dst], 'PERIOD_START_TIME':self.periods(len(self.hoSrc))}
+        for col in NEDS_SCHEMAS['m8015'][1][3:]:
+            columns[col] = self.ints(0, 50 if '_ATT_' in col or '_SUCC_' in col else 3, numRows)
+        fns.append(self.writeCsv(outDir, 'm8015', columns))
+
+        cells = np.tile(np.arange(n), self.numPeriods)
+        for name in ('m8001', 'm8005', 'm8006', 'm8007', 'm8013', 'm8051'):
+            columns = {'LNBTS_ID':self.lnbtsIds[cells], 'LNCEL_ID':self.lncelIds[cells]}
+            for col in NEDS_SCHEMAS[name][1][2:]:
+                columns[col] = self.ints(-120, -80, len(cells)) if col.startswith('RSSI') else self.ints(0, 500, len(cells))
+            fns.append(self.writeCsv(outDir, name, columns))
+        return fns
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Synthetic neds_*.csv generator.')
+    parser.add_argument('outDir')
+    parser.add_argument('--bts', type=int, default=100)
+    parser.add_argument('--cells', type=int, default=3)
+    parser.add_argument('--nbrs', type=int, default=16)
+    parser.add_argument('--periods', type=int, default=24)
+    parser.add_argument('--seed', type=int, default=1)
+    opts = parser.parse_args()
+
+    gen = NgNedsGenerator(opts.bts, opts.cells, opts.nbrs, opts.periods, seed=opts.seed)
+    fns = gen.generate(opts.outDir)
+    print('%d files written to %s' % (len(fns), opts.outDir))
@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngpmarchive.py
+Description:
+    On-disk archive of parsed PM counters, partitioned per day and measurement type and read back as memory-mapped arrays.
+    layout: <archiveDir>/<rat>/dns.json, counters.json: dn and counter dictionaries(list of names, index is id)
+            <archiveDir>/<rat>/<YYYY-MM-DD>/<measType>/*.npy: one partition, see NgPmArchive.savePartition
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import json
+from datetime import datetime, timedelta
+import numpy as np
+from ngpmstore import PmTable
+
+class NgPmArchive(object):
+    def __init__(self, archiveDir, rat):
+        self.rat = rat
+        self.archiveDir = os.path.join(archiveDir, rat)
+        if not os.path.exists(self.archiveDir):
+            os.makedirs(self.archiveDir)
+
+        #dn and counter dictionaries, ids are never reused so that existing partitions stay valid
+        self.dns = self.loadDict('dns.json')
+        self.dnIndex = {dn:i for i,dn in enumerate(self.dns)}
+        self.counters = self.loadDict('counters.json')
+        self.counterIndex = {tag:i for i,tag in enumerate(self.counters)}
+        #sizes of dictionaries on disk
+        self.numSaved = (len(self.dns), len(self.counters))
+
+    def loadDict(self, name):
+        fn = os.path.join(self.archiveDir, name)
+        if not os.path.exists(fn):
+            return []
+        with open(fn, 'r') as f:
+            return json.load(f)
+
+    def saveDict(self, name, names):
+        fn = os.path.join(self.archiveDir, name)
+        with open(fn + '.tmp', 'w') as f:
+            json.dump(names, f)
+        os.replace(fn + '.tmp', fn)
+
+    def saveDicts(self):
+        #dictionaries are saved(if new ids added) before partitions referring to them, so that a partition never holds unknown ids
+        if self.numSaved != (len(self.dns), len(self.counters)):
+            self.saveDict('dns.json', self.dns)
+            self.saveDict('counters.json', self.counters)
+            self.numSaved = (len(self.dns), len(self.counters))
+
+    def dnId(self, dn):
+        i = self.dnIndex.get(dn)
+        if i is None:
+            i = self.dnIndex[dn] = len(self.dns)
+            self.dns.append(dn)
+        return i
+
+    def counterId(self, tag):
+        i = self.counterIndex.get(tag)
+        if i is None:
+            i = self.counterIndex[tag] = len(self.counters)
+            self.counters.append(tag)
+        return i
+
+    def days(self):
+        #days archived, in ascending order
+        return sorted([d for d in os.listdir(self.archiveDir) if os.path.isdir(os.path.join(self.archiveDir, d))])
+
+    def measTypes(self, day):
+        dayDir = os.path.join(self.archiveDir, day)
+        return sorted([m for m in os.listdir(dayDir) if os.path.exists(os.path.join(dayDir, m, 'valid.npy'))]) if os.path.isdir(dayDir) else []
+
+    def append(self, data):
+        #archive data={measType, PmTable}, rows of each day are merged into partition(day, measType), where rows of data override archived rows
+        #non-integer counters are not archived
+        numRows = 0
+        for measType,table in data.items():
+            table.flush()
+            days = dict() #[key=day, val=list of rows]
+            for row,key in enumerate(table.keys):
+                day = key[0][:10]
+                if day not in days:
+                    days[day] = []
+                days[day].append(row)
+
+            for day,rows in days.items():
+                part = self.loadPartition(day, measType, False)
+                if part is None:
+                    part = PmTable()
+                part.merge(subTable(table, rows))
+                self.savePartition(day, measType, part)
+                numRows = numRows + len(rows)
+        return numRows
+
+    def savePartition(self, day, measType, table):
+        #stimes/intervals/dns: minute of day, interval and dn id of each row
+        #counters: counter id of each column, values/valid: counter matrix in column-major order, so that reading a few counters maps only their pages
+        partDir = os.path.join(self.archiveDir, day, measType)
+        if not os.path.exists(partDir):
+            os.makedirs(partDir)
+        table.flush()
+        arrays = dict()
+        arrays['stimes'] = np.array([int(key[0][11:13]) * 60 + int(key[0][14:16]) for key in table.keys], dtype=np.int32)
+        arrays['intervals'] = np.array([int(key[1]) for key in table.keys], dtype=np.int32)
+        arrays['dns'] = np.array([self.dnId(key[2]) for key in table.keys], dtype=np.int32)
+        arrays['counters'] = np.array([self.counterId(tag) for tag in table.tags], dtype=np.int32)
+        arrays['values'] = np.asfortranarray(table.values)
+        arrays['valid'] = np.asfortranarray(table.valid)
+        self.saveDicts()
+        #valid.npy is written last, which marks the partition as complete
+        for name in ('stimes', 'intervals', 'dns', 'counters', 'values', 'valid'):
+            fn = os.path.join(partDir, '%s.npy' % name)
+            with open(fn + '.tmp', 'wb') as f:
+                np.save(f, arrays[name])
+            os.replace(fn + '.tmp', fn)
+
+    def loadPartition(self, day, measType, mmap=True, tags=None):
+        #PmTable of partition(day, measType), None if not archived
+        #with mmap, values/valid are read-only memory-mapped arrays, or only columns of tags(if given) are read into memory
+        partDir = os.path.join(self.archiveDir, day, measType)
+        if not os.path.exists(os.path.join(partDir, 'valid.npy')):
+            return None
+        stimes = np.load(os.path.join(partDir, 'stimes.npy')).tolist()
+        intervals = np.load(os.path.join(partDir, 'intervals.npy')).tolist()
+        dns = np.load(os.path.join(partDir, 'dns.npy')).tolist()
+        counters = np.load(os.path.join(partDir, 'counters.npy')).tolist()
+        values = np.load(os.path.join(partDir, 'values.npy'), mmap_mode='r' if mmap else None)
+        valid = np.load(os.path.join(partDir, 'valid.npy'), mmap_mode='r' if mmap else None)
+
+        cols = list(range(len(counters)))
+        if tags is not None:
+            tags = set(tags)
+            cols = [col for col in cols if self.counters[counters[col]] in tags]
+            values = np.ascontiguousarray(values[:, cols])
+            valid = np.ascontiguousarray(valid[:, cols])
+
+        table = PmTable()
+        t0 = datetime.strptime(day, '%Y-%m-%d')
+        stimeIndex = dict() #[key=minute of day, val=stime]
+        for m,interval,dn in zip(stimes, intervals, dns):
+            if m not in stimeIndex:
+                stimeIndex[m] = (t0 + timedelta(minutes=m)).strftime('%Y-%m-%d_%H:%M:%S')
+            table.addRow((stimeIndex[m], str(interval), self.dns[dn]))
+        for col in cols:
+            table.addTag(self.counters[counters[col]])
+        table.values = values
+        table.valid = valid
+        return table
+
+    def query(self, startDay, endDay, measTypes=None, tags=None):
+        #counters from startDay to endDay(inclusive, YYYY-MM-DD) as data={<measType>_<YYYYMMDD>, PmTable}, one PmTable per partition
+        #partitions outside the range are not touched, and values/valid of partitions are memory-mapped(see loadPartition)
+        #rows of tables of the same measType are disjoint, so counters are gathered from all of them as from one table
+        data = dict()
+        days = [day for day in self.days() if startDay <= day <= endDay]
+        allTypes = sorted(set([m for day in days for m in self.measTypes(day)]))
+        for measType in allTypes:
+            if measTypes is not None and measType not in measTypes:
+                continue
+            for day in days:
+                table = self.loadPartition(day, measType, True, tags)
+                if table is not None:
+                    data['%s_%s' % (measType, day.replace('-', ''))] = table
+        return data
+
+def subTable(table, rows):
+    #PmTable of rows of table(flushed), including non-integer counters
+    sub = PmTable()
+    for row in rows:
+        sub.addRow(table.keys[row])
+    for tag in table.tags:
+        sub.addTag(tag)
+    rows = np.array(rows, dtype=np.int64)
+    sub.values = table.values[rows]
+    sub.valid = table.valid[rows]
+    rowMap = {row:i for i,row in enumerate(rows.tolist())}
+    for (row, col), text in table.others.items():
+        if row in rowMap:
+            sub.others[(rowMap[row], col)] = text
+    return sub
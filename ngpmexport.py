@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngpmexport.py
+Description:
+    Report writers of raw PM parser: xlsx, csv, npz and parquet(requires pyarrow).
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import csv
+import time
+import numpy as np
+import xlsxwriter
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    #parquet export is not available without pyarrow
+    pa = None
+
+from ngkpiengine import KPI_RATIO, KPI_NA, KPI_DIV0
+
+#max rows of an excel sheet, including header
+EXCEL_MAX_ROWS = 1048576
+
+#supported report formats
+REPORT_FORMATS = ('xlsx', 'csv', 'npz', 'parquet')
+
+def createReportWriter(fmt, base):
+    #writer of report format, base is report path without extension, e.g. output/5g_kpi_report_20190321070000
+    if fmt == 'xlsx':
+        return NgXlsxWriter(base + '.xlsx')
+    elif fmt == 'csv':
+        return NgCsvWriter(base + '_csv')
+    elif fmt == 'npz':
+        return NgNpzWriter(base + '.npz')
+    elif fmt == 'parquet':
+        if pa is None:
+            raise ImportError('pyarrow is required for parquet export')
+        return NgParquetWriter(base + '_parquet')
+    raise ValueError('invalid report format: %s' % fmt)
+
+class NgReportWriter(object):
+    #base of report writers: KpiTable and PmTable are written as rows of [stime, interval, dn, values...] unless overridden
+    def __init__(self, fn):
+        self.fn = fn
+        self.numRows = 0
+        self.t0 = time.perf_counter()
+
+    def writeKpiTable(self, name, table):
+        header = ['STIME', 'INTERVAL', 'DN']
+        header.extend(table.names)
+        #rows without any valid kpi are skipped
+        return self.writeTable(name, header, table.iterRows() if len(table.names) > 0 else [])
+
+    def writePmTable(self, name, table, tags):
+        header = ['STIME', 'INTERVAL', 'DN']
+        header.extend(tags)
+        return self.writeTable(name, header, table.iterRows([table.tagIndex[tag] for tag in tags]))
+
+    def writeTable(self, name, header, rows):
+        #return number of sheets/files written
+        raise NotImplementedError
+
+    def close(self):
+        #return (number of rows written, seconds elapsed)
+        return self.numRows, time.perf_counter() - self.t0
+
+class NgXlsxWriter(NgReportWriter):
+    #streaming excel writer: with constant_memory, each row is flushed to disk once the next row is written
+    def __init__(self, fn, constantMemory=True):
+        super().__init__(fn)
+        self.workbook = xlsxwriter.Workbook(fn, {'constant_memory':constantMemory})
+        self.fmtHHeader = self.workbook.add_format({'font_name':'Arial', 'font_size':9, 'align':'center', 'valign':'vcenter', 'text_wrap':True, 'bg_color':'yellow'})
+        self.fmtCell = self.workbook.add_format({'font_name':'Arial', 'font_size':9, 'align':'left', 'valign':'vcenter'})
+
+    def addSheet(self, name, part, header):
+        #sheets of a table are named as name, name_2, name_3, ... within 31 characters
+        if part > 1:
+            name = '%s_%d' % (name[:31-len('_%d' % part)], part)
+        else:
+            name = name[:31]
+
+        sheet = self.workbook.add_worksheet(name)
+        sheet.set_zoom(90)
+        sheet.freeze_panes(1, 3)
+
+        #write header
+        sheet.write_row(0, 0, header, self.fmtHHeader)
+        return sheet
+
+    def writeTable(self, name, header, rows):
+        #write rows(iterable of lists) into sheet(s), a new sheet is started when excel row limit is reached
+        part = 1
+        sheet = self.addSheet(name, part, header)
+        count = 0
+        for row in rows:
+            if count == EXCEL_MAX_ROWS - 1:
+                part = part + 1
+                sheet = self.addSheet(name, part, header)
+                count = 0
+            sheet.write_row(count+1, 0, row, self.fmtCell)
+            count = count + 1
+            self.numRows = self.numRows + 1
+        return part
+
+    def close(self):
+        self.workbook.close()
+        return super().close()
+
+class NgCsvWriter(NgReportWriter):
+    #one <name>.csv per table in directory fn, rows are buffered and written in bulk
+    def __init__(self, fn, chunkRows=4096):
+        super().__init__(fn)
+        self.chunkRows = chunkRows
+        if not os.path.exists(fn):
+            os.makedirs(fn)
+
+    def writeTable(self, name, header, rows):
+        with open(os.path.join(self.fn, '%s.csv' % name), 'w', newline='', buffering=1024*1024) as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == self.chunkRows:
+                    writer.writerows(chunk)
+                    self.numRows = self.numRows + len(chunk)
+                    chunk = []
+            writer.writerows(chunk)
+            self.numRows = self.numRows + len(chunk)
+        return 1
+
+class NgNpzWriter(NgReportWriter):
+    #all tables in one .npz: <name>.stime/.interval/.dn for rows, and
+    #KpiTable: <name>.names/.kinds/.precisions/.sums/.ratios/.status
+    #PmTable: <name>.tags/.values/.valid(non-integer counters are not valid)
+    def __init__(self, fn):
+        super().__init__(fn)
+        self.arrays = dict()
+
+    def addKeys(self, name, keys):
+        keys = np.array(keys, dtype=np.str_).reshape(len(keys), 3)
+        self.arrays['%s.stime' % name] = keys[:, 0]
+        self.arrays['%s.interval' % name] = keys[:, 1].astype(np.int64)
+        self.arrays['%s.dn' % name] = keys[:, 2]
+        self.numRows = self.numRows + len(keys)
+
+    def writeKpiTable(self, name, table):
+        self.addKeys(name, table.keys)
+        self.arrays['%s.names' % name] = np.array(table.names, dtype=np.str_)
+        self.arrays['%s.kinds' % name] = np.array(table.kinds, dtype=np.int8)
+        self.arrays['%s.precisions' % name] = np.array([p if p is not None else -1 for p in table.precisions], dtype=np.int64)
+        self.arrays['%s.sums' % name] = table.sums
+        self.arrays['%s.ratios' % name] = table.ratios
+        self.arrays['%s.status' % name] = table.status
+        return 1
+
+    def writeTable(self, name, header, rows):
+        #generic table: one array per column, <name>.<column>
+        rows = list(rows)
+        for i,column in enumerate(header):
+            self.arrays['%s.%s' % (name, column)] = np.array([row[i] for row in rows])
+        self.numRows = self.numRows + len(rows)
+        return 1
+
+    def writePmTable(self, name, table, tags):
+        cols = [table.tagIndex[tag] for tag in tags]
+        self.addKeys(name, table.keys)
+        self.arrays['%s.tags' % name] = np.array(tags, dtype=np.str_)
+        self.arrays['%s.values' % name] = table.values[:, cols]
+        self.arrays['%s.valid' % name] = table.valid[:, cols]
+        return 1
+
+    def close(self):
+        np.savez(self.fn, **self.arrays)
+        return super().close()
+
+def parseNumber(value):
+    #int or float of value(number or text of number, e.g. '0.00' formatted with precision of kpi), None otherwise(e.g. 'NA', 'DIV0')
+    if isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return value
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+def arrowColumn(values):
+    #typed pyarrow array of a column of a generic table, whose values mix numbers(or their texts) with 'NA'/'DIV0'(e.g. kpis of NSA report)
+    #a column of numbers and 'NA'/'DIV0' is int64(or float64 if any float) with 'NA'/'DIV0' as null, other columns(e.g. DN) are string
+    numbers = [parseNumber(v) for v in values]
+    if not all([n is not None or v in ('NA', 'DIV0') for v,n in zip(values, numbers)]):
+        return pa.array([str(v) for v in values], type=pa.string())
+    isFloat = any([isinstance(n, (float, np.floating)) for n in numbers])
+    return pa.array(numbers, type=pa.float64() if isFloat else pa.int64())
+
+class NgParquetWriter(NgReportWriter):
+    #one <name>.parquet per table in directory fn, 'NA' is written as null
+    #KpiTable: kpi=x as int64, kpi=f*x/y as float64(0 if y is 0)
+    #PmTable: counters as int64(non-integer counters are written as null)
+    def __init__(self, fn):
+        super().__init__(fn)
+        if not os.path.exists(fn):
+            os.makedirs(fn)
+
+    def keyColumns(self, keys):
+        return [pa.array([key[0] for key in keys]), pa.array([int(key[1]) for key in keys], type=pa.int64()), pa.array([key[2] for key in keys])]
+
+    def writeKpiTable(self, name, table):
+        keys = table.keys
+        columns = self.keyColumns(keys)
+        for k in range(len(table.names)):
+            if table.kinds[k] == KPI_RATIO:
+                values = np.where(table.status[:, k] == KPI_DIV0, 0, table.ratios[:, k])
+            else:
+                values = table.sums[:, k]
+            columns.append(pa.array(values, mask=(table.status[:, k] == KPI_NA)))
+        pq.write_table(pa.Table.from_arrays(columns, names=['STIME', 'INTERVAL', 'DN'] + list(table.names)), os.path.join(self.fn, '%s.parquet' % name))
+        self.numRows = self.numRows + len(keys)
+        return 1
+
+    def writeTable(self, name, header, rows):
+        rows = list(rows)
+        columns = [arrowColumn([row[i] for row in rows]) for i in range(len(header))]
+        pq.write_table(pa.Table.from_arrays(columns, names=list(header)), os.path.join(self.fn, '%s.parquet' % name))
+        self.numRows = self.numRows + len(rows)
+        return 1
+
+    def writePmTable(self, name, table, tags):
+        columns = self.keyColumns(table.keys)
+        for tag in tags:
+            col = table.tagIndex[tag]
+            columns.append(pa.array(table.values[:, col], mask=~table.valid[:, col]))
+        pq.write_table(pa.Table.from_arrays(columns, names=['STIME', 'INTERVAL', 'DN'] + list(tags)), os.path.join(self.fn, '%s.parquet' % name))
+        self.numRows = self.numRows + len(table.keys)
+        return 1
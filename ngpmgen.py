@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngpmgen.py
+Description:
+    Synthetic raw PM generator for benchmarks of raw PM parser, counters are those referenced by kpi_def*(5g) or menb_kpi_def*(4g).
+    usage: python ngpmgen.py OUTDIR [--rat 5g|4g] [--bts N] [--cells N] [--meas-types N] [--counters N] [--rops N] [--format tar.gz|xml|xml.gz]
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import re
+import io
+import gzip
+import random
+import tarfile
+import argparse
+from datetime import datetime, timedelta
+
+def kpiCounters(confDir, rat):
+    #{measType, sorted list of counters} of counters referenced by kpi_def*(5g) or menb_kpi_def*(4g), e.g. M55110C00004 is of measType M55110
+    prefix = 'kpi_def' if rat == '5g' else 'menb_kpi_def'
+    counters = set()
+    for fn in os.listdir(confDir):
+        if fn.lower().startswith(prefix) and not fn.endswith('~'):
+            with open(os.path.join(confDir, fn), 'r') as f:
+                counters.update(re.findall(r'\((M\d+C\d+),', f.read()))
+    measTypes = dict()
+    for counter in sorted(counters):
+        measType = counter.split('C')[0]
+        if measType not in measTypes:
+            measTypes[measType] = []
+        measTypes[measType].append(counter)
+    return measTypes
+
+class NgPmGenerator(object):
+    #raw PM of numBts BTSs x numRops ROPs, each BTS reports one xml per ROP
+    #every third measType is reported per BTS(NRBTS/LNBTS), the others per cell(NRCELL/LNCEL)
+    def __init__(self, rat='5g', numBts=3, numCells=3, numMeasTypes=None, numCounters=None, numRops=4, interval=15, startTime=datetime(2019, 3, 21, 7, 0, 0), seed=1, confDir=None):
+        self.rat = rat
+        self.numBts = numBts
+        self.numCells = numCells
+        self.numRops = numRops
+        self.interval = interval
+        self.startTime = startTime
+        self.seed = seed
+        if confDir is None:
+            confDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+
+        #numMeasTypes/numCounters(per measType) limit counters referenced by kpi definitions, None for all
+        self.measTypes = kpiCounters(confDir, rat)
+        names = sorted(self.measTypes.keys())[:numMeasTypes]
+        self.measTypes = {name:self.measTypes[name][:numCounters] for name in names}
+        self.cellLevel = {name:(i % 3 != 0) for i,name in enumerate(names)}
+
+    def btsId(self, b):
+        return (53700 if self.rat == '5g' else 117800) + b
+
+    def dns(self, b, measType):
+        if self.rat == '5g':
+            bts = 'MRBTS-%d/NRBTS-1' % self.btsId(b)
+            return ['%s/NRCELL-%d' % (bts, c) for c in range(1, self.numCells+1)] if self.cellLevel[measType] else [bts]
+        else:
+            bts = 'LNBTS-%d' % self.btsId(b)
+            return ['%s/LNCEL-%d' % (bts, c) for c in range(1, self.numCells+1)] if self.cellLevel[measType] else [bts]
+
+    def genXml(self, b, t, rng):
+        #OMeS xml of BTS b at ROP starting at t: 2% of counters are not reported, 20% are zero
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<OMeS>', '<PMSetup startTime="%s.000+08:00:00" interval="%d">' % (t.isoformat(), self.interval)]
+        for measType,counters in self.measTypes.items():
+            for dn in self.dns(b, measType):
+                if self.rat == '5g':
+                    lines.append('<PMMOResult><MO dimension="network_element"><DN>PLMN-PLMN/%s</DN></MO><PMTarget measurementType="NR_%s">' % (dn, measType))
+                else:
+                    lines.append('<PMMOResult><MO><baseId>NE-MRBTS-%d</baseId><localMoid>DN:NE-%s</localMoid></MO><NE-WBTS_1.0 measurementType="LTE_%s">' % (self.btsId(b), dn, measType))
+                for counter in counters:
+                    if rng.random() < 0.02:
+                        continue
+                    lines.append('<%s>%d</%s>' % (counter, 0 if rng.random() < 0.2 else rng.randint(0, 1000), counter))
+                lines.append('</PMTarget></PMMOResult>' if self.rat == '5g' else '</NE-WBTS_1.0></PMMOResult>')
+        lines.append('</PMSetup></OMeS>')
+        return '\n'.join(lines).encode()
+
+    def xmlName(self, b, t):
+        if self.rat == '5g':
+            return 'MRBTS-%d_PM_%s_SRAN.xml' % (self.btsId(b), t.strftime('%Y%m%d_%H%M%S'))
+        else:
+            return 'PM.BTS-%d.%s.ANY.xml' % (self.btsId(b), t.strftime('%Y%m%d.%H%M%S'))
+
+    def generate(self, outDir, fmt='tar.gz'):
+        #fmt: tar.gz(one archive per BTS), xml or xml.gz(one file per BTS per ROP), return list of files written
+        if not os.path.exists(outDir):
+            os.makedirs(outDir)
+        rng = random.Random(self.seed)
+        fns = []
+        for b in range(self.numBts):
+            tar = None
+            if fmt == 'tar.gz':
+                fn = os.path.join(outDir, 'PM_%s_%d_%s.tar.gz' % (self.rat, self.btsId(b), self.startTime.strftime('%Y%m%d')))
+                tar = tarfile.open(fn, 'w:gz')
+                fns.append(fn)
+            for r in range(self.numRops):
+                t = self.startTime + timedelta(minutes=self.interval * r)
+                xml = self.genXml(b, t, rng)
+                if tar is not None:
+                    info = tarfile.TarInfo(self.xmlName(b, t))
+                    info.size = len(xml)
+                    tar.addfile(info, io.BytesIO(xml))
+                else:
+                    fn = os.path.join(outDir, self.xmlName(b, t) + ('.gz' if fmt == 'xml.gz' else ''))
+                    with (gzip.open(fn, 'wb') if fmt == 'xml.gz' else open(fn, 'wb')) as f:
+                        f.write(xml)
+                    fns.append(fn)
+            if tar is not None:
+                tar.close()
+        return fns
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Synthetic raw PM generator.')
+    parser.add_argument('outDir')
+    parser.add_argument('--rat', choices=['4g', '5g'], default='5g')
+    parser.add_argument('--bts', type=int, default=3)
+    parser.add_argument('--cells', type=int, default=3)
+    parser.add_argument('--meas-types', dest='measTypes', type=int, default=None)
+    parser.add_argument('--counters', type=int, default=None, help='max counters per measType')
+    parser.add_argument('--rops', type=int, default=4)
+    parser.add_argument('--interval', type=int, default=15)
+    parser.add_argument('--format', dest='fmt', choices=['tar.gz', 'xml', 'xml.gz'], default=None, help='tar.gz for 5g and xml.gz for 4g by default')
+    parser.add_argument('--seed', type=int, default=1)
+    opts = parser.parse_args()
+
+    gen = NgPmGenerator(opts.rat, opts.bts, opts.cells, opts.measTypes, opts.counters, opts.rops, opts.interval, seed=opts.seed)
+    fns = gen.generate(opts.outDir, opts.fmt if opts.fmt is not None else ('tar.gz' if opts.rat == '5g' else 'xml.gz'))
+    print('%d files written to %s' % (len(fns), opts.outDir))
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngpmschema.py
+Description:
+    Persistent counter schema registry of raw PM parser: counter tag -> measurement type and aggregation level, learned from parsed raw PM.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import json
+import numpy as np
+
+#bump when format of counter schema changes
+COUNTER_SCHEMA_VERSION = 1
+
+class NgCounterSchema(object):
+    def __init__(self, fn):
+        self.fn = fn
+        self.counters = dict() #[key=tag, val=[measType, agg]]
+        self.changed = False
+
+    def load(self):
+        #load counters of schema file(if any), the schema stays empty if it fails(e.g. truncated file), which is then overwritten by save
+        if self.fn is not None and os.path.exists(self.fn):
+            with open(self.fn, 'r') as f:
+                schema = json.load(f)
+            if schema.get('version') == COUNTER_SCHEMA_VERSION:
+                self.counters = schema['counters']
+
+    def learn(self, data, pmKeys, measTypes=None):
+        #learn measType and agg of counters of data={measType, PmTable} with pmKeys=PmKeys(data), return {tag, agg} of counters in data
+        #measTypes(if given) are measTypes of tables of data, e.g. when keys of data are <measType>_<YYYYMMDD> of pm archive
+        #as before, agg of a counter is that of the first row reporting it in the first measType reporting it
+        #a table whose rows are all of the same agg(as with most measTypes) gives agg of all its counters without scanning counter matrix
+        aggMap = dict()
+        for t,(measType,table) in enumerate(data.items()):
+            if measTypes is not None:
+                measType = measTypes[t]
+            if len(table.keys) == 0:
+                continue
+            rowAggs = pmKeys.aggIds[pmKeys.tableIds[t]]
+            if np.all(rowAggs == rowAggs[0]):
+                aggs = [pmKeys.aggNames[rowAggs[0]]] * len(table.tags)
+                reported = [True] * len(table.tags)
+            else:
+                present = table.present()
+                aggs = [pmKeys.aggNames[a] for a in rowAggs[present.argmax(axis=0)].tolist()]
+                reported = present.any(axis=0).tolist()
+            for col,tag in enumerate(table.tags):
+                if reported[col] and tag not in aggMap:
+                    aggMap[tag] = aggs[col]
+                    if self.counters.get(tag) != [measType, aggs[col]]:
+                        self.counters[tag] = [measType, aggs[col]]
+                        self.changed = True
+        return aggMap
+
+    def aggMap(self):
+        #{tag, agg} of all counters known
+        return {tag:val[1] for tag,val in self.counters.items()}
+
+    def measType(self, tag):
+        return self.counters[tag][0] if tag in self.counters else None
+
+    def save(self):
+        if not self.changed or self.fn is None:
+            return
+        if not os.path.exists(os.path.dirname(self.fn)):
+            os.makedirs(os.path.dirname(self.fn))
+        with open(self.fn + '.tmp', 'w') as f:
+            json.dump({'version':COUNTER_SCHEMA_VERSION, 'counters':self.counters}, f, indent=1, sort_keys=True)
+        os.replace(self.fn + '.tmp', self.fn)
+        self.changed = False
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngpmstats.py
+Description:
+    Per-stage instrumentation of raw PM parser: wall time, cpu time, peak rss and item counts of each stage.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import os
+import sys
+import json
+import time
+import platform
+import numpy as np
+try:
+    import resource
+except ImportError:
+    #peak rss is not available on windows
+    resource = None
+
+#bump when format of stats summary changes
+STATS_VERSION = 1
+
+def peakRss():
+    #peak rss(MB) of this process or any of its terminated children(e.g. parse workers), None if not available
+    if resource is None:
+        return None
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    #ru_maxrss is in bytes on macos and in kilobytes elsewhere
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+def cpuTime():
+    #user + system cpu seconds of this process and its terminated children
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+class NgStageStats(object):
+    #a stage starts where the previous one ends, peak rss is the high-water mark at the end of each stage
+    def __init__(self):
+        self.stages = [] #list of {stage, wall, cpu, peakRss, counts}
+        self.t0 = time.perf_counter()
+        self.c0 = cpuTime()
+
+    def endStage(self, stage, counts=None):
+        t = time.perf_counter()
+        c = cpuTime()
+        self.stages.append({'stage':stage, 'wall':t - self.t0, 'cpu':c - self.c0, 'peakRss':peakRss(), 'counts':counts if counts is not None else dict()})
+        self.t0 = t
+        self.c0 = c
+        return self.stages[-1]
+
+    def get(self, stage):
+        for z in self.stages:
+            if z['stage'] == stage:
+                return z
+        return None
+
+    def summary(self, **info):
+        #machine-readable summary, info(e.g. rat) is included as is
+        summary = {'version':STATS_VERSION, 'time':time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()),
+                   'python':platform.python_version(), 'numpy':np.__version__, 'platform':platform.platform()}
+        summary.update(info)
+        summary['stages'] = self.stages
+        summary['total'] = {'wall':sum([z['wall'] for z in self.stages]), 'cpu':sum([z['cpu'] for z in self.stages]), 'peakRss':peakRss()}
+        return summary
+
+    def save(self, fn, **info):
+        with open(fn, 'w') as f:
+            json.dump(self.summary(**info), f, indent=1)
+
+    def formatStage(self, z):
+        return '%s: wall=%.3fs, cpu=%.3fs, peak rss=%s, %s' % (z['stage'], z['wall'], z['cpu'], '%.1fMB' % z['peakRss'] if z['peakRss'] is not None else 'n/a',
+                                                              ', '.join(['%s=%s' % (key, val) for key,val in z['counts'].items()]))
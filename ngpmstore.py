@@ -0,0 +1,346 @@
+#!/usr/bin/python3
+# -*- encoding: utf-8 -*-
+
+'''
+File:
+    ngpmstore.py
+Description:
+    Columnar store of raw PM counters.
+Change History:
+    2026-10-16  v0.1    created.
+'''
+
+import sys
+from array import array
+from datetime import datetime, timedelta
+import numpy as np
+
+class PmTable(object):
+    #counters of one measurement type: one int64 matrix with rows for (stime, interval, dn) and columns for counter tags
+    def __init__(self):
+        self.keys = [] #row index: list of (stime, interval, dn)
+        self.keyIndex = dict() #[key=(stime, interval, dn), val=row]
+        self.tags = [] #column index: list of counter tags
+        self.tagIndex = dict() #[key=tag, val=col]
+        self.values = np.zeros((0, 0), dtype=np.int64)
+        self.valid = np.zeros((0, 0), dtype=np.bool_) #True if counter is reported and is integer
+        self.others = dict() #[key=(row,col), val=text], counter values which are not integers
+        self.numResults = 0 #number of PMMOResults parsed into this table
+
+        #cells added by setText, which are moved into values/valid by flush
+        self.cellRows = array('q')
+        self.cellCols = array('q')
+        self.cellVals = array('q')
+
+    def addRow(self, key):
+        row = self.keyIndex.get(key)
+        if row is None:
+            row = len(self.keys)
+            key = tuple([sys.intern(z) for z in key])
+            self.keys.append(key)
+            self.keyIndex[key] = row
+        return row
+
+    def addTag(self, tag):
+        col = self.tagIndex.get(tag)
+        if col is None:
+            col = len(self.tags)
+            tag = sys.intern(tag)
+            self.tags.append(tag)
+            self.tagIndex[tag] = col
+        return col
+
+    def setText(self, key, tag, text):
+        self.setCell(self.addRow(key), tag, text)
+
+    def setCell(self, row, tag, text):
+        #as setText, with row from addRow, so that key is looked up once for all counters of a row
+        col = self.addTag(tag)
+        try:
+            val = int(text)
+            self.cellVals.append(val)
+            self.cellRows.append(row)
+            self.cellCols.append(col)
+            if self.others:
+                self.others.pop((row, col), None)
+        except (ValueError, TypeError, OverflowError):
+            self.others[(row, col)] = text
+
+    def resize(self, numRows, numCols):
+        #grow values/valid, the underlying buffers are doubled so that repeated merges are amortized
+        if not hasattr(self, 'bufValues'):
+            self.bufValues = self.values
+            self.bufValid = self.valid
+        capRows, capCols = self.bufValues.shape
+        if numRows > capRows or numCols > capCols:
+            capRows = max(numRows, 2 * capRows) if numRows > capRows else capRows
+            capCols = max(numCols, 2 * capCols) if numCols > capCols else capCols
+            bufValues = np.zeros((capRows, capCols), dtype=np.int64)
+            bufValid = np.zeros((capRows, capCols), dtype=np.bool_)
+            bufValues[:self.values.shape[0], :self.values.shape[1]] = self.values
+            bufValid[:self.valid.shape[0], :self.valid.shape[1]] = self.valid
+            self.bufValues = bufValues
+            self.bufValid = bufValid
+        self.values = self.bufValues[:numRows, :numCols]
+        self.valid = self.bufValid[:numRows, :numCols]
+
+    def flush(self):
+        self.resize(len(self.keys), len(self.tags))
+        if len(self.cellVals) > 0:
+            rows = np.frombuffer(self.cellRows, dtype=np.int64)
+            cols = np.frombuffer(self.cellCols, dtype=np.int64)
+            #for repeated (row,col), the last value wins as with dict
+            self.values[rows, cols] = np.frombuffer(self.cellVals, dtype=np.int64)
+            self.valid[rows, cols] = True
+            self.cellRows = array('q')
+            self.cellCols = array('q')
+            self.cellVals = array('q')
+        for row, col in self.others.keys():
+            self.valid[row, col] = False
+
+    def compact(self):
+        #drop spare capacity, e.g. before pickling partial results or after all merges
+        self.flush()
+        self.values = self.values.copy()
+        self.valid = self.valid.copy()
+        if hasattr(self, 'bufValues'):
+            del self.bufValues
+            del self.bufValid
+
+    def merge(self, other):
+        #merge other PmTable(flushed) into self, cells reported by other override cells of self
+        self.flush()
+        self.numResults = self.numResults + other.numResults
+        rowMap = np.array([self.addRow(key) for key in other.keys], dtype=np.int64)
+        colMap = np.array([self.addTag(tag) for tag in other.tags], dtype=np.int64)
+        self.resize(len(self.keys), len(self.tags))
+
+        ix = np.ix_(rowMap, colMap)
+        values = self.values[ix]
+        valid = self.valid[ix]
+        values[other.valid] = other.values[other.valid]
+        valid[other.valid] = True
+        self.values[ix] = values
+        self.valid[ix] = valid
+
+        if self.others:
+            for row, col in [(row, col) for row, col in self.others.keys() if self.valid[row, col]]:
+                del self.others[(row, col)]
+        for (row, col), text in other.others.items():
+            self.others[(int(rowMap[row]), int(colMap[col]))] = text
+            self.valid[rowMap[row], colMap[col]] = False
+
+    def present(self):
+        #True if counter is reported, including non-integer values
+        present = self.valid.copy()
+        for row, col in self.others.keys():
+            present[row, col] = True
+        return present
+
+    def get(self, key, tag):
+        #return integer value of (key, tag), raise KeyError if not reported or ValueError if not integer
+        row = self.keyIndex[key]
+        col = self.tagIndex[tag]
+        if self.valid[row, col]:
+            return int(self.values[row, col])
+        if (row, col) in self.others:
+            raise ValueError('invalid literal for int(): %s' % self.others[(row, col)])
+        raise KeyError(tag)
+
+    def rowValues(self, row, cols):
+        #values of row in the order of cols for export, 'NA' for counters not reported
+        values = self.values[row, cols].tolist()
+        valid = self.valid[row, cols].tolist()
+        return [values[i] if valid[i] else self.others.get((row, cols[i]), 'NA') for i in range(len(cols))]
+
+    def iterRows(self, cols, chunkRows=4096):
+        #rows of [stime, interval, dn, counter values of cols...] for export, 'NA' for counters not reported
+        cols = np.array(cols, dtype=np.int64)
+        for start in range(0, len(self.keys), chunkRows):
+            end = min(start + chunkRows, len(self.keys))
+            values = self.values[start:end][:, cols].tolist()
+            valid = self.valid[start:end][:, cols].tolist()
+            for i in range(end - start):
+                row = list(self.keys[start+i])
+                if all(valid[i]):
+                    row.extend(values[i])
+                else:
+                    row.extend([values[i][j] if valid[i][j] else self.others.get((start+i, int(cols[j])), 'NA') for j in range(len(cols))])
+                yield row
+
+    def rollup(self, keyFunc):
+        #sum counters of rows mapped to the same key by keyFunc(rows mapped to None are dropped), a counter is valid if reported as integer by any of the rows
+        self.flush()
+        table = PmTable()
+        groups = []
+        for key in self.keys:
+            key = keyFunc(key)
+            groups.append(table.addRow(key) if key is not None else -1)
+        groups = np.array(groups, dtype=np.int64)
+        for tag in self.tags:
+            table.addTag(tag)
+        table.resize(len(table.keys), len(table.tags))
+        if len(table.keys) == 0:
+            return table
+
+        order = np.argsort(groups, kind='stable')
+        order = order[groups[order] >= 0]
+        starts = np.concatenate(([0], np.nonzero(np.diff(groups[order]))[0] + 1))
+        table.values[:] = np.add.reduceat(np.where(self.valid, self.values, 0)[order], starts, axis=0)
+        table.valid[:] = np.logical_or.reduceat(self.valid[order], starts, axis=0)
+        table.compact()
+        return table
+
+    def __getstate__(self):
+        self.compact()
+        return self.__dict__
+
+def rollupPm(data, minutes):
+    #roll up data={measType, PmTable} into time buckets of minutes(e.g. 60 for hourly, 1440 for daily) aligned to midnight
+    buckets = dict() #[key=stime, val=stime of bucket]
+    def keyFunc(key):
+        stime, interval, dn = key
+        if stime not in buckets:
+            t = datetime.strptime(stime, '%Y-%m-%d_%H:%M:%S')
+            m = (t.hour * 60 + t.minute) // minutes * minutes
+            buckets[stime] = (t.replace(hour=0, minute=0, second=0) + timedelta(minutes=m)).strftime('%Y-%m-%d_%H:%M:%S')
+        return (buckets[stime], str(minutes), dn)
+
+    return {measType:table.rollup(keyFunc) for measType,table in data.items()}
+
+def rollupDn(data, level, clusters=None):
+    #roll up data={measType, PmTable} along dn hierarchy, level is one of:
+    #bts: 'MRBTS-1/NRBTS-1/NRCELL-1' -> 'MRBTS-1/NRCELL'
+    #cluster: 'MRBTS-1/NRBTS-1/NRCELL-1' -> 'CLUSTER-<name>/NRCELL', clusters={bts, cluster name} where bts is 'MRBTS-1' or '1'
+    #network: 'MRBTS-1/NRBTS-1/NRCELL-1' -> 'NETWORK/NRCELL'
+    #the last segment keeps agg of counters, so kpis of that agg can be calculated at any level
+    groups = dict() #[key=dn, val=dn of group, or None if not in any cluster]
+    def keyFunc(key):
+        stime, interval, dn = key
+        if dn not in groups:
+            segments = dn.split('/')
+            agg = segments[-1].split('-')[0]
+            if level == 'bts':
+                groups[dn] = '%s/%s' % (segments[0], agg)
+            elif level == 'cluster':
+                name = clusters.get(segments[0], clusters.get(segments[0].split('-')[-1]))
+                groups[dn] = '%s-%s/%s' % ('CLUSTER', name, agg) if name is not None else None
+            else:
+                groups[dn] = 'NETWORK/%s' % agg
+        return (stime, interval, groups[dn]) if groups[dn] is not None else None
+
+    return {measType:table.rollup(keyFunc) for measType,table in data.items()}
+
+class PmKeys(object):
+    #interned row identifiers of data={measType, PmTable}: each (stime, interval, dn) is registered once with an integer id,
+    #and its agg(the last segment of dn without id, e.g. NRCELL) is derived once per dn
+    def __init__(self, data):
+        self.tables = list(data.values()) #in the order of measType
+        self.keys = [] #id -> (stime, interval, dn)
+        self.keyIndex = dict() #[key=(stime, interval, dn), val=id]
+        self.aggNames = [] #agg index -> agg
+        aggIds = array('q') #id -> agg index
+        aggIndex = dict() #[key=agg, val=agg index]
+        dnAggs = dict() #[key=dn, val=agg index]
+        self.dns = [] #dn index -> dn
+        dnIds = array('q') #id -> dn index
+        dnIndex = dict() #[key=dn, val=dn index]
+        self.stimes = [] #stime index -> stime
+        stimeIds = array('q') #id -> stime index
+        stimeIndex = dict() #[key=stime, val=stime index]
+        self.tableIds = [] #ids of rows of each table
+        for table in self.tables:
+            ids = array('q')
+            for key in table.keys:
+                i = self.keyIndex.get(key)
+                if i is None:
+                    i = len(self.keys)
+                    self.keys.append(key)
+                    self.keyIndex[key] = i
+                    a = dnAggs.get(key[2])
+                    if a is None:
+                        agg = key[2].split('/')[-1].split('-')[0]
+                        if agg not in aggIndex:
+                            aggIndex[agg] = len(self.aggNames)
+                            self.aggNames.append(sys.intern(agg))
+                        a = dnAggs[key[2]] = aggIndex[agg]
+                    aggIds.append(a)
+                    d = dnIndex.get(key[2])
+                    if d is None:
+                        d = dnIndex[key[2]] = len(self.dns)
+                        self.dns.append(key[2])
+                    dnIds.append(d)
+                    st = stimeIndex.get(key[0])
+                    if st is None:
+                        st = stimeIndex[key[0]] = len(self.stimes)
+                        self.stimes.append(key[0])
+                    stimeIds.append(st)
+                ids.append(i)
+            self.tableIds.append(np.array(ids, dtype=np.int64))
+        self.aggIds = np.array(aggIds, dtype=np.int64)
+        self.dnIds = np.array(dnIds, dtype=np.int64)
+        self.stimeIds = np.array(stimeIds, dtype=np.int64)
+        self.tableSorted = [None] * len(self.tables)
+
+    def agg(self, i):
+        return self.aggNames[self.aggIds[i]]
+
+    def aggGroups(self):
+        #{agg, ids sorted by (stime, interval, dn)}, aggs in the order of first appearance
+        order = np.array(sorted(range(len(self.keys)), key=self.keys.__getitem__), dtype=np.int64)
+        aggOfOrder = self.aggIds[order]
+        return {agg:order[aggOfOrder == a] for a,agg in enumerate(self.aggNames)}
+
+    def rowsOf(self, t, ids):
+        #rows of ids in tables[t], -1 if not reported by the table
+        if self.tableSorted[t] is None:
+            order = np.argsort(self.tableIds[t], kind='stable')
+            self.tableSorted[t] = (self.tableIds[t][order], order)
+        sortedIds, order = self.tableSorted[t]
+        if len(sortedIds) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sortedIds, ids), len(sortedIds) - 1)
+        return np.where(sortedIds[pos] == ids, order[pos], -1)
+
+def gatherCounters(pmKeys, ids, tags):
+    #counter matrix(rows for ids of pmKeys, columns for tags) from pmKeys.tables(list of PmTable in the order of measType)
+    #as with NgRawPmParser.getCounter, a counter is taken from the first measType reporting it, valid is False if missing or not integer
+    values = np.zeros((len(ids), len(tags)), dtype=np.int64)
+    valid = np.zeros((len(ids), len(tags)), dtype=np.bool_)
+    found = np.zeros((len(ids), len(tags)), dtype=np.bool_)
+    for t,table in enumerate(pmKeys.tables):
+        js = [j for j,tag in enumerate(tags) if tag in table.tagIndex]
+        if len(js) == 0:
+            continue
+        cols = np.array([table.tagIndex[tags[j]] for j in js], dtype=np.int64)
+        rows = pmKeys.rowsOf(t, ids)
+        sel = np.nonzero(rows >= 0)[0]
+        if len(sel) == 0:
+            continue
+
+        ix = np.ix_(rows[sel], cols)
+        ix2 = np.ix_(sel, js)
+        tableValues = table.values[ix]
+        tableValid = table.valid[ix]
+        present = tableValid
+        if table.others:
+            #non-integer counters are reported too, which hides the same counter of later measTypes
+            present = tableValid.copy()
+            rowPos = np.full(len(table.keys), -1, dtype=np.int64)
+            rowPos[rows[sel]] = np.arange(len(sel))
+            colPos = np.full(len(table.tags), -1, dtype=np.int64)
+            colPos[cols] = np.arange(len(cols))
+            for row, col in table.others.keys():
+                if rowPos[row] >= 0 and colPos[col] >= 0:
+                    present[rowPos[row], colPos[col]] = True
+
+        taken = found[ix2]
+        if not taken.any():
+            values[ix2] = tableValues
+            valid[ix2] = tableValid
+            found[ix2] = present
+        else:
+            values[ix2] = np.where(taken, values[ix2], tableValues)
+            valid[ix2] = np.where(taken, valid[ix2], tableValid)
+            found[ix2] = taken | present
+    return values, valid
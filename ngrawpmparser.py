@@ -11,66 +11,177 @@ Change History:
 '''
 
 import os
+import sys
 import time
+import argparse
+import logging
 import traceback
 from datetime import datetime
 import tarfile
+import gzip
+import hashlib
+import json
+import pickle
 import xml.etree.ElementTree as ET
-import ngmainwin
-import xlsxwriter
-from PyQt5.QtWidgets import qApp
+from concurrent.futures import ProcessPoolExecutor
+try:
+    from PyQt5.QtWidgets import qApp
+except ImportError:
+    #headless run without PyQt5, see ngconsole.py
+    qApp = None
+from ngpmstore import PmTable, PmKeys, rollupPm, rollupDn
+from ngkpiengine import KpiCompiled, busyHourRows, busyHours
+from ngpmexport import REPORT_FORMATS, createReportWriter
+from ngpmarchive import NgPmArchive
+from ngkpianomaly import ANOMALY_METHODS, ANOMALY_DIRECTIONS, ANOMALY_HEADER, rankAnomalies
+from ngpmstats import NgStageStats
+from ngpmschema import NgCounterSchema
+
+#bump when format of cached partial results changes
+RAW_PM_CACHE_VERSION = 4
+#bump when format of compiled kpi catalogue changes
+KPI_CATALOGUE_VERSION = 2
+#compiled kpi catalogue of each rat, aggregation levels of kpis depend on rat
+KPI_CATALOGUE_FILE = 'kpi_catalogue_%s.pkl'
+COUNTER_SCHEMA_FILE = 'counter_schema_%s.json'
+#manifest of processed files of each rat, 4g and 5g runs may share cacheDir
+RAW_PM_MANIFEST_FILE = 'manifest_%s.json'
+#default directory of raw pm of each rat(relative to 5gnrgui)
+RAW_PM_DIRS = {'4g':'data/raw_pm_4g', '5g':'data/raw_pm'}
+#raw pm files of each rat: 4G PM.BTS*.xml.gz, 5G PM_*.tar.gz(or xml extracted from it), files of the other rat are skipped
+RAW_PM_SUFFIXES = {'4g':('xml.gz',), '5g':('tar.gz', 'xml')}
+#agg not exported to kpi report
+UNUSED_AGGS = ('NRCUUP', 'SFP', 'MNLENT', 'ETHLK', 'ETHIF', 'IPIF', 'IPADDRESSV4', 'IPNO', 'LNMME', 'VLANIF', 'IPVOL', 'SMOD', 'LTAC', 'LNADJ', 'FSTSCH')
 
 class NgRawPmParser(object):
-    def __init__(self, ngwin, rat):
+    def __init__(self, ngwin, rat, args=None):
         self.ngwin = ngwin
         self.rat = rat
-        self.inDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data/raw_pm')
-        self.outDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
+
+        #parse raw pm parser configuration, args(if any) overrides raw_pm_config.txt
+        self.args = dict()
+        self.args['inDir'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), RAW_PM_DIRS[rat])
+        self.args['cacheDir'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data/raw_pm_cache')
+        self.args['outDir'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
+        self.args['streamingParse'] = True
+        self.args['parseWorkers'] = 1
+        self.args['extractRawPm'] = False
+        self.args['incrementalParse'] = True
+        self.args['cacheKpiCatalogue'] = True
+        self.args['counterSchema'] = True
+        self.args['timeRollup'] = []
+        self.args['busyHourKpi'] = None
+        self.args['dnRollup'] = []
+        self.args['reportFormats'] = ['xlsx']
+        self.args['exportReport'] = True
+        self.args['pmArchiveDir'] = None
+        self.args['anomalyKpis'] = []
+        self.args['anomalyWindow'] = 8
+        self.args['anomalyThreshold'] = 3.0
+        self.args['anomalyMethod'] = 'mad'
+        self.args['writeStats'] = True
+        self.args['archiveQuery'] = None
+        self.args['multiRatBucket'] = 60
+        self.args['multiRatLevel'] = 'bts'
+        self.confDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+        self.parseRawPmConfig(os.path.join(self.confDir, 'raw_pm_config.txt'))
+        if args is not None:
+            self.args.update(args)
+
+        #wall/cpu time, peak rss and item counts of each stage(extract/parse/aggregate/kpi/anomaly/export), where a stage starts at the end of the previous one
+        self.stats = NgStageStats()
+
+        self.inDir = self.args['inDir']
+        self.cacheDir = self.args['cacheDir']
+        self.outDir = self.args['outDir']
         if not os.path.exists(self.outDir):
-            os.mkdir(self.outDir)
-
-        #extract tar.gz
-        for root, dirs, files in os.walk(self.inDir):
-            self.tgzs = sorted([os.path.join(root, fn) for fn in files if fn.lower().endswith('tar.gz')], key=str.lower)
-            for tgz in self.tgzs:
-                tar = tarfile.open(tgz, 'r:gz')
-                fns = tar.getnames()
-                for fn in fns:
-                    tar.extract(fn, self.inDir)
-
-        #parse raw pm xml
-        self.data = dict()
-        self.tagsMap = dict()
-        for root, dirs, files in os.walk(self.inDir):
-            self.xmls = sorted([os.path.join(root, fn) for fn in files if fn.lower().endswith('xml')], key=str.lower)
-            for fn in self.xmls:
-                self.parseRawPmXml(fn, self.rat)
-
-        #post-processing of raw pm
-        self.aggMap = dict()
-        self.gnbKpiReport = dict()
-        for key1,val1 in self.data.items():
-            for key2,val2 in val1.items():
-                stime, interval, dn = key2.split(';')
-                agg = dn.split('/')[-1].split('-')[0]
+            os.makedirs(self.outDir)
 
-                #init gnbKpiReport: {agg, {'stime_interval_dn', {kpi_name, kpi_value}}}
-                if agg not in self.gnbKpiReport:
-                    self.gnbKpiReport[agg] = dict()
-                if key2 not in self.gnbKpiReport[agg]:
-                    self.gnbKpiReport[agg][key2] = dict()
+        #tar.gz archives are parsed as streams, unless extract_raw_pm is true
+        #with pm_archive_query, counters are read from pm archive instead and raw pm is not touched
+        self.tgzs = []
+        self.xmls = []
+        numArchives = 0
+        suffixes = RAW_PM_SUFFIXES[self.rat]
+        if self.args['archiveQuery'] is None:
+            numSkipped = 0
+            for root, dirs, files in os.walk(self.inDir):
+                fns = [fn for fn in files if isRawPm(fn, RAW_PM_SUFFIXES['4g'] + RAW_PM_SUFFIXES['5g'])]
+                numSkipped = numSkipped + len([fn for fn in fns if not isRawPm(fn, suffixes)])
+                self.tgzs.extend(sorted([os.path.join(root, fn) for fn in fns if fn.lower().endswith('tar.gz') and isRawPm(fn, suffixes)], key=str.lower))
+            if numSkipped > 0:
+                self.ngwin.logEdit.append('<font color=purple>%d raw PM files of the other rat found in %s, which are skipped(rat=%s)</font>' % (numSkipped, self.inDir, self.rat))
+                processEvents()
+            numArchives = len(self.tgzs)
+            if self.args['extractRawPm']:
+                for tgz in self.tgzs:
+                    tar = tarfile.open(tgz, 'r:gz')
+                    fns = tar.getnames()
+                    for fn in fns:
+                        tar.extract(fn, self.inDir)
+                    tar.close()
+                self.tgzs = []
+        self.endStage('extract', {'archives':numArchives})
 
-                for key3,val3 in val2.items():
-                    if key3 not in self.aggMap:
-                        self.aggMap[key3] = agg
+        #parse raw pm xml into self.data={measType, PmTable}
+        self.data = dict()
+        self.numXmls = 0
+        self.numCached = 0
+        self.numErrors = 0
+        if self.args['archiveQuery'] is None:
+            for root, dirs, files in os.walk(self.inDir):
+                self.xmls.extend(sorted([os.path.join(root, fn) for fn in files if not fn.lower().endswith('tar.gz') and isRawPm(fn, suffixes)], key=str.lower))
+            if len(self.xmls) + len(self.tgzs) == 0:
+                self.ngwin.logEdit.append('<font color=purple>No raw PM files found in %s(rat=%s)!</font>' % (self.inDir, self.rat))
+                processEvents()
+            self.parseRawPmFiles(self.xmls, self.tgzs, self.rat)
+            if self.args['pmArchiveDir']:
+                self.appendPmArchive()
+        else:
+            self.queryPmArchive(*self.args['archiveQuery'])
+        self.endStage('parse', {'files':len(self.xmls) + len(self.tgzs), 'xmls':self.numXmls, 'cached':self.numCached,
+                                'pmmoResults':sum([table.numResults for table in self.data.values()]), 'rows':sum([len(table.keys) for table in self.data.values()]),
+                                'counters':sum([int(table.valid.sum()) + len(table.others) for table in self.data.values()])})
+
+        #post-processing of raw pm: (stime, interval, dn) of rows are interned once as ids with agg
+        self.pmKeys = PmKeys(self.data)
+        #aggregation level of counters is learned into counter schema registry(tag -> measType and agg), which is kept across runs with counter_schema=true
+        #counters of this run take precedence, and those not reported in this run(e.g. a measType missing from this ROP) are resolved from the registry
+        self.counterSchema = NgCounterSchema(os.path.join(self.cacheDir, COUNTER_SCHEMA_FILE % self.rat) if self.args['counterSchema'] else None)
+        try:
+            self.counterSchema.load()
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+        measTypes = [key.rsplit('_', 1)[0] for key in self.data.keys()] if self.args['archiveQuery'] is not None else list(self.data.keys())
+        self.aggMap = self.counterSchema.aggMap()
+        self.aggMap.update(self.counterSchema.learn(self.data, self.pmKeys, measTypes))
+        try:
+            self.counterSchema.save()
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+        self.counterIndex = dict() #[key=tag, val=list of (PmTable, col)] in the order of measType
+        for val1 in self.pmKeys.tables:
+            for col,tag in enumerate(val1.tags):
+                if tag not in self.counterIndex:
+                    self.counterIndex[tag] = []
+                self.counterIndex[tag].append((val1, col))
 
-        #sort self.gnbKpiReport[agg].keys()
-        for agg in self.gnbKpiReport.keys():
-            keys = list(self.gnbKpiReport[agg].keys())
-            keys.sort()
-            val = {key:self.gnbKpiReport[agg][key] for key in keys}
-            self.gnbKpiReport[agg].clear()
-            self.gnbKpiReport[agg] = val
+        #time/dn rollup: raw counters are summed over time buckets or dn hierarchy before kpis are calculated, so ratios are calculated correctly
+        self.clusters = dict()
+        if 'cluster' in self.args['dnRollup']:
+            self.parseClusterDef(os.path.join(self.confDir, 'cluster_def.txt'))
+        rollups = [] #[label, description, data={measType, PmTable}]
+        for minutes in self.args['timeRollup']:
+            rollups.append([rollupLabel(minutes), 'time rollup(=%d minutes)' % minutes, rollupPm(self.data, minutes)])
+        for level in self.args['dnRollup']:
+            rollups.append([level.upper(), 'DN rollup(=%s)' % level, rollupDn(self.data, level, self.clusters)])
+        if self.args['busyHourKpi'] and 60 not in self.args['timeRollup']:
+            #hourly data for busy hour selection only
+            rollups.append(['BH', 'time rollup(=60 minutes)', rollupPm(self.data, 60)])
+        self.endStage('aggregate', {'measTypes':len(self.data), 'ids':len(self.pmKeys.keys), 'rollups':len(rollups),
+                                    'rollupRows':sum([len(table.keys) for label,desc,data in rollups for table in data.values()])})
 
         #print self.data
         '''
@@ -80,342 +191,564 @@ class NgRawPmParser(object):
                 self.ngwin.logEdit.append('|--tag=%s' % key2)
                 for key3,val3 in val2.items():
                     self.ngwin.logEdit.append('|----key=%s,val=%s' % (key3, val3))
-            qApp.processEvents()
+            processEvents()
 
-        for key,val in self.tagsMap.items():
-            self.ngwin.logEdit.append('key=%s,val=%s'%(key,val))
+        for key,val in self.data.items():
+            self.ngwin.logEdit.append('key=%s,val=%s'%(key,val.tags))
 
         for key,val in self.aggMap.items():
             self.ngwin.logEdit.append('tag=%s,agg=%s'%(key,val))
         '''
 
-        #parse kpi definitions
-        self.gnbKpis = []
-        self.confDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+        processEvents()
+
+        #parse kpi definitions, the compiled kpi catalogue is cached until kpi_def*(or aggregation level of counters involved) changes
+        self.kpiDefs = []
         for root, dirs, files in os.walk(self.confDir):
-            self.kpiDefs = sorted([os.path.join(root, fn) for fn in files if (os.path.basename(fn).lower().startswith('kpi_def') or os.path.basename(fn).lower().startswith('menb_kpi_def')) and not fn.endswith('~')], key=str.lower)
+            self.kpiDefs.extend(sorted([os.path.join(root, fn) for fn in files if (os.path.basename(fn).lower().startswith('kpi_def') or os.path.basename(fn).lower().startswith('menb_kpi_def')) and not fn.endswith('~')], key=str.lower))
+        self.kpiCatalogue = self.loadKpiCatalogue(self.kpiDefs) if self.args['cacheKpiCatalogue'] else None
+        if self.kpiCatalogue is None:
+            self.gnbKpis = []
             for fn in self.kpiDefs:
                 self.parseKpiDef(fn)
-
-        #post-processing of gnbKpis
-        for kpi in self.gnbKpis:
-            try:
-                if len(kpi) != 6:
-                    continue
-
-                x = kpi[2]
-                y = kpi[3]
-                invalidx = False
-                invalidy = False
-                aggx = None
-                aggy = None
-                if not invalidx and x is not None:
-                    tokens = x.split(';')
-                    tokens = list(map(lambda z:z.strip(), tokens))
-                    if len(tokens) == 1 and not(tokens[0].startswith('(') and tokens[0].endswith(')')):
-                        kpi[2] = int(tokens[0])
-                    else:
-                        kpi[2] = []
-                        for item in tokens:
-                            if item.startswith('(') and item.endswith(')'):
-                                a,b = item[1:-1].split(',')
-                                kpi[2].append([a, int(b)])
-                                #all counters involved must have the same aggregation level
-                                if aggx is None:
-                                    aggx = self.aggMap[a]
-                                else:
-                                    if self.aggMap[a] != aggx:
-                                        invalidx = True
-                                        break
-                            else:
-                                invalidx = True
-                                break
-
-                if not invalidy and y is not None:
-                    tokens = y.split(';')
-                    tokens = list(map(lambda z:z.strip(), tokens))
-                    if len(tokens) == 1 and not(tokens[0].startswith('(') and tokens[0].endswith(')')):
-                        kpi[3] = int(tokens[0])
-                    else:
-                        kpi[3] = []
-                        for item in tokens:
-                            if item.startswith('(') and item.endswith(')'):
-                                a,b = item[1:-1].split(',')
-                                kpi[3].append([a, int(b)])
-                                #all counters involved must have the same aggregation level
-                                if aggy is None:
-                                    aggy = self.aggMap[a]
-                                else:
-                                    if self.aggMap[a] != aggy:
-                                        invalidy = True
-                                        break
-                            else:
-                                invalidy = True
-                                break
-
-                if invalidx or invalidy or aggx is None or (aggx is not None and aggy is not None and aggx != aggy):
-                    self.ngwin.logEdit.append('<font color=purple>Invalid KPI definition(name=%s,aggx=%s,aggy=%s), which will be ignored!</font>' % (kpi[0], aggx if aggx is not None else 'None', aggy if aggy is not None else 'None'))
-                    qApp.processEvents()
-                    kpi[0] = None
-                else:
-                    kpi[5] = aggx
-            except Exception as e:
-                #self.ngwin.logEdit.append(str(e))
-                #self.ngwin.logEdit.append(repr(e))
-                #self.ngwin.logEdit.append(e.message)
-                self.ngwin.logEdit.append('<font color=purple>Invalid KPI definition(name=%s,aggx=%s,aggy=%s), which will be ignored!</font>' % (kpi[0], aggx if aggx is not None else 'None', aggy if aggy is not None else 'None'))
-                self.ngwin.logEdit.append(traceback.format_exc())
-                qApp.processEvents()
-                kpi[0] = None
-                continue
+            self.kpiCatalogue = {'version':KPI_CATALOGUE_VERSION, 'files':[(os.path.basename(fn), fileDigest(fn)) for fn in self.kpiDefs], 'defs':[self.tokenizeKpiDef(kpi) for kpi in self.gnbKpis if len(kpi) == 6]}
+            self.compileKpiCatalogue(self.kpiCatalogue)
+            if self.args['cacheKpiCatalogue']:
+                self.saveKpiCatalogue(self.kpiCatalogue)
+        elif any([self.aggMap.get(counter) != agg for counter,agg in self.kpiCatalogue['counterAggs'].items()]):
+            #kpi_def* unchanged, but aggregation level of counters changed
+            self.compileKpiCatalogue(self.kpiCatalogue)
+            self.saveKpiCatalogue(self.kpiCatalogue)
+        else:
+            self.ngwin.logEdit.append('<font color=blue>Compiled KPI catalogue(%d KPIs) loaded from cache.</font>' % len(self.kpiCatalogue['kpis']))
+            processEvents()
+        for name,counters in self.kpiCatalogue['unknown']:
+            self.ngwin.logEdit.append('<font color=purple>KPI definition(name=%s) references unknown counters(%s), which will be ignored!</font>' % (name, ','.join(counters)))
+        for name,aggx,aggy in self.kpiCatalogue['invalid']:
+            self.ngwin.logEdit.append('<font color=purple>Invalid KPI definition(name=%s,aggx=%s,aggy=%s), which will be ignored!</font>' % (name, aggx if aggx is not None else 'None', aggy if aggy is not None else 'None'))
+        processEvents()
+        self.gnbKpis = self.kpiCatalogue['kpis']
 
         '''
         for kpi in self.gnbKpis:
             if kpi[0] is None:
                 continue
             self.ngwin.logEdit.append('name=%s,f=%s,x=%s,y=%s,p=%s,agg=%s' % (kpi[0], kpi[1] if kpi[1] is not None else 'None', kpi[2], kpi[3] if kpi[3] is not None else 'None', kpi[4] if kpi[4] is not None else 'None', kpi[5] if kpi[5] is not None else 'None'))
-            qApp.processEvents()
+            processEvents()
         '''
 
-        #calculate kpi
+        #calculate kpi: kpis of each agg are compiled into weight matrices and evaluated over counter matrix of all rows
         self.ngwin.logEdit.append('<font color=blue>Calculating KPIs, please wait...</font>')
-        qApp.processEvents()
-        #reconstruct self.data to {'stime_interval_dn', {pm_tag, pm_value}}
-        data2 = dict()
-        for key1,val1 in self.data.items():
-            for key2,val2 in val1.items():
-                if key2 not in data2:
-                    data2[key2] = dict()
-                for key3,val3 in val2.items():
-                    if key3 not in data2[key2]:
-                        data2[key2][key3] = val3
-
-        '''
-        for key1,val1 in data2.items():
-            self.ngwin.logEdit.append('|key=%s'%key1)
-            for key2,val2 in val1.items():
-                self.ngwin.logEdit.append('|--pm_tag=%s,pm_val=%s'%(key2,val2))
-        '''
+        processEvents()
+        self.gnbKpiReport = self.calcKpis(self.data, True, self.pmKeys) #[key=agg, val=KpiTable]
 
-        for key1,val1 in self.gnbKpiReport.items():
-            agg = key1
-            for key2,val2 in val1.items():
-                    #calculate valid kpi for key2('stime_interval_dn')
-                    for kpi in self.gnbKpis:
-                        try:
-                            if kpi[0] is None or kpi[5] != agg:
-                                continue
-
-                            f = kpi[1]
-                            x = kpi[2]
-                            y = kpi[3]
-                            p = kpi[4]
-
-                            #calculate x and y
-                            if x is not None:
-                                if not isinstance(x, int):
-                                    xval = 0
-                                    for item in x:
-                                        xval = xval + int(data2[key2][item[0]]) * item[1]
-                                else:
-                                    xval = x
-
-                            if y is not None:
-                                if not isinstance(y, int):
-                                    yval = 0
-                                    for item in y:
-                                        yval = yval + int(data2[key2][item[0]]) * item[1]
-                                else:
-                                    yval = y
-
-                            #calculate kpi
-                            if f is not None and x is not None and y is not None and p is not None:
-                                if yval != 0:
-                                    kpival = '{:0.{precision}f}'.format(f * xval / yval, precision=p)
-                                else:
-                                    kpival = 0
-
-                            if f is None and x is not None and y is None and p is None:
-                                kpival = xval
-
-                            self.gnbKpiReport[agg][key2][kpi[0]] = kpival
-                        except Exception as e:
-                            self.gnbKpiReport[agg][key2][kpi[0]] = 'NA'
-                            self.ngwin.logEdit.append('<font color=purple>Error when calculating KPI(=%s) for DN=%s:</font>' % (kpi[0], key2))
-                            self.ngwin.logEdit.append(traceback.format_exc())
-                            qApp.processEvents()
-                            continue
+        self.rollupKpiReport = dict() #[key=HOUR/DAY/<n>MIN/BTS/CLUSTER/NETWORK/BH, val={agg, KpiTable}]
+        for label,desc,data in rollups:
+            if label == 'BH':
+                continue
+            self.ngwin.logEdit.append('<font color=blue>Calculating KPIs with %s, please wait...</font>' % desc)
+            processEvents()
+            self.rollupKpiReport[label] = self.calcKpis(data)
+        if self.args['busyHourKpi']:
+            self.ngwin.logEdit.append('<font color=blue>Selecting busy hour(kpi=%s), please wait...</font>' % self.args['busyHourKpi'])
+            processEvents()
+            hourly = self.rollupKpiReport['HOUR'] if 'HOUR' in self.rollupKpiReport else self.calcKpis(rollups[-1][2])
+            self.rollupKpiReport['BH'] = self.selectBusyHour(hourly, self.args['busyHourKpi'])
+        rollups = None
+        processEvents()
 
         if self.ngwin.enableDebug:
             for key1,val1 in self.gnbKpiReport.items():
                 self.ngwin.logEdit.append('|agg=%s'%key1)
-                for key2,val2 in val1.items():
-                    self.ngwin.logEdit.append('|--key=%s'%key2)
-                    for key3,val3 in val2.items():
+                for row,key2 in enumerate(val1.keys):
+                    self.ngwin.logEdit.append('|--key=%s'%';'.join(key2))
+                    for key3,val3 in zip(val1.names, val1.rowValues(row)):
                         self.ngwin.logEdit.append('|----kpi_name=%s,kpi_val=%s'%(key3,val3))
-                qApp.processEvents()
+                processEvents()
+        reports = [self.gnbKpiReport] + list(self.rollupKpiReport.values())
+        self.endStage('kpi', {'kpis':len(self.gnbKpis), 'rows':sum([len(table.ids) for report in reports for table in report.values()]),
+                              'values':sum([table.status.size for report in reports for table in report.values()]),
+                              'na':sum([int(table.numNa().sum()) for report in reports for table in report.values()])})
 
-        #export to excel
-        self.ngwin.logEdit.append('<font color=blue>Exporting to excel(engine=xlsxwriter), please wait...</font>')
-        qApp.processEvents()
+        #anomaly detection: each ROP of anomaly_kpis is compared with baseline of previous ROPs of the same dn, for all dns at once
+        self.anomalies = []
+        if self.args['anomalyKpis']:
+            self.ngwin.logEdit.append('<font color=blue>Detecting KPI anomalies(window=%d ROPs, threshold=%.1f, method=%s), please wait...</font>' % (self.args['anomalyWindow'], self.args['anomalyThreshold'], self.args['anomalyMethod']))
+            processEvents()
+            self.anomalies = rankAnomalies(self.gnbKpiReport, self.args['anomalyKpis'], self.args['anomalyWindow'], self.args['anomalyThreshold'], self.args['anomalyMethod'])
+            self.ngwin.logEdit.append('<font color=blue>%d degraded ROPs of %d DNs found.</font>' % (len(self.anomalies), len(set([(z[1], z[2]) for z in self.anomalies]))))
+            for z in self.anomalies[:10]:
+                self.ngwin.logEdit.append('<font color=purple>KPI(=%s) of %s at %s: %.2f(baseline=%.2f, score=%.1f)</font>' % (z[0], z[2], z[3], z[5], z[6], z[8]))
+            processEvents()
+        self.endStage('anomaly', {'kpis':len(self.args['anomalyKpis']), 'anomalies':len(self.anomalies)})
 
-        workbook = xlsxwriter.Workbook(os.path.join(self.outDir, '%s_kpi_report_%s.xlsx' % (rat, time.strftime('%Y%m%d%H%M%S', time.localtime()))))
-        fmtHHeader = workbook.add_format({'font_name':'Arial', 'font_size':9, 'align':'center', 'valign':'vcenter', 'text_wrap':True, 'bg_color':'yellow'})
-        fmtCell = workbook.add_format({'font_name':'Arial', 'font_size':9, 'align':'left', 'valign':'vcenter'})
+        #export report in each of report_formats, excel rows are streamed to disk sheet by sheet(constant_memory) and sheets are split at excel row limit
+        base = os.path.join(self.outDir, '%s_kpi_report_%s' % (rat, time.strftime('%Y%m%d%H%M%S', time.localtime())))
+        numFormats = 0
+        numWritten = 0
+        #with exportReport=False(e.g. NSA job, see ngmultirat.py), kpis are exported by the caller instead
+        for fmt in self.args['reportFormats'] if self.args['exportReport'] else []:
+            self.ngwin.logEdit.append('<font color=blue>Exporting to %s, please wait...</font>' % ('excel(engine=xlsxwriter)' if fmt == 'xlsx' else fmt))
+            processEvents()
+            try:
+                writer = createReportWriter(fmt, base)
+            except Exception as e:
+                self.ngwin.logEdit.append('<font color=purple>Report format(=%s) is not available: %s</font>' % (fmt, e))
+                continue
 
-        for key1,val1 in self.gnbKpiReport.items():
-            horizontalHeader = ['STIME', 'INTERVAL', 'DN']
-            for key2,val2 in val1.items():
-                if len(val2) == 0:
-                    continue
-                horizontalHeader.extend(val2.keys())
-                break
+            self.exportKpiReport(writer, self.gnbKpiReport, '')
+            for label,report in self.rollupKpiReport.items():
+                self.exportKpiReport(writer, report, '_%s' % label)
+            if self.args['anomalyKpis']:
+                self.checkParts('KPI_ANOMALY', writer.writeTable('KPI_ANOMALY', ANOMALY_HEADER, self.anomalies))
+            processEvents()
+
+            for measType,table in self.data.items():
+                tags = list(table.tags)
+                tags.sort()
+                self.checkParts(measType, writer.writePmTable(measType, table, tags))
+
+            numRows, elapsed = writer.close()
+            numFormats = numFormats + 1
+            numWritten = numWritten + numRows
+            self.ngwin.logEdit.append('<font color=blue>Exported %d rows to %s in %.1f seconds(%.0f rows/s)</font>' % (numRows, writer.fn, elapsed, numRows / elapsed if elapsed > 0 else 0))
+        self.endStage('export', {'formats':numFormats, 'rows':numWritten})
+
+        #stats summary(json) next to report, e.g. output/5g_kpi_report_20190321070000_stats.json
+        #with exportReport=False, stats are written by the caller with its report(e.g. one stats summary of NSA job)
+        if self.args['writeStats'] and self.args['exportReport']:
+            try:
+                self.stats.save(base + '_stats.json', rat=rat, args={key:val for key,val in self.args.items() if not key.endswith('Dir')})
+                self.ngwin.logEdit.append('<font color=blue>Stage stats written to %s</font>' % (base + '_stats.json'))
+            except Exception as e:
+                self.ngwin.logEdit.append(traceback.format_exc())
+        self.ngwin.logEdit.append('<font color=blue>Done!</font>')
+        processEvents()
+
+    def endStage(self, stage, counts=None):
+        z = self.stats.endStage(stage, counts)
+        if self.ngwin.enableDebug:
+            self.ngwin.logEdit.append('<font color=blue>Stage %s</font>' % self.stats.formatStage(z))
+            processEvents()
 
+    def calcKpis(self, data, logNa=False, pmKeys=None):
+        #calculate kpis of data={measType, PmTable}, return {agg, KpiTable} with rows sorted by (stime, interval, dn)
+        #pmKeys is PmKeys of data, which is built if not given
+        if pmKeys is None:
+            pmKeys = PmKeys(data)
+
+        report = dict()
+        for agg,ids in pmKeys.aggGroups().items():
+            compiled = self.kpiCatalogue['compiled'].get(agg)
+            if compiled is None:
+                compiled = KpiCompiled(agg, [])
+            report[agg] = compiled.evaluate(pmKeys, ids)
+            if logNa:
+                numNa = report[agg].numNa().tolist()
+                for name,num in zip(compiled.names, numNa):
+                    if num > 0:
+                        self.ngwin.logEdit.append('<font color=purple>KPI(=%s) is NA for %d of %d DNs(agg=%s) due to missing or invalid counters!</font>' % (name, num, len(ids), agg))
+        return report
+
+    def selectBusyHour(self, hourly, name):
+        #busy hour of each day is selected per dn by kpi(name), or by kpi(name) summed over all dns for aggs where kpi(name) is not defined
+        src = [table for table in hourly.values() if name in table.names]
+        if len(src) == 0:
+            self.ngwin.logEdit.append('<font color=purple>Busy hour KPI(=%s) is not found, busy hour is not selected!</font>' % name)
+            return dict()
+
+        hours = busyHours(src[0], name)
+        report = dict()
+        for agg,table in hourly.items():
+            if table is src[0]:
+                report[agg] = table.take(busyHourRows(table, name))
+            else:
+                report[agg] = table.take([row for row,key in enumerate(table.keys) if hours.get(key[0][:10]) == key[0]])
+        return report
+
+    def exportKpiReport(self, writer, report, suffix):
+        #one sheet per agg: KPI_<agg><suffix>
+        for key1,val1 in report.items():
             #skip unused agg
-            if key1 in ('NRCUUP', 'SFP', 'MNLENT', 'ETHLK', 'ETHIF', 'IPIF', 'IPADDRESSV4', 'IPNO', 'LNMME', 'VLANIF', 'IPVOL', 'SMOD', 'LTAC', 'LNADJ', 'FSTSCH'):
+            if key1 in UNUSED_AGGS:
                 continue
 
-            sheet1 = workbook.add_worksheet('KPI_%s' % key1)
-            sheet1.set_zoom(90)
-            sheet1.freeze_panes(1, 3)
+            name = 'KPI_%s%s' % (key1, suffix)
+            self.checkParts(name, writer.writeKpiTable(name, val1))
 
-            #write header
-            sheet1.write_row(0, 0, horizontalHeader, fmtHHeader)
+    def checkParts(self, name, parts):
+        if parts > 1:
+            self.ngwin.logEdit.append('<font color=purple>Sheet %s exceeds excel row limit, which is split into %d sheets!</font>' % (name, parts))
 
-            count = 0
-            for key2,val2 in val1.items():
-                if len(val2) == 0:
-                    continue
+    def getCounter(self, key, tag):
+        #integer value of counter(tag) of key((stime, interval, dn)) from the first measType reporting it
+        if tag not in self.counterIndex:
+            raise KeyError(tag)
+        for table,col in self.counterIndex[tag]:
+            row = table.keyIndex.get(key)
+            if row is None:
+                continue
+            if table.valid[row, col]:
+                return int(table.values[row, col])
+            if (row, col) in table.others:
+                raise ValueError('invalid literal for int(): %s' % table.others[(row, col)])
+        raise KeyError(tag)
 
-                #key = 'time;interval;dn'
-                stime, interval, dn = key2.split(';')
-                row = [stime, interval, dn]
-                row.extend(val2.values())
-
-                sheet1.write_row(count+1, 0, row, fmtCell)
-                count = count + 1
-
-        for measType in self.data.keys():
-            horizontalHeader = ['STIME', 'INTERVAL', 'DN']
-            tags = list(self.tagsMap[measType])
-            tags.sort()
-            horizontalHeader.extend(tags)
-
-            sheet1 = workbook.add_worksheet(measType[:31] if len(measType) > 31 else measType)
-            sheet1.set_zoom(90)
-            sheet1.freeze_panes(1, 3)
-
-            #write header
-            sheet1.write_row(0, 0, horizontalHeader, fmtHHeader)
-
-            count = 0
-            for key,val in self.data[measType].items():
-                #key = 'time;interval;dn'
-                #val = {tag:text}
-                stime, interval, dn = key.split(';')
-                row = [stime, interval, dn]
-                for tag in tags:
-                    if tag in val:
-                        row.append(val[tag])
-                    else:
-                        row.append('NA')
-
-                sheet1.write_row(count+1, 0, row, fmtCell)
-                count = count + 1
-
-        workbook.close()
-
-    def parseRawPmXml(self, fn, rat):
-        self.ngwin.logEdit.append('<font color=blue>Parsing raw PM:%s (rat=%s)</font>' % (fn, rat))
-        qApp.processEvents()
+    def parseRawPmConfig(self, fn):
+        try:
+            with open(fn, 'r') as f:
+                self.ngwin.logEdit.append('<font color=blue>Parsing raw PM configuration: %s</font>' % fn)
+                processEvents()
 
-        if rat == '5g':
-            try:
-                root = ET.parse(fn).getroot() #root='OMes'
-                '''
-                self.ngwin.logEdit.append('tag=%s,attrib=%s' % (root.tag, root.attrib))
-                for child in root:
-                    self.ngwin.logEdit.append('|--tag=%s,attrib=%s' % (child.tag, child.attrib))
-                '''
-
-                for pms in root.findall('PMSetup'):
-                    startTime = datetime.fromisoformat(pms.get('startTime')).strftime('%Y-%m-%d_%H:%M:%S')
-                    interval = pms.get('interval')
-                    for pmmoresult in pms.findall('PMMOResult'):
-                        '''
-                        <MO dimension="network_element">
-                            <DN>PLMN-PLMN/MRBTS-53775/NRBTS-1</DN>
-                        </MO>
-                        '''
-                        mo = pmmoresult.find('MO')
-                        dn = mo.find('DN')
-
-                        pmtarget = pmmoresult.find('PMTarget') if pmmoresult.find('PMTarget') is not None else pmmoresult.find('NE-WBTS_1.0')
-                        measType = pmtarget.get('measurementType')
-                        for child in pmtarget:
-                            key = '%s;%s;%s' % (startTime, interval, dn.text[len('PLMN-PLMN/'):])
-                            if measType not in self.data:
-                                self.data[measType] = dict()
-                            if key not in self.data[measType]:
-                                self.data[measType][key] = dict()
-                            self.data[measType][key][child.tag] = child.text
-
-                            if measType not in self.tagsMap:
-                                #note the difference between: a=set('hello') and a=set(['hello'])
-                                self.tagsMap[measType] = set([child.tag])
-                            else:
-                                self.tagsMap[measType].add(child.tag)
-            except Exception as e:
-                #self.ngwin.logEdit.append(str(e))
-                self.ngwin.logEdit.append(traceback.format_exc())
-                return
+                while True:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.startswith('#') or line.strip() == '':
+                        continue
+
+                    tokens = line.split('=')
+                    tokens = list(map(lambda x:x.strip(), tokens))
+                    if len(tokens) == 2:
+                        if tokens[0].lower() == 'raw_pm_dir_%s' % self.rat:
+                            if tokens[1] != '':
+                                self.args['inDir'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), tokens[1])
+                        elif tokens[0].lower() == 'streaming_parse':
+                            self.args['streamingParse'] = (tokens[1].lower() == 'true')
+                        elif tokens[0].lower() == 'parse_workers':
+                            self.args['parseWorkers'] = int(tokens[1])
+                        elif tokens[0].lower() == 'extract_raw_pm':
+                            self.args['extractRawPm'] = (tokens[1].lower() == 'true')
+                        elif tokens[0].lower() == 'incremental_parse':
+                            self.args['incrementalParse'] = (tokens[1].lower() == 'true')
+                        elif tokens[0].lower() == 'cache_kpi_catalogue':
+                            self.args['cacheKpiCatalogue'] = (tokens[1].lower() == 'true')
+                        elif tokens[0].lower() == 'counter_schema':
+                            self.args['counterSchema'] = (tokens[1].lower() == 'true')
+                        elif tokens[0].lower() == 'time_rollup':
+                            self.args['timeRollup'] = [parseRollupMinutes(z) for z in tokens[1].split(',') if z.strip() != '']
+                        elif tokens[0].lower() == 'busy_hour_kpi':
+                            self.args['busyHourKpi'] = tokens[1] if tokens[1] != '' else None
+                        elif tokens[0].lower() == 'dn_rollup':
+                            self.args['dnRollup'] = [parseDnRollupLevel(z) for z in tokens[1].split(',') if z.strip() != '']
+                        elif tokens[0].lower() == 'report_formats':
+                            self.args['reportFormats'] = [parseReportFormat(z) for z in tokens[1].split(',') if z.strip() != '']
+                        elif tokens[0].lower() == 'pm_archive_dir':
+                            self.args['pmArchiveDir'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), tokens[1]) if tokens[1] != '' else None
+                        elif tokens[0].lower() == 'pm_archive_query':
+                            self.args['archiveQuery'] = parseArchiveQuery(tokens[1]) if tokens[1] != '' else None
+                        elif tokens[0].lower() == 'anomaly_kpis':
+                            self.args['anomalyKpis'] = [parseAnomalyKpi(z) for z in tokens[1].split(',') if z.strip() != '']
+                        elif tokens[0].lower() == 'anomaly_window':
+                            self.args['anomalyWindow'] = int(tokens[1])
+                        elif tokens[0].lower() == 'anomaly_threshold':
+                            self.args['anomalyThreshold'] = float(tokens[1])
+                        elif tokens[0].lower() == 'anomaly_method':
+                            self.args['anomalyMethod'] = parseAnomalyMethod(tokens[1])
+                        elif tokens[0].lower() == 'write_stats':
+                            self.args['writeStats'] = (tokens[1].lower() == 'true')
+                        elif tokens[0].lower() == 'multi_rat_bucket':
+                            self.args['multiRatBucket'] = parseRollupMinutes(tokens[1])
+                        elif tokens[0].lower() == 'multi_rat_level':
+                            self.args['multiRatLevel'] = parseMultiRatLevel(tokens[1])
+                        else:
+                            pass
+        except Exception as e:
+            #self.ngwin.logEdit.append(str(e))
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+
+    def parseClusterDef(self, fn):
+        #cluster_name=bts1,bts2,..., where bts is 'MRBTS-53700' or '53700'
+        try:
+            with open(fn, 'r') as f:
+                self.ngwin.logEdit.append('<font color=blue>Parsing cluster definition: %s</font>' % fn)
+                processEvents()
+
+                while True:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.startswith('#') or line.strip() == '':
+                        continue
+
+                    tokens = line.split('=')
+                    tokens = list(map(lambda x:x.strip(), tokens))
+                    if len(tokens) == 2:
+                        for bts in [z.strip() for z in tokens[1].split(',') if z.strip() != '']:
+                            if bts in self.clusters and self.clusters[bts] != tokens[0]:
+                                self.ngwin.logEdit.append('<font color=purple>BTS(=%s) is defined in both cluster %s and %s, the latter is used!</font>' % (bts, self.clusters[bts], tokens[0]))
+                            self.clusters[bts] = tokens[0]
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+
+    def appendPmArchive(self):
+        try:
+            self.ngwin.logEdit.append('<font color=blue>Archiving raw PM: %s</font>' % self.args['pmArchiveDir'])
+            processEvents()
+            numRows = NgPmArchive(self.args['pmArchiveDir'], self.rat).append(self.data)
+            self.ngwin.logEdit.append('<font color=blue>%d rows archived.</font>' % numRows)
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+        processEvents()
+
+    def queryPmArchive(self, startDay, endDay):
+        if not self.args['pmArchiveDir']:
+            self.ngwin.logEdit.append('<font color=purple>PM archive query(%s to %s) is ignored as pm_archive_dir is not set!</font>' % (startDay, endDay))
+            return
+        try:
+            self.ngwin.logEdit.append('<font color=blue>Loading PM archive(%s to %s): %s</font>' % (startDay, endDay, self.args['pmArchiveDir']))
+            processEvents()
+            self.data = NgPmArchive(self.args['pmArchiveDir'], self.rat).query(startDay, endDay)
+            self.ngwin.logEdit.append('<font color=blue>%d partitions(%d rows) loaded.</font>' % (len(self.data), sum([len(table.keys) for table in self.data.values()])))
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+        processEvents()
+
+    def parseRawPmFiles(self, xmls, tgzs, rat):
+        #each xml file or tar.gz archive is a job, which returns partial results of each xml in it
+        jobs = [(None, fn) for fn in xmls] + [(tgz, None) for tgz in tgzs]
+        results = dict()
+        self.numCached = 0
+
+        #with incremental parsing, only jobs not found in the manifest of processed files are parsed
+        if self.args['incrementalParse']:
+            self.loadRawPmManifest()
+            todo = []
+            for job in jobs:
+                cached = self.loadRawPmCache(job[0] if job[0] is not None else job[1], rat)
+                if cached is not None:
+                    self.addRawPmResults(results, cached)
+                else:
+                    todo.append(job)
+            self.ngwin.logEdit.append('<font color=blue>Incremental parsing: %d raw PM files/archives loaded from cache, %d to be parsed</font>' % (len(jobs) - len(todo), len(todo)))
+            processEvents()
+            self.numCached = len(jobs) - len(todo)
+            jobs = todo
+
+        workers = self.args['parseWorkers'] if self.args['parseWorkers'] > 0 else os.cpu_count()
+        if workers > 1 and len(jobs) > 1:
+            self.ngwin.logEdit.append('<font color=blue>Parsing %d raw PM files/archives with %d worker processes (rat=%s)</font>' % (len(jobs), workers, rat))
+            processEvents()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = executor.map(parseRawPmWorker, [job[0] for job in jobs], [job[1] for job in jobs], [rat] * len(jobs), [self.args['streamingParse']] * len(jobs))
+                for job, jobResults in zip(jobs, parsed):
+                    self.addRawPmResults(results, jobResults)
+                    if self.args['incrementalParse']:
+                        self.saveRawPmCache(job[0] if job[0] is not None else job[1], rat, jobResults)
         else:
+            for tgz, fn in jobs:
+                self.ngwin.logEdit.append('<font color=blue>Parsing raw PM:%s (rat=%s)</font>' % (fn if tgz is None else tgz, rat))
+                jobResults = parseRawPmWorker(tgz, fn, rat, self.args['streamingParse'])
+                self.addRawPmResults(results, jobResults)
+                if self.args['incrementalParse']:
+                    self.saveRawPmCache(tgz if tgz is not None else fn, rat, jobResults)
+
+        if self.args['incrementalParse']:
+            self.saveRawPmManifest(xmls + tgzs)
+
+        #merge in the order of extracted xml path, which gives the same self.data as extracting tar.gz and then parsing xml
+        self.numXmls = len(results)
+        self.numErrors = 0
+        for path in sorted(results.keys(), key=str.lower):
+            name, data, error = results[path]
+            if error is not None:
+                self.numErrors = self.numErrors + 1
+                self.ngwin.logEdit.append('<font color=purple>Error when parsing raw PM:%s (rat=%s)</font>' % (name, rat))
+                self.ngwin.logEdit.append(error)
+            self.mergeRawPm(data)
+        processEvents()
+
+    def addRawPmResults(self, results, job):
+        for tgz, fn, data, error in job:
+            if tgz is None:
+                path = os.path.normpath(fn)
+                #an archive member overrides loose xml of the same path(e.g. extracted by previous runs)
+                if path in results:
+                    continue
+                results[path] = (fn, data, error)
+            else:
+                path = os.path.normpath(os.path.join(self.inDir, fn))
+                results[path] = ('%s:%s' % (tgz, fn), data, error)
+
+    def loadRawPmManifest(self):
+        #manifest: {path, {'size', 'mtime', 'hash'}}, parsed results of path are cached in cacheDir/hash_rat.pkl
+        self.manifest = dict()
+        try:
+            fn = os.path.join(self.cacheDir, RAW_PM_MANIFEST_FILE % self.rat)
+            if os.path.exists(fn):
+                with open(fn, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get('version') == RAW_PM_CACHE_VERSION:
+                    self.manifest = manifest['files']
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+
+    def saveRawPmManifest(self, paths):
+        if not os.path.exists(self.cacheDir):
+            os.makedirs(self.cacheDir)
+
+        #drop entries(and cached results no longer referenced) of files removed from self.inDir
+        #only cached results(<hash>_<rat>.pkl) of self.rat are pruned, those of the other rat are referenced by its own manifest,
+        #other files of cacheDir(e.g. kpi_catalogue_<rat>.pkl) are kept
+        paths = set([os.path.normpath(path) for path in paths])
+        for path in [path for path in self.manifest.keys() if path not in paths]:
+            del self.manifest[path]
+        hashes = set([val['hash'] for val in self.manifest.values()])
+        for fn in os.listdir(self.cacheDir):
+            if fn == '%s_%s.pkl' % (fn.split('_')[0], self.rat) and fn.split('_')[0] not in hashes:
+                os.remove(os.path.join(self.cacheDir, fn))
+
+        with open(os.path.join(self.cacheDir, RAW_PM_MANIFEST_FILE % self.rat), 'w') as f:
+            json.dump({'version':RAW_PM_CACHE_VERSION, 'files':self.manifest}, f, indent=1)
+
+    def loadRawPmCache(self, path, rat):
+        try:
+            path = os.path.normpath(path)
+            st = os.stat(path)
+            entry = self.manifest.get(path)
+            if entry is not None and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime:
+                digest = entry['hash']
+            else:
+                #size or mtime changed(or new file), content hash decides whether it's really new
+                digest = fileDigest(path)
+                self.manifest[path] = {'size':st.st_size, 'mtime':st.st_mtime, 'hash':digest}
+
+            fn = os.path.join(self.cacheDir, '%s_%s.pkl' % (digest, rat))
+            if not os.path.exists(fn):
+                return None
+            with open(fn, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+            return None
+
+    def saveRawPmCache(self, path, rat, jobResults):
+        #results with parsing errors are not cached, so they will be parsed again
+        if any([error is not None for tgz, fn, data, error in jobResults]):
+            return
+
+        try:
+            if not os.path.exists(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            path = os.path.normpath(path)
+            digest = self.manifest[path]['hash']
+            with open(os.path.join(self.cacheDir, '%s_%s.pkl' % (digest, rat)), 'wb') as f:
+                pickle.dump(jobResults, f, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+
+    def mergeRawPm(self, data):
+        for measType,table in data.items():
+            if measType not in self.data:
+                self.data[measType] = table
+            else:
+                self.data[measType].merge(table)
+
+    def tokenizeKpiDef(self, kpi):
+        #[name, f, x, y, p] with x/y tokenized into int or list of [counter, weight], or None if x/y is invalid
+        name, f, x, y, p, agg = kpi
+        terms = []
+        for z in (x, y):
+            if z is None:
+                terms.append(None)
+                continue
             try:
-                root = ET.parse(fn).getroot() #root='OMes'
-                '''
-                self.ngwin.logEdit.append('tag=%s,attrib=%s' % (root.tag, root.attrib))
-                for child in root:
-                    self.ngwin.logEdit.append('|--tag=%s,attrib=%s' % (child.tag, child.attrib))
-                '''
-
-                for pms in root.findall('PMSetup'):
-                    startTime = datetime.fromisoformat(pms.get('startTime')).strftime('%Y-%m-%d_%H:%M:%S')
-                    interval = pms.get('interval')
-                    for pmmoresult in pms.findall('PMMOResult'):
-                        '''
-                        <MO>
-                            <baseId>NE-MRBTS-833150</baseId>
-                            <localMoid>DN:NE-LNBTS-833150/FTM-1/IPNO-1/IEIF-1</localMoid>
-                        </MO>
-                        '''
-                        mo = pmmoresult.find('MO')
-                        dn = mo.find('localMoid').text.split(':')[1]
-
-                        pmtarget = pmmoresult.find('NE-WBTS_1.0')
-                        measType = pmtarget.get('measurementType')
-                        for child in pmtarget:
-                            key = '%s;%s;%s' % (startTime, interval, dn.text[len('NE-'):])
-                            if measType not in self.data:
-                                self.data[measType] = dict()
-                            if key not in self.data[measType]:
-                                self.data[measType][key] = dict()
-                            self.data[measType][key][child.tag] = child.text
-
-                            if measType not in self.tagsMap:
-                                #note the difference between: a=set('hello') and a=set(['hello'])
-                                self.tagsMap[measType] = set([child.tag])
-                            else:
-                                self.tagsMap[measType].add(child.tag)
+                tokens = z.split(';')
+                tokens = list(map(lambda z:z.strip(), tokens))
+                if len(tokens) == 1 and not(tokens[0].startswith('(') and tokens[0].endswith(')')):
+                    terms.append(int(tokens[0]))
+                else:
+                    term = []
+                    for item in tokens:
+                        if not (item.startswith('(') and item.endswith(')')):
+                            term = None
+                            break
+                        a,b = item[1:-1].split(',')
+                        term.append([a, int(b)])
+                    terms.append(term)
             except Exception as e:
-                #self.ngwin.logEdit.append(str(e))
                 self.ngwin.logEdit.append(traceback.format_exc())
-                return
+                processEvents()
+                terms.append(None)
+        return [name, f, terms[0], terms[1], p, (x is not None and terms[0] is None) or (y is not None and terms[1] is None)]
+
+    def compileKpiCatalogue(self, catalogue):
+        #validate kpi definitions against self.aggMap(counter schema), then compile kpis of each agg into weight matrices
+        #definitions referencing counters unknown to counter schema are rejected here, before any kpi is calculated
+        self.ngwin.logEdit.append('<font color=blue>Compiling KPI catalogue, please wait...</font>')
+        processEvents()
+        catalogue['kpis'] = []
+        catalogue['invalid'] = []
+        catalogue['unknown'] = []
+        catalogue['counterAggs'] = dict()
+        for name, f, x, y, p, invalid in catalogue['defs']:
+            #all counters involved must be known and have the same aggregation level
+            aggs = []
+            unknown = []
+            for term in (x, y):
+                agg = None
+                if isinstance(term, list):
+                    for counter,weight in term:
+                        catalogue['counterAggs'][counter] = self.aggMap.get(counter)
+                        if self.aggMap.get(counter) is None:
+                            if counter not in unknown:
+                                unknown.append(counter)
+                            continue
+                        if agg is not None and self.aggMap[counter] != agg:
+                            invalid = True
+                        agg = self.aggMap[counter] if agg is None else agg
+                aggs.append(agg)
+            aggx, aggy = aggs
+            if unknown and not invalid:
+                catalogue['unknown'].append((name, unknown))
+            elif invalid or aggx is None or (aggx is not None and aggy is not None and aggx != aggy):
+                catalogue['invalid'].append((name, aggx, aggy))
+            else:
+                catalogue['kpis'].append([name, f, x, y, p, aggx])
+
+        #for kpi defined more than once, the last definition wins
+        kpis = dict()
+        for kpi in catalogue['kpis']:
+            if kpi[5] not in kpis:
+                kpis[kpi[5]] = dict()
+            kpis[kpi[5]][kpi[0]] = kpi
+        catalogue['compiled'] = {agg:KpiCompiled(agg, list(val.values())) for agg,val in kpis.items()}
+
+    def loadKpiCatalogue(self, kpiDefs):
+        #compiled kpi catalogue is valid if kpi_def* are unchanged
+        try:
+            fn = os.path.join(self.cacheDir, KPI_CATALOGUE_FILE % self.rat)
+            if not os.path.exists(fn):
+                return None
+            with open(fn, 'rb') as f:
+                catalogue = pickle.load(f)
+            if catalogue['version'] != KPI_CATALOGUE_VERSION or catalogue['files'] != [(os.path.basename(kpiDef), fileDigest(kpiDef)) for kpiDef in kpiDefs]:
+                return None
+            return catalogue
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
+            return None
+
+    def saveKpiCatalogue(self, catalogue):
+        try:
+            if not os.path.exists(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            with open(os.path.join(self.cacheDir, KPI_CATALOGUE_FILE % self.rat), 'wb') as f:
+                pickle.dump(catalogue, f, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.ngwin.logEdit.append(traceback.format_exc())
+            processEvents()
 
     def parseKpiDef(self, fn):
         try:
             with open(fn, 'r') as f:
                 self.ngwin.logEdit.append('<font color=blue>Parsing KPI definition: %s</font>' % fn)
-                qApp.processEvents()
 
                 #[name, f, x, y, p, agg]
                 kpi = [None, None, None, None, None, None]
@@ -452,4 +785,251 @@ class NgRawPmParser(object):
         except Exception as e:
             #self.ngwin.logEdit.append(str(e))
             self.ngwin.logEdit.append(traceback.format_exc())
-            qApp.processEvents()
+            processEvents()
+
+def parseRollupMinutes(token):
+    #hour, day or minutes(which divides one day) of time rollup
+    token = token.strip().lower()
+    minutes = {'hour':60, 'day':1440}[token] if token in ('hour', 'day') else int(token)
+    if minutes <= 0 or 1440 % minutes != 0:
+        raise ValueError('invalid time rollup: %s' % token)
+    return minutes
+
+def parseDnRollupLevel(token):
+    #bts, cluster or network of dn rollup
+    token = token.strip().lower()
+    if token not in ('bts', 'cluster', 'network'):
+        raise ValueError('invalid dn rollup: %s' % token)
+    return token
+
+def parseMultiRatLevel(token):
+    #bts or network, level at which 4g and 5g kpis are joined
+    token = token.strip().lower()
+    if token not in ('bts', 'network'):
+        raise ValueError('invalid multi-rat level: %s' % token)
+    return token
+
+def parseReportFormat(token):
+    #xlsx, csv, npz or parquet
+    token = token.strip().lower()
+    if token not in REPORT_FORMATS:
+        raise ValueError('invalid report format: %s' % token)
+    return token
+
+def parseArchiveQuery(token):
+    #date range of pm archive query: YYYY-MM-DD,YYYY-MM-DD or YYYY-MM-DD for one day
+    days = [z.strip() for z in token.split(',')]
+    for day in days:
+        datetime.strptime(day, '%Y-%m-%d')
+    if len(days) == 1:
+        days.append(days[0])
+    if len(days) != 2 or days[0] > days[1]:
+        raise ValueError('invalid pm archive query: %s' % token)
+    return tuple(days)
+
+def parseAnomalyKpi(token):
+    #kpi of anomaly detection: name or name:direction, where direction(of degradation) is down(default), up or both
+    tokens = [z.strip() for z in token.split(':')]
+    direction = tokens[1].lower() if len(tokens) > 1 else 'down'
+    if tokens[0] == '' or direction not in ANOMALY_DIRECTIONS:
+        raise ValueError('invalid anomaly kpi: %s' % token)
+    return (tokens[0], direction)
+
+def parseAnomalyMethod(token):
+    #std(rolling mean/stdev) or mad(rolling median/MAD)
+    token = token.strip().lower()
+    if token not in ANOMALY_METHODS:
+        raise ValueError('invalid anomaly method: %s' % token)
+    return token
+
+def rollupLabel(minutes):
+    return {60:'HOUR', 1440:'DAY'}.get(minutes, '%dMIN' % minutes)
+
+def processEvents():
+    #keep GUI responsive between stages, no-op for headless run
+    if qApp is not None:
+        qApp.processEvents()
+
+def parseRawPm(fn, rat, streaming, data):
+    #parse raw pm xml(fn is file name or file object, e.g. member of tar.gz or gzip stream) into data={measType, PmTable}
+    if streaming:
+        iterParseRawPm(fn, rat, data)
+    else:
+        root = ET.parse(fn).getroot() #root='OMes'
+        for pms in root.findall('PMSetup'):
+            startTime = datetime.fromisoformat(pms.get('startTime')).strftime('%Y-%m-%d_%H:%M:%S')
+            interval = pms.get('interval')
+            for pmmoresult in pms.findall('PMMOResult'):
+                parsePmMoResult(pmmoresult, startTime, interval, rat, data)
+
+    for table in data.values():
+        table.compact()
+
+def iterParseRawPm(fn, rat, data):
+    #each PMMOResult is parsed as soon as it's closed and then dropped from the tree, so memory usage doesn't grow with file size
+    root = None
+    pms = None
+    for event, elem in ET.iterparse(fn, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem #root='OMes'
+            elif elem.tag == 'PMSetup':
+                pms = elem
+                startTime = datetime.fromisoformat(pms.get('startTime')).strftime('%Y-%m-%d_%H:%M:%S')
+                interval = pms.get('interval')
+        else:
+            if elem.tag == 'PMMOResult' and pms is not None:
+                parsePmMoResult(elem, startTime, interval, rat, data)
+                elem.clear()
+                pms.remove(elem)
+            elif elem.tag == 'PMSetup':
+                elem.clear()
+                root.remove(elem)
+                pms = None
+
+def parsePmMoResult(pmmoresult, startTime, interval, rat, data):
+    mo = pmmoresult.find('MO')
+    if rat == '5g':
+        '''
+        <MO dimension="network_element">
+            <DN>PLMN-PLMN/MRBTS-53775/NRBTS-1</DN>
+        </MO>
+        '''
+        dn = mo.find('DN').text[len('PLMN-PLMN/'):]
+        pmtarget = pmmoresult.find('PMTarget') if pmmoresult.find('PMTarget') is not None else pmmoresult.find('NE-WBTS_1.0')
+    else:
+        '''
+        <MO>
+            <baseId>NE-MRBTS-833150</baseId>
+            <localMoid>DN:NE-LNBTS-833150/FTM-1/IPNO-1/IEIF-1</localMoid>
+        </MO>
+        '''
+        dn = mo.find('localMoid').text.split(':')[1][len('NE-'):]
+        pmtarget = pmmoresult.find('NE-WBTS_1.0')
+
+    measType = pmtarget.get('measurementType')
+    if len(pmtarget) == 0:
+        return
+    if measType not in data:
+        data[measType] = PmTable()
+    table = data[measType]
+    table.numResults = table.numResults + 1
+    row = table.addRow((startTime, interval, dn))
+    for child in pmtarget:
+        table.setCell(row, child.tag, child.text)
+
+def rawPmDir(rat, args=None):
+    #directory of raw pm of rat as resolved by NgRawPmParser: inDir of args, or else raw_pm_dir_<rat> of raw_pm_config.txt, or else RAW_PM_DIRS
+    if args is not None and 'inDir' in args:
+        return args['inDir']
+    curDir = os.path.dirname(os.path.abspath(__file__))
+    inDir = os.path.join(curDir, RAW_PM_DIRS[rat])
+    try:
+        with open(os.path.join(curDir, 'config', 'raw_pm_config.txt'), 'r') as f:
+            for line in f:
+                if line.startswith('#') or line.strip() == '':
+                    continue
+                tokens = list(map(lambda x:x.strip(), line.split('=')))
+                if len(tokens) == 2 and tokens[0].lower() == 'raw_pm_dir_%s' % rat and tokens[1] != '':
+                    inDir = os.path.join(curDir, tokens[1])
+    except Exception as e:
+        pass
+    return inDir
+
+def isRawPm(fn, suffixes):
+    #True if file name fn ends with one of suffixes of RAW_PM_SUFFIXES, e.g. 'xml' matches PM*.xml but not PM.BTS*.xml.gz
+    return any([fn.lower().endswith(suffix) for suffix in suffixes])
+
+def fileDigest(fn):
+    h = hashlib.sha1()
+    with open(fn, 'rb') as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+def parseRawPmWorker(tgz, fn, rat, streaming):
+    #run in worker process of ProcessPoolExecutor(or in the GUI process), parse loose xml(fn) or all xml in archive(tgz)
+    #return [(tgz, fn, data, error)] which are merged by NgRawPmParser.mergeRawPm
+    results = []
+    if tgz is None:
+        data = dict()
+        try:
+            if fn.lower().endswith('.gz'):
+                #e.g. 4G PM.BTS*.xml.gz, which is decompressed on the fly
+                with gzip.open(fn, 'rb') as f:
+                    parseRawPm(f, rat, streaming, data)
+            else:
+                parseRawPm(fn, rat, streaming, data)
+            results.append((None, fn, data, None))
+        except Exception as e:
+            results.append((None, fn, data, traceback.format_exc()))
+        return results
+
+    try:
+        #tar.gz is read sequentially with each xml member fed to xml parser as a stream, nothing is written to disk
+        with tarfile.open(tgz, 'r|gz') as tar:
+            for member in tar:
+                if not (member.isfile() and member.name.lower().endswith('xml')):
+                    continue
+                data = dict()
+                try:
+                    parseRawPm(tar.extractfile(member), rat, streaming, data)
+                    results.append((tgz, member.name, data, None))
+                except Exception as e:
+                    results.append((tgz, member.name, data, traceback.format_exc()))
+    except Exception as e:
+        results.append((tgz, '', dict(), traceback.format_exc()))
+    return results
+
+if __name__ == '__main__':
+    #headless run, e.g. python -m ngrawpmparser --rat 5g --in data/raw_pm --out output --workers 4
+    from ngconsole import NgConsoleWin
+
+    parser = argparse.ArgumentParser(description='Raw PM parser: parse raw PM(xml/tar.gz), calculate KPIs and export report.')
+    parser.add_argument('--rat', default='5g', choices=['4g', '5g'])
+    parser.add_argument('--in', dest='inDir', help='directory of raw PM(4g: xml.gz, 5g: tar.gz or xml)')
+    parser.add_argument('--out', dest='outDir', help='directory of KPI report')
+    parser.add_argument('--cache', dest='cacheDir', help='directory of cached results of incremental parsing')
+    parser.add_argument('--workers', type=int, help='number of worker processes, 0 = one worker per cpu core')
+    parser.add_argument('--rollup', help='time rollup, comma separated list of hour, day or minutes')
+    parser.add_argument('--dn-rollup', dest='dnRollup', help='dn rollup, comma separated list of bts, cluster or network')
+    parser.add_argument('--busy-hour-kpi', dest='busyHourKpi', help='kpi to select busy hour of each day')
+    parser.add_argument('--format', dest='reportFormats', help='report formats, comma separated list of %s' % ', '.join(REPORT_FORMATS))
+    parser.add_argument('--archive', dest='pmArchiveDir', help='directory of pm archive, parsed counters are appended to it')
+    parser.add_argument('--archive-query', dest='archiveQuery', help='read counters of YYYY-MM-DD,YYYY-MM-DD from pm archive instead of parsing raw PM')
+    parser.add_argument('--anomaly-kpis', dest='anomalyKpis', help='kpis of anomaly detection, comma separated list of name or name:down|up|both')
+    parser.add_argument('--debug', action='store_true')
+    opts = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    args = dict()
+    for key,val in (('inDir', opts.inDir), ('outDir', opts.outDir), ('cacheDir', opts.cacheDir), ('pmArchiveDir', opts.pmArchiveDir), ('parseWorkers', opts.workers), ('busyHourKpi', opts.busyHourKpi)):
+        if val is not None:
+            args[key] = os.path.abspath(val) if key.endswith('Dir') else val
+    if opts.rollup is not None:
+        args['timeRollup'] = [parseRollupMinutes(z) for z in opts.rollup.split(',') if z.strip() != '']
+    if opts.dnRollup is not None:
+        args['dnRollup'] = [parseDnRollupLevel(z) for z in opts.dnRollup.split(',') if z.strip() != '']
+    if opts.reportFormats is not None:
+        args['reportFormats'] = [parseReportFormat(z) for z in opts.reportFormats.split(',') if z.strip() != '']
+    if opts.archiveQuery is not None:
+        args['archiveQuery'] = parseArchiveQuery(opts.archiveQuery)
+    if opts.anomalyKpis is not None:
+        args['anomalyKpis'] = [parseAnomalyKpi(z) for z in opts.anomalyKpis.split(',') if z.strip() != '']
+    #a misconfigured cron job must not pass silently: missing raw pm directory, no raw pm files or no raw pm file parsed exit with 1
+    logger = logging.getLogger('ngrawpmparser')
+    if opts.archiveQuery is None and not os.path.isdir(rawPmDir(opts.rat, args)):
+        logger.error('Raw PM directory(%s) not found(rat=%s)!' % (rawPmDir(opts.rat, args), opts.rat))
+        sys.exit(1)
+    rawPm = NgRawPmParser(NgConsoleWin(opts.debug, logger), opts.rat, args)
+    if opts.archiveQuery is None:
+        if len(rawPm.xmls) + len(rawPm.tgzs) == 0:
+            logger.error('No raw PM files found in %s(rat=%s)!' % (rawPm.inDir, opts.rat))
+            sys.exit(1)
+        if rawPm.numErrors == rawPm.numXmls:
+            logger.error('None of %d raw PM files/archives in %s could be parsed(rat=%s)!' % (len(rawPm.xmls) + len(rawPm.tgzs), rawPm.inDir, opts.rat))
+            sys.exit(1)
+    sys.exit(0)
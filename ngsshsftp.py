@@ -276,18 +276,21 @@ class NgSshSftp(object):
                     stdin, stdout, stderr = ssh.exec_command('cd %s && ls | grep "^PM.BTS.*.xml.gz$"' % self.rawPmPath4g)
                     stdout = str(stdout.read(), encoding='utf-8')
                     self.ngwin.logEdit.append(stdout)
-                    tokens = stdout.split('\n')
+                    tokens = [token.strip() for token in stdout.split('\n') if token.strip() != '']
                     if len(tokens) > 0:
-                        if not os.path.exists(os.path.join(curDir, 'data/raw_pm')):
-                            os.mkdir(os.path.join(curDir, 'data/raw_pm'))
-
-                        self.ngwin.logEdit.append('>cd %s && gzip -dk PM.BTS*.xml.gz && tar -czf /tmp/PM.tar.gz PM.BTS*.xml && rm PM.BTS*.xml:' % self.rawPmPath4g)
-                        stdin, stdout, stderr = ssh.exec_command('cd %s && gzip -dk PM.BTS*.xml.gz && tar -czf /tmp/PM.tar.gz PM.BTS*.xml && rm PM.BTS*.xml' % self.rawPmPath4g)
-                        self.ngwin.logEdit.append(str(stdout.read(), encoding='utf-8'))
-
-                        remotePath = '/tmp/PM.tar.gz'
-                        localPath = './data/raw_pm/PM_%s_%s.tar.gz' % ('_'.join(bts), time.strftime('%Y%m%d%H%M%S', time.localtime()))
-                        sftp.get(remotePath, localPath)
+                        if not os.path.exists(os.path.join(curDir, 'data/raw_pm_4g')):
+                            os.mkdir(os.path.join(curDir, 'data/raw_pm_4g'))
+
+                        #PM.BTS*.xml.gz are fetched as is(raw pm parser reads them as gzip streams), files already fetched are skipped
+                        #4g raw pm is kept apart from 5g raw pm in data/raw_pm, so that each rat(and NSA job) reads its own files
+                        for fn in tokens:
+                            #don't use os.path.join
+                            remotePath = '%s/%s' % (self.rawPmPath4g, fn)
+                            localPath = './data/raw_pm_4g/%s' % fn
+                            if os.path.exists(localPath) and os.path.getsize(localPath) == sftp.stat(remotePath).st_size:
+                                continue
+                            self.ngwin.logEdit.append('>get %s' % remotePath)
+                            sftp.get(remotePath, localPath)
 
                 t.close()
             except Exception as e: